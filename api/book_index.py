@@ -0,0 +1,375 @@
+import atexit
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.storage import data_dir
+
+# Formato del archivo (todos los enteros little-endian):
+#   cabecera | tabla de documentos | tabla de términos | términos | postings | documentos
+# - Tabla de documentos: (offset, longitud) de cada documento JSON.
+# - Tabla de términos, ordenada por los bytes UTF-8 del término:
+#   (offset del término, longitud, offset de sus postings, número de postings).
+# - Postings: (id de documento, frecuencia ponderada).
+MAGIC = b"EDUIDX01"
+HEADER = struct.Struct("<8sIIIIIII")
+DOC_ENTRY = struct.Struct("<II")
+TERM_ENTRY = struct.Struct("<IHII")
+POSTING = struct.Struct("<IH")
+
+# Peso de cada campo en la frecuencia de un término
+FIELD_WEIGHTS = {"title": 3, "authors": 2, "subjects": 1}
+
+# Los libros nuevos se guardan primero en memoria y se fusionan con el archivo
+# en segundo plano: MERGE_DELAY segundos después de añadirlos, o en cuanto haya
+# MERGE_THRESHOLD pendientes. Al fusionar se conservan los MAX_DOCUMENTS más recientes.
+MERGE_DELAY = 5.0
+MERGE_THRESHOLD = 200
+MAX_DOCUMENTS = 20000
+
+STOPWORDS = {
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los", "o", "para", "por",
+    "que", "se", "su", "sus", "un", "una", "uno", "unos", "unas", "y",
+    "an", "and", "by", "for", "in", "of", "on", "or", "the", "to", "with",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Pasa a minúsculas y elimina tildes y diéresis (á -> a, ñ -> n, ü -> u)."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Divide un texto en términos normalizados.
+
+    Se eliminan las palabras vacías y la "s" final de las palabras largas para
+    que singular y plural coincidan (matemáticas -> matematica).
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(normalize(text)):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _book_key(book: Dict[str, Any]) -> str:
+    authors = book.get("authors") or [""]
+    return f"{normalize(book.get('title', ''))}|{normalize(authors[0])}"
+
+
+def _frequencies(book: Dict[str, Any]) -> Counter:
+    """Frecuencia ponderada de cada término del libro (limitada a 16 bits)."""
+    frequencies = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        value = book.get(field) or ""
+        text = " ".join(value) if isinstance(value, list) else str(value)
+        for token in tokenize(text):
+            frequencies[token] += weight
+    return Counter({term: min(frequency, 0xFFFF) for term, frequency in frequencies.items()})
+
+
+class BookIndex:
+    """
+    Índice invertido local de los libros obtenidos de OpenLibrary.
+
+    Permite responder búsquedas repetidas o relacionadas sin red. El índice se
+    guarda en un archivo binario compacto y se lee mediante mmap: al buscar
+    solo se tocan las entradas de los términos consultados y los documentos
+    devueltos.
+
+    Los libros añadidos van a un índice en memoria (el delta) que las búsquedas
+    también consultan; reconstruir el archivo es O(N), así que se hace en un
+    hilo aparte y agrupando muchos libros, nunca en la petición que los añade.
+    """
+
+    def __init__(self, path=None, merge_delay: float = MERGE_DELAY,
+                 merge_threshold: int = MERGE_THRESHOLD, max_documents: int = MAX_DOCUMENTS):
+        """
+        Inicializa el índice y carga el archivo si existe.
+
+        Args:
+            path: Ruta del archivo del índice
+            merge_delay: Segundos entre añadir libros y fusionarlos con el archivo
+            merge_threshold: Libros pendientes que fuerzan la fusión inmediata
+            max_documents: Libros que se conservan como máximo (los más recientes)
+        """
+        self.path = str(path or data_dir() / "book_index.bin")
+        self.merge_delay = merge_delay
+        self.merge_threshold = merge_threshold
+        self.max_documents = max_documents
+        self._lock = threading.RLock()
+        self._merge_lock = threading.Lock()  # Una sola fusión a la vez; solo ella sustituye el archivo
+        self._merge_timer: Optional[threading.Timer] = None
+        self._file = None
+        self._mmap = None
+        self._doc_count = 0
+        self._term_count = 0
+        self._offsets = (0, 0, 0, 0, 0)
+        self._keys = None  # Claves de los documentos indexados (se calculan al añadir)
+        self._delta: List[Dict[str, Any]] = []
+        self._delta_postings: Dict[str, List[tuple]] = defaultdict(list)
+        self._load()
+
+    def __len__(self):
+        with self._lock:
+            return self._doc_count + len(self._delta)
+
+    def _load(self):
+        """Abre el archivo del índice con mmap."""
+        self._close()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size:
+            return
+
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, doc_count, term_count, *offsets = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            print("El índice de libros no tiene un formato válido; se ignorará.")
+            self._close()
+            return
+        self._doc_count = doc_count
+        self._term_count = term_count
+        self._offsets = tuple(offsets)
+
+    def _close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+        self._mmap = None
+        self._file = None
+        self._doc_count = 0
+        self._term_count = 0
+
+    def _document(self, doc_id: int) -> Dict[str, Any]:
+        doc_table, _, _, _, docs_blob = self._offsets
+        offset, length = DOC_ENTRY.unpack_from(self._mmap, doc_table + doc_id * DOC_ENTRY.size)
+        start = docs_blob + offset
+        return json.loads(self._mmap[start:start + length])
+
+    def _get(self, doc_id: int) -> Dict[str, Any]:
+        """Documento del archivo o, a continuación de sus ids, del delta."""
+        if doc_id < self._doc_count:
+            return self._document(doc_id)
+        return self._delta[doc_id - self._doc_count]
+
+    def _postings(self, term: str):
+        """Busca un término en la tabla ordenada (búsqueda binaria) y devuelve sus postings."""
+        if self._mmap is None:
+            return []
+        _, term_table, terms_blob, postings, _ = self._offsets
+        target = term.encode("utf-8")
+        low, high = 0, self._term_count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            term_offset, term_length, postings_offset, count = TERM_ENTRY.unpack_from(
+                self._mmap, term_table + middle * TERM_ENTRY.size)
+            start = terms_blob + term_offset
+            current = self._mmap[start:start + term_length]
+            if current < target:
+                low = middle + 1
+            elif current > target:
+                high = middle - 1
+            else:
+                start = postings + postings_offset
+                return list(POSTING.iter_unpack(self._mmap[start:start + count * POSTING.size]))
+        return []
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Busca libros en el índice local.
+
+        Los resultados se ordenan por la suma, para cada término de la consulta,
+        de su frecuencia ponderada en el libro por su rareza en el índice (tf-idf).
+
+        Args:
+            query: Texto de búsqueda (se ignora el prefijo "subject:")
+            limit: Número máximo de resultados
+
+        Returns:
+            Lista de libros, del más al menos relevante
+        """
+        if query.startswith("subject:"):
+            query = query[len("subject:"):]
+
+        with self._lock:
+            doc_count = self._doc_count + len(self._delta)
+            if doc_count == 0:
+                return []
+
+            scores = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self._postings(term)
+                postings += [(self._doc_count + i, frequency) for i, frequency in self._delta_postings.get(term, ())]
+                if not postings:
+                    continue
+                idf = math.log(1 + doc_count / len(postings))
+                for doc_id, frequency in postings:
+                    scores[doc_id] += frequency * idf
+
+            best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            return [self._get(doc_id) for doc_id, _ in best]
+
+    def add_books(self, books: Iterable[Dict[str, Any]]) -> int:
+        """
+        Añade libros al índice.
+
+        Los libros nuevos se pueden buscar al momento; se guardan en disco más
+        tarde, en segundo plano (ver `flush`).
+
+        Args:
+            books: Libros con el formato devuelto por BooksAPI
+
+        Returns:
+            Número de libros nuevos
+        """
+        with self._lock:
+            if self._keys is None:
+                self._keys = {_book_key(self._document(i)) for i in range(self._doc_count)}
+                self._keys.update(_book_key(book) for book in self._delta)
+
+            added = 0
+            for book in books:
+                key = _book_key(book)
+                if key not in self._keys:
+                    self._keys.add(key)
+                    self._add_to_delta(book)
+                    added += 1
+            pending = len(self._delta)
+
+        if added:
+            self._schedule_merge(immediate=pending >= self.merge_threshold)
+        return added
+
+    def _add_to_delta(self, book: Dict[str, Any]):
+        position = len(self._delta)
+        self._delta.append(book)
+        for term, frequency in _frequencies(book).items():
+            self._delta_postings[term].append((position, frequency))
+
+    def _schedule_merge(self, immediate: bool = False):
+        """Programa la fusión en segundo plano (agrupando los libros de varias búsquedas)."""
+        with self._lock:
+            if self._merge_timer is not None:
+                if not immediate:
+                    return
+                self._merge_timer.cancel()
+            self._merge_timer = threading.Timer(0 if immediate else self.merge_delay, self._merge_in_background)
+            self._merge_timer.daemon = True
+            self._merge_timer.start()
+
+    def _merge_in_background(self):
+        with self._lock:
+            self._merge_timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Error al guardar el índice de libros: {str(e)}")
+
+    def flush(self):
+        """
+        Fusiona los libros en memoria con el archivo del índice.
+
+        El archivo nuevo se construye sin bloquear las búsquedas; solo la
+        sustitución final se hace con el lock tomado.
+        """
+        with self._merge_lock:
+            with self._lock:
+                merged = list(self._delta)
+            if not merged:
+                return
+
+            # Solo esta fusión sustituye el archivo, así que se puede leer sin el lock
+            documents = [self._document(i) for i in range(self._doc_count)] + merged
+            documents = documents[-self.max_documents:]
+            keys = {_book_key(doc) for doc in documents}
+            tmp_path = self._write(documents)
+
+            with self._lock:
+                # En Windows no se puede reemplazar un archivo mapeado en memoria
+                self._close()
+                try:
+                    os.replace(tmp_path, self.path)
+                finally:
+                    self._load()
+                remaining = self._delta[len(merged):]
+                self._delta = []
+                self._delta_postings = defaultdict(list)
+                for book in remaining:
+                    self._add_to_delta(book)
+                self._keys = keys | {_book_key(book) for book in remaining}
+
+    def _write(self, documents: List[Dict[str, Any]]) -> str:
+        """Escribe un archivo de índice completo en un temporal junto al índice y devuelve su ruta."""
+        postings = defaultdict(list)
+        for doc_id, doc in enumerate(documents):
+            for term, frequency in _frequencies(doc).items():
+                postings[term].append((doc_id, frequency))
+
+        docs_blob = bytearray()
+        doc_table = bytearray()
+        for doc in documents:
+            data = json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            doc_table += DOC_ENTRY.pack(len(docs_blob), len(data))
+            docs_blob += data
+
+        term_table = bytearray()
+        terms_blob = bytearray()
+        postings_blob = bytearray()
+        for term in sorted(postings, key=lambda t: t.encode("utf-8")):
+            encoded = term.encode("utf-8")
+            entries = postings[term]
+            term_table += TERM_ENTRY.pack(len(terms_blob), len(encoded), len(postings_blob), len(entries))
+            terms_blob += encoded
+            for doc_id, frequency in entries:
+                postings_blob += POSTING.pack(doc_id, frequency)
+
+        doc_table_offset = HEADER.size
+        term_table_offset = doc_table_offset + len(doc_table)
+        terms_offset = term_table_offset + len(term_table)
+        postings_offset = terms_offset + len(terms_blob)
+        docs_offset = postings_offset + len(postings_blob)
+        header = HEADER.pack(MAGIC, len(documents), len(postings), doc_table_offset,
+                             term_table_offset, terms_offset, postings_offset, docs_offset)
+
+        # Nombre único: varias instancias de la aplicación pueden fusionar a la vez
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".",
+                                        prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for part in (header, doc_table, term_table, terms_blob, postings_blob, docs_blob):
+                    f.write(part)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return tmp_path
+
+
+_index: Optional[BookIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_book_index() -> BookIndex:
+    """Devuelve el índice local de libros compartido."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = BookIndex()
+            # Guardar al salir los libros que aún no se hayan fusionado
+            atexit.register(_index.flush)
+        return _index
@@ -1,69 +1,234 @@
-import requests
-from typing import Dict, List, Optional, Any
+import codecs
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
+
+from api.book_index import BookIndex, get_book_index
+from api.circuit_breaker import get_breaker
+from api.http_client import get_session
+from api.response_cache import ResponseCache, get_response_cache
+from utils.singleflight import SingleFlight
+
+# Tiempo durante el que se reutilizan las respuestas sin revalidar
+SEARCH_TTL = 24 * 60 * 60  # 1 día
+DETAILS_TTL = 7 * 24 * 60 * 60  # 1 semana
+
+# Búsquedas simultáneas como máximo y plazo total (en segundos) para todas ellas
+MAX_CONCURRENT_SEARCHES = 6
+SEARCH_DEADLINE = 8.0
+
+# Búsquedas idénticas simultáneas comparten una única petición
+_flight = SingleFlight()
+
+# Campos de search.json que realmente se usan
+SEARCH_FIELDS = "title,author_name,first_publish_year,subject,cover_i"
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def iter_search_docs(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """
+    Decodifica de forma incremental los documentos de una respuesta de search.json.
+    
+    Cada elemento del arreglo "docs" se entrega en cuanto termina de llegar, sin
+    esperar ni decodificar el resto del cuerpo. Quien consume el generador puede
+    detenerse cuando ya tiene suficientes documentos.
+    
+    Args:
+        chunks: Fragmentos del cuerpo de la respuesta (ya descomprimidos)
+        
+    Yields:
+        Cada documento del arreglo "docs"
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    in_docs = False
+    
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        
+        if not in_docs:
+            # "docs" precede en la respuesta a las claves con texto libre como "q"
+            key = buffer.find('"docs"')
+            start = buffer.find("[", key) if key != -1 else -1
+            if start == -1:
+                buffer = buffer[key:] if key != -1 else buffer[-len('"docs"'):]
+                continue
+            buffer = buffer[start + 1:]
+            in_docs = True
+        
+        while True:
+            buffer = buffer.lstrip(" \t\r\n,")
+            if not buffer:
+                break
+            if buffer[0] == "]":
+                return
+            try:
+                doc, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break  # El documento aún no ha llegado completo
+            yield doc
+            buffer = buffer[end:]
+
 
 class BooksAPI:
     """Clase para interactuar con la API de OpenLibrary."""
     
-    def __init__(self):
+    def __init__(self, session=None, cache: Optional[ResponseCache] = None, index: Optional[BookIndex] = None):
         self.base_url = "https://openlibrary.org/api"
+        # Sesión HTTP compartida (pool de conexiones, keep-alive y timeouts)
+        self.session = session or get_session(retries=0)
+        # Caché persistente de respuestas de OpenLibrary
+        self.cache = cache or get_response_cache("openlibrary_cache")
+        # Índice local con los libros ya descargados, para buscar sin conexión
+        self.index = index or get_book_index()
         
-    def search_books(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    def search_books(self, query: str, limit: int = 5, timeout=None) -> List[Dict[str, Any]]:
         """
         Busca libros por título, autor o tema.
         
         Args:
             query: Término de búsqueda
             limit: Número máximo de resultados
+            timeout: Timeout de la petición (por defecto el de la sesión compartida)
             
         Returns:
             Lista de libros encontrados
         """
         try:
-            url = f"https://openlibrary.org/search.json"
+            url = "https://openlibrary.org/search.json"
             params = {
                 "q": query,
-                "limit": limit
+                "limit": limit,
+                "fields": SEARCH_FIELDS
             }
             
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                data = response.json()
-                results = []
-                
-                for doc in data.get("docs", [])[:limit]:
-                    book = {
-                        "title": doc.get("title", "Sin título"),
-                        "authors": [author for author in doc.get("author_name", ["Autor desconocido"])],
-                        "year": doc.get("first_publish_year", "Año desconocido"),
-                        "subjects": doc.get("subject", [])[:5] if doc.get("subject") else [],
-                    }
-                    
-                    # Agregar URL de la portada si está disponible
-                    if doc.get("cover_i"):
-                        book["cover_url"] = f"https://covers.openlibrary.org/b/id/{doc['cover_i']}-M.jpg"
-                    
-                    results.append(book)
-                
-                return results
-            
-            return []
+            # El timeout forma parte de la clave: quien pide un timeout corto no espera a una llamada más larga
+            results = _flight.do(("search", query, limit, timeout), self.cache.get_json, url, params, ttl=SEARCH_TTL,
+                                 parse=lambda response: self._index_books(self._parse_search_stream(response, limit)),
+                                 timeout=timeout, breaker=get_breaker("openlibrary.search"))
+            if results is None:
+                return self.search_local(query, limit)
+            return results
         except Exception as e:
             print(f"Error al buscar libros: {str(e)}")
+            # Sin conexión: responder con los libros guardados en el índice local
+            return self.search_local(query, limit)
+    
+    def search_local(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Busca libros en el índice local, sin acceder a la red.
+        
+        Args:
+            query: Término de búsqueda
+            limit: Número máximo de resultados
+            
+        Returns:
+            Lista de libros ordenados por relevancia
+        """
+        try:
+            return self.index.search(query, limit)
+        except Exception as e:
+            print(f"Error al buscar en el índice local: {str(e)}")
             return []
     
-    def get_book_by_subject(self, subject: str, limit: int = 5) -> List[Dict[str, Any]]:
+    def _index_books(self, books: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Añade al índice local los libros recién descargados y los devuelve."""
+        try:
+            self.index.add_books(books)
+        except Exception as e:
+            print(f"Error al actualizar el índice local: {str(e)}")
+        return books
+    
+    @classmethod
+    def _parse_search_stream(cls, response, limit: int) -> List[Dict[str, Any]]:
+        """Decodifica la respuesta de search.json a medida que llega y se detiene al tener `limit` libros."""
+        docs = []
+        for doc in iter_search_docs(response.iter_content(chunk_size=STREAM_CHUNK_SIZE)):
+            docs.append(doc)
+            if len(docs) >= limit:
+                break
+        return cls._parse_search({"docs": docs}, limit)
+    
+    @staticmethod
+    def _parse_search(data: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+        """Extrae los campos relevantes de una respuesta de search.json."""
+        results = []
+        
+        for doc in data.get("docs", [])[:limit]:
+            book = {
+                "title": doc.get("title", "Sin título"),
+                "authors": [author for author in doc.get("author_name", ["Autor desconocido"])],
+                "year": doc.get("first_publish_year", "Año desconocido"),
+                "subjects": doc.get("subject", [])[:5] if doc.get("subject") else [],
+            }
+            
+            # Agregar URL de la portada si está disponible
+            if doc.get("cover_i"):
+                book["cover_url"] = f"https://covers.openlibrary.org/b/id/{doc['cover_i']}-M.jpg"
+            
+            results.append(book)
+        
+        return results
+    
+    def get_book_by_subject(self, subject: str, limit: int = 5, timeout=None) -> List[Dict[str, Any]]:
         """
         Obtiene libros por tema/materia.
         
         Args:
             subject: Tema o materia
             limit: Número máximo de resultados
+            timeout: Timeout de la petición (por defecto el de la sesión compartida)
             
         Returns:
             Lista de libros encontrados
         """
         # Usamos el endpoint de búsqueda con el tema como consulta
-        return self.search_books(f"subject:{subject}", limit)
+        return self.search_books(f"subject:{subject}", limit, timeout=timeout)
+    
+    def iter_books_by_subjects(self, subjects: Iterable[str], limit: int = 5,
+                               max_workers: int = MAX_CONCURRENT_SEARCHES,
+                               deadline: float = SEARCH_DEADLINE) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Busca libros para varias materias a la vez.
+        
+        Las consultas se lanzan en paralelo (como máximo `max_workers` a la vez) y
+        los resultados se entregan a medida que termina cada materia, de modo que
+        la latencia total es aproximadamente la de la búsqueda más lenta.
+        
+        Args:
+            subjects: Materias a buscar
+            limit: Número máximo de resultados por materia
+            max_workers: Número máximo de búsquedas simultáneas
+            deadline: Segundos que pueden tardar en total todas las búsquedas
+            
+        Yields:
+            Tuplas (materia, libros). Las materias que no responden dentro del plazo
+            se entregan al final con una lista vacía.
+        """
+        subjects = list(dict.fromkeys(subjects))
+        if not subjects:
+            return
+        
+        # Cada petición usa el timeout de su circuit breaker (el presupuesto de
+        # latencia de OpenLibrary); el plazo global limita la espera total.
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(subjects)),
+                                      thread_name_prefix="books-search")
+        futures = {
+            executor.submit(self.get_book_by_subject, subject, limit): subject
+            for subject in subjects
+        }
+        pending = set(futures)
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                pending.discard(future)
+                yield futures[future], future.result()
+        except TimeoutError:
+            for future in pending:
+                future.cancel()
+                yield futures[future], []
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
     
     def get_book_details(self, olid: str) -> Optional[Dict[str, Any]]:
         """
@@ -77,25 +242,24 @@ class BooksAPI:
         """
         try:
             url = f"https://openlibrary.org/works/{olid}.json"
-            response = requests.get(url)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Extraer información relevante
-                book_details = {
-                    "title": data.get("title", "Sin título"),
-                    "description": data.get("description", "Sin descripción"),
-                    "subjects": data.get("subjects", [])[:10] if data.get("subjects") else [],
-                }
-                
-                # Intentar obtener la portada
-                if data.get("covers") and len(data["covers"]) > 0:
-                    book_details["cover_url"] = f"https://covers.openlibrary.org/b/id/{data['covers'][0]}-L.jpg"
-                
-                return book_details
-            
-            return None
+            return _flight.do(("details", olid), self.cache.get_json, url, ttl=DETAILS_TTL,
+                              parse=lambda response: self._parse_details(response.json()),
+                              breaker=get_breaker("openlibrary.works"))
         except Exception as e:
             print(f"Error al obtener detalles del libro: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    @staticmethod
+    def _parse_details(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extrae los campos relevantes de la respuesta de una obra."""
+        book_details = {
+            "title": data.get("title", "Sin título"),
+            "description": data.get("description", "Sin descripción"),
+            "subjects": data.get("subjects", [])[:10] if data.get("subjects") else [],
+        }
+        
+        # Intentar obtener la portada
+        if data.get("covers") and len(data["covers"]) > 0:
+            book_details["cover_url"] = f"https://covers.openlibrary.org/b/id/{data['covers'][0]}-L.jpg"
+        
+        return book_details
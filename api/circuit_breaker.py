@@ -0,0 +1,180 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_LATENCY_BUDGET = 2.5  # Segundos que puede tardar una llamada
+DEFAULT_RESET_TIMEOUT = 30.0  # Segundos en estado abierto antes de probar de nuevo
+CONNECT_TIMEOUT = 2.0
+
+
+class CircuitOpenError(Exception):
+    """Se lanza cuando el circuito está abierto y la llamada no se intenta."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker para un endpoint externo.
+
+    - Cerrado: las llamadas pasan. Cada fallo o respuesta más lenta que el
+      presupuesto de latencia suma un fallo consecutivo; al llegar al umbral
+      el circuito se abre.
+    - Abierto: las llamadas fallan al instante con CircuitOpenError para que
+      el llamador use su alternativa sin esperar.
+    - Semiabierto: pasado `reset_timeout` se deja pasar una única llamada de
+      prueba; si va bien el circuito se cierra y si no vuelve a abrirse.
+    """
+
+    def __init__(self, name: str,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 latency_budget: float = DEFAULT_LATENCY_BUDGET,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        """
+        Inicializa el breaker.
+
+        Args:
+            name: Nombre del endpoint (para métricas y mensajes)
+            failure_threshold: Fallos consecutivos que abren el circuito
+            latency_budget: Segundos máximos por llamada
+            reset_timeout: Segundos que el circuito permanece abierto
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_budget = latency_budget
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        # Métricas acumuladas
+        self._calls = 0
+        self._failures = 0
+        self._slow_calls = 0
+        self._short_circuits = 0
+        self._trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def timeout(self) -> Tuple[float, float]:
+        """Timeout (conexión, lectura) que respeta el presupuesto de latencia."""
+        return (min(CONNECT_TIMEOUT, self.latency_budget), self.latency_budget)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Ejecuta `fn` protegida por el breaker.
+
+        Raises:
+            CircuitOpenError: Si el circuito está abierto
+        """
+        probe = self._before_call()
+
+        start = time.monotonic()
+        try:
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                self._record(probe, success=False, slow=False)
+                raise
+
+            slow = time.monotonic() - start > self.latency_budget
+            self._record(probe, success=not slow, slow=slow)
+            return result
+        finally:
+            if probe:
+                # Con una BaseException (KeyboardInterrupt, un worker cancelado) no se
+                # registra nada, pero la siguiente llamada debe poder hacer de prueba
+                with self._lock:
+                    self._probe_in_flight = False
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def _before_call(self) -> bool:
+        """Decide si la llamada puede pasar. Devuelve True si es la llamada de prueba."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                self._calls += 1
+                return False
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._calls += 1
+                return True
+            self._short_circuits += 1
+        raise CircuitOpenError(f"Circuito abierto para {self.name}")
+
+    def _record(self, probe: bool, success: bool, slow: bool):
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+            if slow:
+                self._slow_calls += 1
+
+            if success:
+                self._consecutive_failures = 0
+                if probe:
+                    self._state = CLOSED
+                    print(f"Circuito cerrado para {self.name}.")
+                return
+
+            self._failures += 1
+            self._consecutive_failures += 1
+            if probe or self._consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._trips += 1
+                    print(f"Circuito abierto para {self.name} tras {self._consecutive_failures} fallos.")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Devuelve el estado y los contadores del breaker."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._current_state(),
+                "calls": self._calls,
+                "failures": self._failures,
+                "slow_calls": self._slow_calls,
+                "short_circuits": self._short_circuits,
+                "trips": self._trips,
+                "consecutive_failures": self._consecutive_failures,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **config) -> CircuitBreaker:
+    """
+    Devuelve el breaker compartido de un endpoint, creándolo si no existe.
+
+    Args:
+        name: Nombre del endpoint
+        config: Parámetros de CircuitBreaker usados solo al crearlo
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **config)
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_metrics(name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Devuelve las métricas de todos los breakers (o solo del indicado)."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b.metrics() for b in breakers if name is None or b.name == name]
@@ -0,0 +1,108 @@
+import threading
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Tiempos de espera por defecto (conexión, lectura) en segundos
+DEFAULT_TIMEOUT: Tuple[float, float] = (3.05, 10)
+
+# Reintentos acotados con espera exponencial: 0.3s, 0.6s, 1.2s...
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.3
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Conexiones reutilizables por host
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+
+
+class TimeoutSession(requests.Session):
+    """Sesión de requests que aplica un timeout por defecto a cada petición."""
+
+    def __init__(self, timeout: Tuple[float, float] = DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def create_session(timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                   retries: int = DEFAULT_RETRIES,
+                   backoff_factor: float = DEFAULT_BACKOFF,
+                   pool_connections: int = POOL_CONNECTIONS,
+                   pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
+    """
+    Crea una sesión HTTP con pool de conexiones, keep-alive y reintentos.
+
+    Args:
+        timeout: Tupla (conexión, lectura) en segundos
+        retries: Número máximo de reintentos por petición
+        backoff_factor: Factor de espera exponencial entre reintentos
+        pool_connections: Número de hosts distintos que se mantienen en el pool
+        pool_maxsize: Conexiones abiertas como máximo por host
+
+    Returns:
+        Sesión de requests configurada
+    """
+    session = TimeoutSession(timeout)
+
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    session.headers.update({
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+        "User-Agent": "EduTracker/1.0",
+    })
+    return session
+
+
+_sessions: Dict[int, requests.Session] = {}
+_session_lock = threading.Lock()
+
+
+def get_session(retries: int = DEFAULT_RETRIES) -> requests.Session:
+    """
+    Devuelve la sesión HTTP compartida por todos los clientes de APIs.
+
+    La sesión se crea la primera vez que se solicita, de modo que las
+    conexiones TCP/TLS abiertas se reutilizan entre llamadas.
+
+    Args:
+        retries: Reintentos automáticos. Los endpoints protegidos por un
+                 circuit breaker usan 0 para que el presupuesto de latencia
+                 de cada llamada no se multiplique con los reintentos.
+    """
+    session = _sessions.get(retries)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retries)
+            if session is None:
+                session = create_session(retries=retries)
+                _sessions[retries] = session
+    return session
+
+
+def close_session() -> None:
+    """Cierra las sesiones compartidas y libera sus conexiones."""
+    with _session_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,29 @@
+"""Corpus local de frases motivacionales, disponible sin conexión."""
+
+# Algunas citas predeterminadas por si la API falla
+DEFAULT_QUOTES = [
+    {"quote": "La educación es el arma más poderosa que puedes usar para cambiar el mundo.", "author": "Nelson Mandela"},
+    {"quote": "La educación es el pasaporte hacia el futuro, el mañana pertenece a aquellos que se preparan para él en el día de hoy.", "author": "Malcolm X"},
+    {"quote": "El aprendizaje es como remar contra corriente: en cuanto se deja, se retrocede.", "author": "Edward Benjamin Britten"},
+]
+
+# Frases relacionadas con el estudio
+STUDY_QUOTES = [
+    {"quote": "El estudio es la forja que da forma al carácter.", "author": "Anónimo"},
+    {"quote": "Estudiar es aprender a ver con nuevos ojos.", "author": "Anónimo"},
+    {"quote": "No dejes para mañana lo que puedas estudiar hoy.", "author": "Adaptación"},
+    {"quote": "El conocimiento es el único tesoro que crece cuando se comparte.", "author": "Anónimo"},
+    {"quote": "La disciplina es el puente entre metas y logros.", "author": "Jim Rohn"}
+]
+
+# Frases relacionadas con la motivación
+MOTIVATION_QUOTES = [
+    {"quote": "El éxito no es la clave de la felicidad. La felicidad es la clave del éxito.", "author": "Albert Schweitzer"},
+    {"quote": "El único modo de hacer un gran trabajo es amar lo que haces.", "author": "Steve Jobs"},
+    {"quote": "No cuentes los días, haz que los días cuenten.", "author": "Muhammad Ali"},
+    {"quote": "El mejor momento para plantar un árbol fue hace 20 años. El segundo mejor momento es ahora.", "author": "Proverbio chino"},
+    {"quote": "El fracaso es la oportunidad de comenzar de nuevo, pero más inteligentemente.", "author": "Henry Ford"}
+]
+
+# Corpus local completo, disponible sin conexión
+LOCAL_QUOTES = DEFAULT_QUOTES + STUDY_QUOTES + MOTIVATION_QUOTES
@@ -0,0 +1,106 @@
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from api.quote_corpus import LOCAL_QUOTES
+from api.quote_store import get_quote_store
+from api.quotes_api import QuotesAPI
+
+BUFFER_CAPACITY = 50
+BATCH_SIZE = 20
+LOW_WATERMARK = 10
+RETRY_AFTER_FAILURE = 5 * 60  # Segundos sin volver a pedir frases tras un fallo
+
+
+class QuoteProvider:
+    """
+    Proveedor de frases motivacionales que nunca bloquea a quien las muestra.
+
+    Mantiene un buffer circular de frases descargadas por adelantado. Cuando
+    quedan pocas, un hilo en segundo plano pide un nuevo lote a la API. Si el
+    buffer está vacío (sin conexión o al arrancar) se usa el corpus local, de
+    modo que `get_quote` es siempre una lectura en memoria.
+    """
+
+    def __init__(self, quotes_api: Optional[QuotesAPI] = None,
+                 capacity: int = BUFFER_CAPACITY,
+                 batch_size: int = BATCH_SIZE,
+                 low_watermark: int = LOW_WATERMARK):
+        """
+        Inicializa el proveedor y lanza la primera recarga en segundo plano.
+
+        Args:
+            quotes_api: Cliente de la API de frases
+            capacity: Tamaño máximo del buffer
+            batch_size: Frases que se piden en cada recarga
+            low_watermark: Número de frases restantes que dispara una recarga
+        """
+        self.quotes_api = quotes_api or QuotesAPI()
+        self.batch_size = batch_size
+        self.low_watermark = low_watermark
+        self._buffer = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._retry_at = 0.0
+
+        local = list(LOCAL_QUOTES)
+        random.shuffle(local)
+        self._local = itertools.cycle(local)
+
+        self._request_refill()
+
+    def get_quote(self) -> Dict[str, str]:
+        """
+        Devuelve una frase sin acceder a la red.
+
+        Returns:
+            Diccionario con la frase y el autor
+        """
+        try:
+            quote = self._buffer.popleft()
+        except IndexError:
+            with self._lock:
+                quote = next(self._local)
+
+        if len(self._buffer) < self.low_watermark:
+            self._request_refill()
+        return quote
+
+    def _request_refill(self):
+        """Lanza una recarga en segundo plano si no hay otra en curso."""
+        with self._lock:
+            if self._refilling or time.monotonic() < self._retry_at:
+                return
+            self._refilling = True
+
+        threading.Thread(target=self._refill, name="quote-prefetch", daemon=True).start()
+
+    def _refill(self):
+        """Descarga un lote de frases y lo añade al buffer."""
+        try:
+            quotes = self.quotes_api.get_random_quotes(self.batch_size)
+            self._buffer.extend(quotes)
+            if not quotes:
+                self._retry_at = time.monotonic() + RETRY_AFTER_FAILURE
+            else:
+                # Las frases descargadas pasan a formar parte del corpus local
+                get_quote_store().add_quotes(quotes, source="api")
+        finally:
+            with self._lock:
+                self._refilling = False
+
+
+_provider: Optional[QuoteProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_quote_provider() -> QuoteProvider:
+    """Devuelve el proveedor de frases compartido por la CLI y la GUI."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = QuoteProvider()
+        return _provider
@@ -0,0 +1,179 @@
+import hashlib
+import sqlite3
+import threading
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional
+
+from api.quote_corpus import LOCAL_QUOTES
+from utils.storage import data_dir
+
+
+class QuoteStore:
+    """
+    Corpus local e indexado de frases, compartido entre procesos.
+
+    Reúne las frases predeterminadas, las de cada tema y las descargadas en
+    el pasado en un archivo SQLite. La frase del día se elige con un hash de
+    la fecha (sin tocar el generador aleatorio global) y se guarda, de modo
+    que la CLI, la GUI y cualquier servidor muestran la misma frase aunque el
+    corpus crezca durante el día.
+    """
+
+    def __init__(self, path=None):
+        """
+        Inicializa el almacén y carga el corpus local.
+
+        Args:
+            path: Ruta del archivo SQLite
+        """
+        self.path = str(path or data_dir() / "quotes.sqlite3")
+        self._lock = threading.Lock()
+        self._daily_cache = {}  # fecha ISO -> frase
+        self._refresh_checked = None  # última fecha en la que se intentó reservar la actualización
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS quotes (
+                    id INTEGER PRIMARY KEY,
+                    quote TEXT NOT NULL,
+                    author TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    UNIQUE (quote, author)
+                )
+            """)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.add_quotes(LOCAL_QUOTES, source="local")
+
+    def add_quotes(self, quotes: Iterable[Dict[str, str]], source: str = "api") -> int:
+        """
+        Añade frases al corpus ignorando las repetidas.
+
+        Args:
+            quotes: Diccionarios con las claves "quote" y "author"
+            source: Origen de las frases
+
+        Returns:
+            Número de frases nuevas
+        """
+        rows = [
+            (q["quote"], q.get("author") or "Anónimo", source)
+            for q in quotes if q.get("quote")
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO quotes (quote, author, source) VALUES (?, ?, ?)", rows)
+            return self._conn.total_changes - before
+
+    def count(self) -> int:
+        """Devuelve el número de frases del corpus."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+
+    def get_daily_quote(self, day: Optional[date] = None) -> Dict[str, str]:
+        """
+        Devuelve la frase del día.
+
+        La primera consulta del día elige la frase con un hash de la fecha y la
+        guarda; las siguientes (en este o en otro proceso) leen la elección guardada.
+
+        Args:
+            day: Fecha (por defecto hoy)
+
+        Returns:
+            Diccionario con la frase y el autor
+        """
+        key = (day or date.today()).isoformat()
+        quote = self._daily_cache.get(key)
+        if quote is not None:
+            return quote
+
+        with self._lock, self._conn:
+            row = self._stored_daily_quote(key)
+            if row is None:
+                total = self._conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+                offset = int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big") % total
+                quote_id = self._conn.execute(
+                    "SELECT id FROM quotes ORDER BY id LIMIT 1 OFFSET ?", (offset,)
+                ).fetchone()[0]
+                # Si otro proceso ya eligió la frase de hoy, se respeta su elección
+                self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+                                   (f"daily:{key}", str(quote_id)))
+                row = self._stored_daily_quote(key)
+
+        quote = {"quote": row[0], "author": row[1]}
+        self._daily_cache = {key: quote}
+        return quote
+
+    def _stored_daily_quote(self, key: str):
+        """Lee la frase elegida para una fecha, si ya existe."""
+        return self._conn.execute(
+            "SELECT q.quote, q.author FROM meta m JOIN quotes q ON q.id = CAST(m.value AS INTEGER) "
+            "WHERE m.key = ?", (f"daily:{key}",)
+        ).fetchone()
+
+    def claim_daily_refresh(self, day: Optional[date] = None) -> bool:
+        """
+        Reserva la actualización diaria del corpus.
+
+        Devuelve True solo la primera vez que se llama en el día entre todos
+        los procesos que comparten el archivo. Si la actualización falla, hay
+        que liberar la reserva con `release_daily_refresh`.
+        """
+        key = (day or date.today()).isoformat()
+        if self._refresh_checked == key:
+            return False
+        self._refresh_checked = key
+        with self._lock, self._conn:
+            cursor = self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+                                        (f"refreshed:{key}", key))
+            return cursor.rowcount == 1
+
+    def release_daily_refresh(self, day: Optional[date] = None):
+        """Libera la reserva del día para que otro intento (de este u otro proceso) la repita."""
+        key = (day or date.today()).isoformat()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM meta WHERE key = ?", (f"refreshed:{key}",))
+        if self._refresh_checked == key:
+            self._refresh_checked = None
+
+    def refresh_in_background(self, fetch: Callable[[], List[Dict[str, str]]]):
+        """
+        Descarga nuevas frases como mucho una vez al día, sin bloquear.
+
+        Si la descarga falla (p. ej., sin conexión al arrancar), la reserva se
+        libera y se vuelve a intentar en la siguiente llamada.
+
+        Args:
+            fetch: Función que devuelve una lista de frases desde la API
+                   (vacía si hubo un error)
+        """
+        day = date.today()
+        if not self.claim_daily_refresh(day):
+            return
+
+        def refresh():
+            try:
+                quotes = fetch()
+                if not quotes:
+                    raise RuntimeError("la API no devolvió frases")
+                self.add_quotes(quotes, source="api")
+            except Exception as e:
+                print(f"Error al actualizar el corpus de frases: {str(e)}")
+                self.release_daily_refresh(day)
+
+        threading.Thread(target=refresh, name="quote-store-refresh", daemon=True).start()
+
+
+_store: Optional[QuoteStore] = None
+_store_lock = threading.Lock()
+
+
+def get_quote_store() -> QuoteStore:
+    """Devuelve el almacén de frases compartido."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = QuoteStore()
+        return _store
@@ -1,18 +1,40 @@
-import requests
 import random
-from datetime import datetime
+
+from api.circuit_breaker import get_breaker
+from api.http_client import get_session
+from api.quote_corpus import DEFAULT_QUOTES, STUDY_QUOTES, MOTIVATION_QUOTES
+from api.quote_store import get_quote_store
+from utils.singleflight import SingleFlight
+
+QUOTABLE_URL = "https://api.quotable.io"
+QUOTE_TAGS = "education,learning"
+
+# Peticiones idénticas simultáneas comparten una única llamada a la API
+_flight = SingleFlight()
 
 class QuotesAPI:
     """Clase para interactuar con la API de ZenQuotes."""
     
-    def __init__(self):
+    def __init__(self, session=None):
+        # Sesión HTTP compartida (pool de conexiones, keep-alive y timeouts).
+        # Sin reintentos: las llamadas se protegen con un circuit breaker.
+        self.session = session or get_session(retries=0)
+        self.breaker = get_breaker("quotable")
+        
         # Algunas citas predeterminadas por si la API falla
-        self.default_quotes = [
-            {"quote": "La educación es el arma más poderosa que puedes usar para cambiar el mundo.", "author": "Nelson Mandela"},
-            {"quote": "La educación es el pasaporte hacia el futuro, el mañana pertenece a aquellos que se preparan para él en el día de hoy.", "author": "Malcolm X"},
-            {"quote": "El aprendizaje es como remar contra corriente: en cuanto se deja, se retrocede.", "author": "Edward Benjamin Britten"},
-        ]
+        self.default_quotes = list(DEFAULT_QUOTES)
         
+    def _get_json(self, url: str, params=None):
+        """
+        Hace una petición GET y devuelve el cuerpo JSON, o lanza una excepción si falla.
+        
+        Con el circuito abierto falla al instante (CircuitOpenError) y el llamador
+        pasa directamente a las frases locales.
+        """
+        response = self.breaker.call(self.session.get, url, params=params, timeout=self.breaker.timeout())
+        response.raise_for_status()
+        return response.json()
+    
     def get_random_quote(self):
         """
         Obtiene una frase motivacional aleatoria.
@@ -21,9 +43,7 @@ class QuotesAPI:
             Diccionario con la frase y el autor, o None si hay un error
         """
         try:
-            response = requests.get("https://api.quotable.io/random?tags=education,learning")
-            response.raise_for_status()
-            data = response.json()
+            data = _flight.do("random", self._get_json, f"{QUOTABLE_URL}/random", {"tags": QUOTE_TAGS})
             return {
                 "quote": data.get("content"),
                 "author": data.get("author")
@@ -32,36 +52,62 @@ class QuotesAPI:
             # Fallback a citas predeterminadas
             return random.choice(self.default_quotes)
     
-    def get_daily_quote(self):
+    def get_random_quotes(self, count: int):
         """
-        Obtiene la frase motivacional del día.
+        Obtiene varias frases aleatorias en una sola petición.
         
+        Args:
+            count: Número de frases a pedir
+            
         Returns:
-            Diccionario con la frase y el autor, o None si hay un error
+            Lista de diccionarios con frases y autores (vacía si hay un error)
         """
-        # Usar la fecha actual como semilla para tener la misma cita durante todo el día
-        day_of_year = datetime.now().timetuple().tm_yday
-        random.seed(day_of_year)
         try:
-            response = requests.get("https://api.quotable.io/quotes?tags=education,learning&limit=20")
-            response.raise_for_status()
-            data = response.json()
-            quotes = data.get("results", [])
-            if quotes:
-                quote_index = day_of_year % len(quotes)
-                quote = quotes[quote_index]
-                random.seed()  # Restablecer la semilla
-                return {
-                    "quote": quote.get("content"),
-                    "author": quote.get("author")
-                }
+            params = {"tags": QUOTE_TAGS, "limit": count}
+            quotes = _flight.do(("random", count), self._get_json, f"{QUOTABLE_URL}/quotes/random", params)
+            return [
+                {"quote": data.get("content"), "author": data.get("author")}
+                for data in quotes
+                if data.get("content")
+            ]
         except Exception:
-            pass
+            return []
+    
+    def fetch_quotes(self, limit: int = 20):
+        """
+        Descarga una página de frases sobre educación y aprendizaje.
+        
+        Args:
+            limit: Número máximo de frases
             
-        # Fallback a citas predeterminadas
-        quote = self.default_quotes[day_of_year % len(self.default_quotes)]
-        random.seed()  # Restablecer la semilla
-        return quote
+        Returns:
+            Lista de diccionarios con frases y autores (vacía si hay un error)
+        """
+        try:
+            params = {"tags": QUOTE_TAGS, "limit": limit}
+            data = _flight.do(("quotes", limit), self._get_json, f"{QUOTABLE_URL}/quotes", params)
+            return [
+                {"quote": quote.get("content"), "author": quote.get("author")}
+                for quote in data.get("results", [])
+                if quote.get("content")
+            ]
+        except Exception:
+            return []
+    
+    def get_daily_quote(self):
+        """
+        Obtiene la frase motivacional del día.
+        
+        La frase sale del corpus local compartido, así que es la misma durante
+        todo el día en cualquier proceso y no requiere acceso a la red. Las
+        frases nuevas se descargan como mucho una vez al día en segundo plano.
+        
+        Returns:
+            Diccionario con la frase y el autor
+        """
+        store = get_quote_store()
+        store.refresh_in_background(self.fetch_quotes)
+        return store.get_daily_quote()
     
     def get_quotes_by_topic(self, topic: str):
         """
@@ -76,32 +122,14 @@ class QuotesAPI:
         # Nota: En la API gratuita de ZenQuotes no hay búsqueda por tema
         # Esta es una implementación simulada
         
-        # Lista de frases relacionadas con el estudio
-        study_quotes = [
-            {"quote": "El estudio es la forja que da forma al carácter.", "author": "Anónimo"},
-            {"quote": "Estudiar es aprender a ver con nuevos ojos.", "author": "Anónimo"},
-            {"quote": "No dejes para mañana lo que puedas estudiar hoy.", "author": "Adaptación"},
-            {"quote": "El conocimiento es el único tesoro que crece cuando se comparte.", "author": "Anónimo"},
-            {"quote": "La disciplina es el puente entre metas y logros.", "author": "Jim Rohn"}
-        ]
-        
-        # Lista de frases relacionadas con la motivación
-        motivation_quotes = [
-            {"quote": "El éxito no es la clave de la felicidad. La felicidad es la clave del éxito.", "author": "Albert Schweitzer"},
-            {"quote": "El único modo de hacer un gran trabajo es amar lo que haces.", "author": "Steve Jobs"},
-            {"quote": "No cuentes los días, haz que los días cuenten.", "author": "Muhammad Ali"},
-            {"quote": "El mejor momento para plantar un árbol fue hace 20 años. El segundo mejor momento es ahora.", "author": "Proverbio chino"},
-            {"quote": "El fracaso es la oportunidad de comenzar de nuevo, pero más inteligentemente.", "author": "Henry Ford"}
-        ]
-        
         # Seleccionar lista basada en el tema
         if topic.lower() in ["estudio", "estudiar", "study"]:
-            quotes = study_quotes
+            quotes = list(STUDY_QUOTES)
         elif topic.lower() in ["motivación", "motivacion", "motivation"]:
-            quotes = motivation_quotes
+            quotes = list(MOTIVATION_QUOTES)
         else:
             # Si no hay coincidencia, devolver una mezcla
-            quotes = study_quotes + motivation_quotes
+            quotes = STUDY_QUOTES + MOTIVATION_QUOTES
             random.shuffle(quotes)
             quotes = quotes[:5]  # Limitar a 5 resultados
             
@@ -0,0 +1,216 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlencode
+
+from api.circuit_breaker import CircuitBreaker
+from api.http_client import get_session
+from utils.storage import data_dir
+
+DEFAULT_TTL = 24 * 60 * 60  # 1 día
+DEFAULT_MAX_ENTRIES = 2000
+
+
+class ResponseCache:
+    """
+    Caché persistente en SQLite para respuestas JSON de APIs externas.
+
+    - Las entradas frescas (dentro del TTL) se devuelven sin tocar la red.
+    - Las entradas caducadas se devuelven de inmediato y se revalidan en
+      segundo plano con If-None-Match / If-Modified-Since.
+    - Si la red falla, se sirve la última copia guardada.
+    - El tamaño está acotado: se eliminan las entradas menos usadas (LRU).
+    """
+
+    def __init__(self, path=None, max_entries: int = DEFAULT_MAX_ENTRIES, session=None):
+        """
+        Inicializa la caché.
+
+        Args:
+            path: Ruta del archivo SQLite
+            max_entries: Número máximo de respuestas guardadas
+            session: Sesión HTTP con la que se descargan las respuestas
+        """
+        self.path = str(path or data_dir() / "http_cache.sqlite3")
+        self.max_entries = max_entries
+        self.session = session or get_session()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Construye la clave de la caché a partir de la URL y los parámetros ordenados."""
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                 ttl: float = DEFAULT_TTL,
+                 parse: Optional[Callable[[Any], Any]] = None,
+                 timeout=None,
+                 breaker: Optional[CircuitBreaker] = None) -> Any:
+        """
+        Obtiene una respuesta, usando la caché cuando es posible.
+
+        Args:
+            url: URL del recurso
+            params: Parámetros de la consulta
+            ttl: Segundos durante los que una respuesta se considera fresca
+            parse: Función que convierte la respuesta HTTP en el valor a guardar
+                   (por defecto `response.json()`). El valor debe ser serializable a JSON.
+            timeout: Timeout de la petición si hay que descargarla (por defecto el de la sesión
+                     o el presupuesto de latencia del breaker)
+            breaker: Circuit breaker del endpoint. Con el circuito abierto no se
+                     intenta la descarga y se lanza CircuitOpenError si no hay copia.
+
+        Returns:
+            El valor guardado o descargado, o None si no hay datos disponibles
+        """
+        key = self.make_key(url, params)
+        entry = self._read(key)
+
+        if entry is None:
+            return self._fetch(key, url, params, parse, timeout=timeout, breaker=breaker)
+
+        if time.time() - entry["fetched_at"] > ttl:
+            # Stale-while-revalidate: devolver la copia actual y refrescar en segundo plano
+            self._schedule_refresh(key, url, params, parse, entry, breaker)
+
+        return entry["payload"]
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        """Lee una entrada y actualiza su marca de último acceso."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT payload, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+
+        return {
+            "payload": json.loads(row[0]),
+            "etag": row[1],
+            "last_modified": row[2],
+            "fetched_at": row[3],
+        }
+
+    def _schedule_refresh(self, key, url, params, parse, entry, breaker=None):
+        """Lanza una revalidación en segundo plano si no hay otra en curso para la clave."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch(key, url, params, parse, entry, breaker=breaker)
+            except Exception as e:
+                print(f"Error al revalidar la caché: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(refresh)
+
+    def _fetch(self, key, url, params, parse, entry=None, timeout=None, breaker=None):
+        """Descarga el recurso (condicionalmente si hay una copia) y guarda el resultado."""
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        if breaker is not None:
+            response = breaker.call(self._request, url, params, headers, timeout or breaker.timeout())
+        else:
+            response = self._request(url, params, headers, timeout)
+
+        if response.status_code != 200:
+            response.close()
+
+        if response.status_code == 304 and entry is not None:
+            # El recurso no cambió: solo renovar la fecha de descarga
+            with self._lock, self._conn:
+                self._conn.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key))
+            return entry["payload"]
+
+        if response.status_code != 200:
+            return entry["payload"] if entry is not None else None
+
+        try:
+            payload = parse(response) if parse else response.json()
+        finally:
+            # La respuesta se pide en modo streaming: liberar la conexión aunque
+            # el parser se haya detenido antes del final del cuerpo
+            response.close()
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(payload), response.headers.get("ETag"),
+                 response.headers.get("Last-Modified"), now, now),
+            )
+            self._evict()
+        return payload
+
+    def _request(self, url, params, headers, timeout):
+        """
+        Hace la petición; los errores 5xx se lanzan para que cuenten como fallos.
+
+        El cuerpo se lee en modo streaming para que `parse` pueda decodificarlo
+        de forma incremental.
+        """
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        response = self.session.get(url, params=params, headers=headers, stream=True, **kwargs)
+        if response.status_code >= 500:
+            response.close()
+            response.raise_for_status()
+        return response
+
+    def _evict(self):
+        """Elimina las entradas menos usadas recientemente por encima del límite."""
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        """Elimina todas las respuestas guardadas."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(name: str = "http_cache") -> ResponseCache:
+    """Devuelve la caché compartida con el nombre indicado (un archivo SQLite por nombre)."""
+    with _caches_lock:
+        if name not in _caches:
+            # Sin reintentos automáticos: los endpoints cacheados se protegen con circuit breakers
+            _caches[name] = ResponseCache(data_dir() / f"{name}.sqlite3", session=get_session(retries=0))
+        return _caches[name]
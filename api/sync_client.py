@@ -0,0 +1,190 @@
+import json
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from api.http_client import get_session
+from utils.storage import data_dir
+
+# Sesiones que se envían por petición (el servidor acepta hasta 1000)
+SYNC_BATCH_SIZE = 1000
+SYNC_TIMEOUT = (3.05, 30)
+SNAPSHOT_KINDS = ("goals", "subjects")
+
+
+class SyncClient:
+    """
+    Cliente de sincronización con el servicio HTTP para trabajar sin conexión.
+
+    Las sesiones de estudio se guardan primero en una cola local (SQLite), cada
+    una con un `client_id` propio, así que registrar una sesión funciona
+    aunque no haya red. Al recuperar la conexión, `sync` envía la cola en una
+    sola petición (por lotes de SYNC_BATCH_SIZE) y en la misma respuesta recibe
+    las metas y materias que cambiaron desde la última sincronización. Si se
+    pierde la respuesta, reenviar las mismas sesiones no las duplica.
+
+    Las metas y materias recibidas se guardan localmente para mostrarlas sin
+    conexión.
+    """
+
+    def __init__(self, base_url: str, token: str, path=None, session: Optional[requests.Session] = None,
+                 batch_size: int = SYNC_BATCH_SIZE):
+        """
+        Inicializa el cliente.
+
+        Args:
+            base_url: URL del servicio (p. ej., http://127.0.0.1:5000)
+            token: Token de sesión (el de /auth/login o el de la aplicación de escritorio)
+            path: Ruta del archivo SQLite con la cola y las copias locales
+            session: Sesión HTTP (por defecto la compartida, sin reintentos automáticos)
+            batch_size: Sesiones por petición
+        """
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.path = str(path or data_dir() / "sync.sqlite3")
+        self.session = session or get_session(retries=0)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS pending_sessions (
+                    client_id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    kind TEXT PRIMARY KEY,
+                    watermark INTEGER,
+                    data TEXT NOT NULL
+                )
+            """)
+
+    # --- Cola local ---
+
+    def log_session(self, materia: str, duracion_minutos: int, notas: str = "",
+                    fecha_hora: Optional[datetime] = None) -> str:
+        """
+        Registra una sesión en la cola local (no necesita conexión).
+
+        Returns:
+            El client_id de la sesión
+
+        Raises:
+            ValueError: Si la duración no es un número positivo (una fila que no se
+                        puede enviar bloquearía la cola)
+        """
+        if (isinstance(duracion_minutos, bool) or not isinstance(duracion_minutos, (int, float))
+                or not math.isfinite(duracion_minutos) or duracion_minutos <= 0):
+            raise ValueError(f"duración inválida: {duracion_minutos!r}")
+        client_id = uuid.uuid4().hex
+        payload = {
+            "client_id": client_id,
+            "materia": materia,
+            "duracion_minutos": duracion_minutos,
+            "notas": notas or "",
+            "fecha_hora": (fecha_hora or datetime.now()).isoformat(),
+        }
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO pending_sessions (client_id, payload, created_at) VALUES (?, ?, ?)",
+                               (client_id, json.dumps(payload, ensure_ascii=False, allow_nan=False), time.time()))
+        return client_id
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_sessions").fetchone()[0]
+
+    def _pending_batch(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM pending_sessions ORDER BY created_at LIMIT ?",
+                                      (self.batch_size,)).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    # --- Copias locales ---
+
+    def _watermarks(self) -> Dict[str, Optional[int]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, watermark FROM snapshots").fetchall()
+        return dict(rows)
+
+    def _snapshot(self, kind: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM snapshots WHERE kind = ?", (kind,)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def goals(self) -> List[Dict[str, Any]]:
+        """Metas recibidas en la última sincronización."""
+        return self._snapshot("goals")
+
+    def subjects(self) -> List[Dict[str, Any]]:
+        """Materias recibidas en la última sincronización."""
+        return self._snapshot("subjects")
+
+    # --- Sincronización ---
+
+    def _sync_once(self, sessions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Una petición /sync; aplica la respuesta en una sola transacción local."""
+        response = self.session.post(
+            f"{self.base_url}/sync",
+            json={"sessions": sessions, "watermarks": self._watermarks()},
+            headers={"Authorization": f"Bearer {self.token}"},
+            timeout=SYNC_TIMEOUT,
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        # Las rechazadas no son válidas y reenviarlas no cambiaría el resultado: se descartan
+        done = [(client_id,) for client_id in data.get("accepted", [])]
+        done += [(item["client_id"],) for item in data.get("rejected", []) if item.get("client_id")]
+        snapshots = [(kind, data["watermarks"].get(kind), json.dumps(data[kind], ensure_ascii=False))
+                     for kind in SNAPSHOT_KINDS if kind in data]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM pending_sessions WHERE client_id = ?", done)
+            self._conn.executemany("INSERT OR REPLACE INTO snapshots (kind, watermark, data) VALUES (?, ?, ?)",
+                                   snapshots)
+        return data
+
+    def sync(self) -> Dict[str, Any]:
+        """
+        Envía las sesiones pendientes y actualiza metas y materias.
+
+        Normalmente es una sola petición; solo con más de `batch_size`
+        sesiones pendientes se hacen varias. Sin conexión, la cola se conserva
+        para el siguiente intento.
+
+        Returns:
+            Resumen con las sesiones enviadas, insertadas, rechazadas y
+            pendientes, los conjuntos actualizados y, si falló, el error
+        """
+        summary = {"enviadas": 0, "insertadas": 0, "rechazadas": [], "actualizado": [], "peticiones": 0}
+        while True:
+            sessions = self._pending_batch()
+            try:
+                data = self._sync_once(sessions)
+            except (requests.RequestException, ValueError) as e:
+                print(f"No se pudo sincronizar: {e}")
+                summary["error"] = str(e)
+                break
+            summary["peticiones"] += 1
+            summary["enviadas"] += len(sessions)
+            summary["insertadas"] += data.get("inserted", 0)
+            summary["rechazadas"] += data.get("rejected", [])
+            summary["actualizado"] += [kind for kind in SNAPSHOT_KINDS if kind in data]
+            if len(sessions) < self.batch_size:
+                break
+        summary["pendientes"] = self.pending_count()
+        return summary
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
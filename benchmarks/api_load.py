@@ -0,0 +1,193 @@
+"""
+Prueba de carga del servicio HTTP (server/app.py).
+
+Registra e inicia sesión con varios usuarios de prueba, les crea un historial
+y después lanza durante --duration segundos --concurrency clientes que mezclan
+peticiones: registrar sesiones, listar sesiones (siguiendo el cursor), metas y
+estadísticas (con If-None-Match, como un cliente que sondea). Al final
+muestra, por operación y en total, las peticiones por segundo y las latencias
+p50/p99 medidas en el cliente, y el ratio de respuestas 304 del servidor.
+
+Necesita el servidor en marcha contra un mongod local:
+    mongod --dbpath /tmp/edutracker-db
+    MONGO_URI=mongodb://localhost:27017 DB_NAME=edutracker_bench python -m server.app
+
+Uso:
+    python -m benchmarks.api_load --url http://127.0.0.1:5000 --concurrency 64 --duration 30
+    python -m benchmarks.api_load --max-p99-ms 250
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import aiohttp
+
+from server.metrics import percentile
+
+SUBJECTS = ["Matemáticas", "Física", "Historia", "Química", "Inglés"]
+
+# Peso de cada operación en la mezcla de carga
+MIX = {
+    "POST /sessions": 2,
+    "GET /sessions": 4,
+    "GET /goals": 2,
+    "GET /stats": 2,
+}
+
+
+class Recorder:
+    """Latencias y errores por operación, medidos en el cliente."""
+
+    def __init__(self):
+        self.latencies = {name: [] for name in MIX}
+        self.errors = {name: 0 for name in MIX}
+
+    def record(self, name, seconds, ok):
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+
+async def setup_user(session, url, name, history):
+    """Registra un usuario, inicia sesión, le crea una meta y `history` sesiones."""
+    credentials = {"username": name, "password": "bench-password", "email": f"{name}@bench.local"}
+    async with session.post(f"{url}/auth/register", json=credentials) as response:
+        if response.status not in (201, 409):
+            raise RuntimeError(f"Registro fallido ({response.status}): {await response.text()}")
+    async with session.post(f"{url}/auth/login", json=credentials) as response:
+        if response.status != 200:
+            raise RuntimeError(f"Login fallido ({response.status}): {await response.text()}")
+        headers = {"Authorization": f"Bearer {(await response.json())['token']}"}
+
+    async with session.post(f"{url}/goals", headers=headers,
+                            json={"materia": SUBJECTS[0], "minutos_objetivo": 600, "periodo": "Semanal"}):
+        pass
+    now = datetime.now()
+    for i in range(history):
+        body = {"materia": random.choice(SUBJECTS), "duracion_minutos": random.randint(10, 120),
+                "fecha_hora": (now - timedelta(hours=i * 7)).isoformat(timespec="seconds")}
+        async with session.post(f"{url}/sessions", headers=headers, json=body) as response:
+            await response.read()
+    return headers
+
+
+# Último ETag recibido por (usuario, ruta)
+etags = {}
+
+
+async def run_operation(session, url, headers, name):
+    """Ejecuta una operación de la mezcla. Devuelve True si todas sus respuestas fueron correctas (2xx o 304)."""
+    if name == "POST /sessions":
+        body = {"materia": random.choice(SUBJECTS), "duracion_minutos": random.randint(10, 120)}
+        async with session.post(f"{url}/sessions", headers=headers, json=body) as response:
+            await response.read()
+            return response.status == 201
+    if name == "GET /sessions":
+        # Entre una y tres páginas, como un cliente que se desplaza por el historial
+        params = {"limit": "50"}
+        for _ in range(random.randint(1, 3)):
+            async with session.get(f"{url}/sessions", headers=headers, params=params) as response:
+                if response.status != 200:
+                    return False
+                cursor = (await response.json()).get("cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+        return True
+    # Como un cliente que sondea: reenvía el último ETag y con 304 reutiliza lo que tiene
+    path = "/goals" if name == "GET /goals" else "/stats"
+    key = (headers["Authorization"], path)
+    conditional = dict(headers)
+    if key in etags:
+        conditional["If-None-Match"] = etags[key]
+    async with session.get(f"{url}{path}", headers=conditional) as response:
+        await response.read()
+        if response.status == 200 and "ETag" in response.headers:
+            etags[key] = response.headers["ETag"]
+        return response.status in (200, 304)
+
+
+async def client(session, url, users, deadline, recorder):
+    names, weights = list(MIX), list(MIX.values())
+    while time.perf_counter() < deadline:
+        name = random.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            ok = await run_operation(session, url, random.choice(users), name)
+        except aiohttp.ClientError:
+            ok = False
+        recorder.record(name, time.perf_counter() - started, ok)
+
+
+async def run(args):
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        prefix = f"bench-{uuid.uuid4().hex[:6]}"
+        print(f"Preparando {args.users} usuarios con {args.history} sesiones cada uno...")
+        users = await asyncio.gather(*(setup_user(session, args.url, f"{prefix}-{i}", args.history)
+                                       for i in range(args.users)))
+
+        print(f"Carga: {args.concurrency} clientes durante {args.duration:.0f} s")
+        recorder = Recorder()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(client(session, args.url, users, deadline, recorder)
+                               for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        async with session.get(f"{args.url}/metrics") as response:
+            server_metrics = await response.json()
+    return recorder, elapsed, server_metrics
+
+
+def report(recorder, elapsed):
+    print(f"\n{'operación':<16} {'peticiones':>10} {'errores':>8} {'rps':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    everything = []
+    for name, values in recorder.latencies.items():
+        ordered = sorted(values)
+        everything.extend(ordered)
+        print(f"{name:<16} {len(ordered):>10} {recorder.errors[name]:>8} {len(ordered) / elapsed:>8.1f} "
+              f"{percentile(ordered, 0.50) * 1000:>8.1f} {percentile(ordered, 0.99) * 1000:>8.1f}")
+    everything.sort()
+    total_errors = sum(recorder.errors.values())
+    print(f"{'total':<16} {len(everything):>10} {total_errors:>8} {len(everything) / elapsed:>8.1f} "
+          f"{percentile(everything, 0.50) * 1000:>8.1f} {percentile(everything, 0.99) * 1000:>8.1f}")
+    if everything:
+        print(f"\nMedia {statistics.mean(everything) * 1000:.1f} ms en {elapsed:.1f} s")
+    return percentile(everything, 0.99) * 1000, total_errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--history", type=int, default=200, help="Sesiones previas por usuario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--max-p99-ms", type=float, help="Falla si el p99 total supera este valor")
+    args = parser.parse_args()
+
+    recorder, elapsed, server_metrics = asyncio.run(run(args))
+    p99, errors = report(recorder, elapsed)
+
+    print("\nMétricas del servidor (p50/p99 por ruta):")
+    for route, stats in server_metrics.get("rutas", {}).items():
+        print(f"  {route:<22} {stats['peticiones']:>8}  p50 {stats['p50_ms']:>7.1f} ms  p99 {stats['p99_ms']:>7.1f} ms")
+
+    for name, cache in server_metrics.get("caches", {}).items():
+        print(f"  caché {name:<16} ratio {cache['ratio']:.1%} ({cache['aciertos']} de {cache['aciertos'] + cache['fallos']})")
+
+    failed = errors > 0
+    if args.max_p99_ms is not None and p99 > args.max_p99_ms:
+        print(f"\nREGRESIÓN: el p99 ({p99:.1f} ms) supera el umbral de {args.max_p99_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compara la latencia de las peticiones HTTP con y sin pool de conexiones.
+
+Levanta un servidor local que imita la respuesta de OpenLibrary y mide el
+tiempo de N peticiones hechas con `requests.get` (una conexión nueva por
+petición) frente a la sesión compartida de `api.http_client`.
+
+Uso:
+    python -m benchmarks.http_pool --requests 200 --handshake-ms 20
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.http_client import create_session
+
+PAYLOAD = json.dumps({
+    "numFound": 5,
+    "docs": [
+        {
+            "title": f"Libro de prueba {i}",
+            "author_name": ["Autor de prueba"],
+            "first_publish_year": 2000 + i,
+            "subject": ["Matemáticas", "Álgebra", "Educación"],
+            "cover_i": 1000 + i,
+        }
+        for i in range(5)
+    ],
+}).encode("utf-8")
+PAYLOAD_GZIP = gzip.compress(PAYLOAD)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Responde a cualquier GET con un search.json de ejemplo."""
+
+    protocol_version = "HTTP/1.1"  # Permite keep-alive
+    disable_nagle_algorithm = True  # Evita el retardo de ACK entre cabeceras y cuerpo
+    handshake_delay = 0.0
+
+    def setup(self):
+        # Simula el coste del handshake TCP/TLS en cada conexión nueva
+        time.sleep(self.handshake_delay)
+        super().setup()
+
+    def do_GET(self):
+        body = PAYLOAD
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = PAYLOAD_GZIP
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(handshake_ms: float):
+    """Inicia el servidor de prueba en un puerto libre y devuelve (servidor, url)."""
+    StubHandler.handshake_delay = handshake_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/search.json"
+
+
+def measure(get, url: str, count: int):
+    """Ejecuta `count` peticiones y devuelve las latencias en milisegundos."""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = get(url, params={"q": "subject:matematicas", "limit": 5})
+        response.json()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<22} total={sum(latencies):8.1f} ms  "
+          f"p50={statistics.median(latencies):6.2f} ms  p99={p99:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por escenario")
+    parser.add_argument("--handshake-ms", type=float, default=20.0,
+                        help="Retardo simulado por cada conexión nueva")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.handshake_ms)
+    try:
+        report("sin pool (requests.get)", measure(requests.get, url, args.requests))
+        session = create_session()
+        try:
+            report("con pool (Session)", measure(session.get, url, args.requests))
+        finally:
+            session.close()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
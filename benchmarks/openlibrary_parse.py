@@ -0,0 +1,163 @@
+"""
+Compara la descarga y el parseo de search.json con y sin limitar campos.
+
+- Ruta anterior: se descarga la respuesta completa (sin `fields`) y se
+  decodifica entera con `response.json()`.
+- Ruta actual: se piden solo los campos usados (`fields`) y el cuerpo se
+  decodifica en streaming hasta tener `limit` documentos.
+
+Se informa de los bytes transferidos (comprimidos, tal como llegan por la red),
+los bytes decodificados y el tiempo de parseo. Por defecto consulta
+openlibrary.org; con --stub usa un servidor local con una respuesta sintética
+que respeta el parámetro `fields`.
+
+Uso:
+    python -m benchmarks.openlibrary_parse --query "subject:matematicas" --limit 5
+    python -m benchmarks.openlibrary_parse --stub --docs 100
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.books_api import BooksAPI, SEARCH_FIELDS, STREAM_CHUNK_SIZE, iter_search_docs
+from api.http_client import create_session
+
+OPENLIBRARY_SEARCH_URL = "https://openlibrary.org/search.json"
+
+
+def synthetic_doc(i: int):
+    """Documento con un tamaño parecido a los de OpenLibrary."""
+    return {
+        "key": f"/works/OL{i}W",
+        "title": f"Libro de prueba {i}",
+        "author_name": ["Autor de prueba", "Coautor"],
+        "author_key": ["OL1A", "OL2A"],
+        "first_publish_year": 1990 + i % 30,
+        "subject": [f"Tema {j}" for j in range(40)],
+        "isbn": [f"97800000{i:05d}{j}" for j in range(30)],
+        "publisher": [f"Editorial {j}" for j in range(15)],
+        "language": ["spa", "eng"],
+        "edition_key": [f"OL{i}{j}M" for j in range(25)],
+        "cover_i": 1000 + i,
+        "ia": [f"libro{i}_{j}" for j in range(10)],
+    }
+
+
+def start_stub_server(docs: int):
+    """Servidor local que imita search.json y respeta `limit` y `fields`."""
+    corpus = [synthetic_doc(i) for i in range(docs)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            limit = int(query.get("limit", [docs])[0])
+            result = corpus[:limit]
+            if "fields" in query:
+                fields = query["fields"][0].split(",")
+                result = [{k: v for k, v in doc.items() if k in fields} for doc in result]
+            body = json.dumps({"numFound": docs, "start": 0, "docs": result, "q": "prueba"}).encode("utf-8")
+            compress = "gzip" in self.headers.get("Accept-Encoding", "")
+            if compress:
+                body = gzip.compress(body)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            if compress:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/search.json"
+
+
+def previous_path(session, url, query, limit):
+    """Respuesta completa sin `fields`, decodificada entera."""
+    response = session.get(url, params={"q": query, "limit": limit})
+    content = response.content
+    start = time.perf_counter()
+    books = BooksAPI._parse_search(json.loads(content), limit)
+    parse_ms = (time.perf_counter() - start) * 1000
+    return response.raw.tell(), len(content), parse_ms, books
+
+
+def current_path(session, url, query, limit):
+    """Solo los campos necesarios, decodificados en streaming hasta `limit` documentos."""
+    response = session.get(url, params={"q": query, "limit": limit, "fields": SEARCH_FIELDS}, stream=True)
+    received = []
+
+    def chunks():
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            received.append(chunk)
+            yield chunk
+
+    try:
+        books = take_docs(chunks(), limit)
+        wire = response.raw.tell()
+    finally:
+        response.close()
+
+    # El parseo se mide de nuevo sobre los fragmentos recibidos para no
+    # contar el tiempo de espera de la red
+    start = time.perf_counter()
+    books = take_docs(iter(received), limit)
+    parse_ms = (time.perf_counter() - start) * 1000
+    return wire, sum(len(c) for c in received), parse_ms, books
+
+
+def take_docs(chunks, limit):
+    docs = []
+    for doc in iter_search_docs(chunks):
+        docs.append(doc)
+        if len(docs) >= limit:
+            break
+    return BooksAPI._parse_search({"docs": docs}, limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", default="subject:mathematics")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stub", action="store_true", help="Usar un servidor local en lugar de openlibrary.org")
+    parser.add_argument("--docs", type=int, default=100, help="Documentos del servidor local")
+    args = parser.parse_args()
+
+    server = None
+    url = OPENLIBRARY_SEARCH_URL
+    if args.stub:
+        server, url = start_stub_server(args.docs)
+
+    session = create_session(retries=0)
+    try:
+        for name, run in (("anterior", previous_path), ("actual", current_path)):
+            results = [run(session, url, args.query, args.limit) for _ in range(args.repeat)]
+            wire = sum(r[0] for r in results) / len(results)
+            decoded = sum(r[1] for r in results) / len(results)
+            parse_ms = sorted(r[2] for r in results)[len(results) // 2]
+            print(f"{name:<9} red={wire / 1024:8.1f} KiB  decodificado={decoded / 1024:8.1f} KiB  "
+                  f"parseo(p50)={parse_ms:7.3f} ms  libros={len(results[0][3])}")
+    finally:
+        session.close()
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Mide el coste de arranque de EduTracker y falla si supera un umbral.
+
+Cada ejecución lanza un intérprete nuevo con
+`python -X importtime -c "import main, ui.auth_gui"` (lo que se carga antes de
+poder pintar la ventana de login: `main` importa la pantalla de login al crear
+la aplicación) y suma el tiempo acumulado de importación de esos módulos. Se
+repite varias veces y se usa la mediana
+para que el resultado sea reproducible. Con --gui se mide además el tiempo hasta
+que la ventana de login está dibujada (necesita pantalla).
+
+Sale con código 1 si la mediana supera --max-import-ms (o --max-window-ms), de
+modo que se puede usar como prueba de regresión.
+
+Uso:
+    python -m benchmarks.startup --runs 7 --max-import-ms 30
+    python -m benchmarks.startup --gui --max-window-ms 600
+    python -m benchmarks.startup --module ui.gui --max-import-ms 1500 --top 15
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lo que se importa hasta poder dibujar el login
+STARTUP_MODULES = ("main", "ui.auth_gui")
+
+# Umbral por defecto para STARTUP_MODULES: unas cuatro veces la mediana medida
+# (~7 ms), para detectar que una dependencia pesada vuelva al arranque
+DEFAULT_MAX_IMPORT_MS = 30.0
+
+# import time: self [us] | cumulative | imported package
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Crea la aplicación, espera a que el login esté dibujado y sale sin entrar al bucle principal
+WINDOW_SCRIPT = """
+import time
+start = time.perf_counter()
+import main
+app = main.EduTrackerApp()
+app.update()
+print((time.perf_counter() - start) * 1000)
+app.destroy()
+"""
+
+
+def measure_imports(targets: Sequence[str]):
+    """
+    Importa los módulos de `targets` en un intérprete nuevo con -X importtime.
+
+    Returns:
+        Tupla (ms acumulados de los módulos, lista de (ms propios, módulo))
+    """
+    statement = "import " + ", ".join(targets)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo ejecutar '{statement}':\n{result.stderr[-2000:]}")
+
+    total_us = None
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append((int(self_us) / 1000, name))
+        # Los módulos pedidos aparecen en el primer nivel (sangría de un espacio); si uno
+        # ya lo importó otro de la lista, su tiempo está incluido en el de ese otro
+        if name in targets and len(indent) == 1:
+            total_us = (total_us or 0) + int(cumulative_us)
+    if total_us is None:
+        raise RuntimeError(f"No se encontró {', '.join(targets)} en la salida de -X importtime")
+    return total_us / 1000, modules
+
+
+def measure_window():
+    """Milisegundos desde el arranque del intérprete hasta ver el login dibujado."""
+    result = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo crear la ventana:\n{result.stderr[-2000:]}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", dest="modules", action="append", metavar="MODULO",
+                        help="Módulo cuyo import se mide (se puede repetir; por defecto "
+                             + " y ".join(STARTUP_MODULES) + ")")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10, help="Módulos más lentos que se muestran")
+    parser.add_argument("--max-import-ms", type=float, default=DEFAULT_MAX_IMPORT_MS,
+                        help="Umbral para la mediana del import")
+    parser.add_argument("--gui", action="store_true", help="Medir también el tiempo hasta dibujar el login")
+    parser.add_argument("--max-window-ms", type=float, default=600.0, help="Umbral para la mediana con --gui")
+    args = parser.parse_args()
+    targets = args.modules or list(STARTUP_MODULES)
+
+    # Una ejecución previa para que los .pyc ya estén compilados
+    measure_imports(targets)
+
+    totals = []
+    slowest = {}
+    for _ in range(args.runs):
+        total, modules = measure_imports(targets)
+        totals.append(total)
+        for ms, name in modules:
+            slowest.setdefault(name, []).append(ms)
+
+    median = statistics.median(totals)
+    print(f"import {', '.join(targets)}: mediana {median:.1f} ms "
+          f"(mín {min(totals):.1f}, máx {max(totals):.1f}, {args.runs} ejecuciones)")
+
+    print("\nMódulos con más tiempo propio (mediana):")
+    ranking = sorted(((statistics.median(v), name) for name, v in slowest.items()), reverse=True)
+    for ms, name in ranking[:args.top]:
+        print(f"  {ms:8.2f} ms  {name}")
+
+    failed = False
+    if median > args.max_import_ms:
+        print(f"\nREGRESIÓN: el import supera el umbral de {args.max_import_ms:.0f} ms")
+        failed = True
+
+    if args.gui:
+        windows = [measure_window() for _ in range(args.runs)]
+        window_median = statistics.median(windows)
+        print(f"\nVentana de login dibujada: mediana {window_median:.1f} ms")
+        if window_median > args.max_window_ms:
+            print(f"REGRESIÓN: la ventana supera el umbral de {args.max_window_ms:.0f} ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 import pymongo
-from pymongo.errors import ConnectionFailure
+from pymongo.errors import ConnectionFailure, DuplicateKeyError, PyMongoError
 import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from dotenv import load_dotenv
 from datetime import datetime
 import bcrypt
 from bson.objectid import ObjectId
+from utils.singleflight import SingleFlight
+from database.versions import bump_version
 
 # Cargar variables de entorno desde configuracion.env
 load_dotenv("configuracion.env")
@@ -17,6 +22,9 @@ DB_NAME = os.getenv("DB_NAME")
 client = None
 db = None
 
+# Consultas idénticas simultáneas comparten un único viaje a la base de datos
+_flight = SingleFlight()
+
 def connect_to_db():
     """
     Establece la conexión con la base de datos MongoDB.
@@ -29,61 +37,205 @@ def connect_to_db():
         client.admin.command('ping')
         print("Conexión a MongoDB exitosa.")
         db = client[DB_NAME]
+        ensure_user_indexes()
         return db
     except ConnectionFailure as e:
         print(f"Error de conexión a MongoDB. Asegúrate de que el servidor esté corriendo. Error: {e}")
         client = None
         db = None
         return None
+    except PyMongoError as e:
+        # Por ejemplo, una URI mal formada o un dominio SRV que no resuelve
+        print(f"Error en la configuración de MongoDB: {e}")
+        client = None
+        db = None
+        return None
 
 # --- Funciones de Autenticación de Usuario ---
+
+# Coste de bcrypt para los hashes nuevos. Los hashes con un coste menor se
+# rehacen de forma transparente la próxima vez que el usuario inicia sesión.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt libera el GIL mientras calcula, así que un pool de hilos acotado basta
+# para que varios logins avancen en paralelo sin bloquear el hilo de la interfaz.
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", "2"))
+
+_auth_pool = None
+_auth_pool_lock = threading.Lock()
+
+
+def _get_auth_pool():
+    """Devuelve el pool de autenticación, creándolo la primera vez."""
+    global _auth_pool
+    with _auth_pool_lock:
+        if _auth_pool is None:
+            _auth_pool = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="auth")
+        return _auth_pool
+
+
+# Mensajes de registro según el campo repetido
+DUPLICATE_USER_MESSAGES = {
+    "username": "El nombre de usuario ya existe.",
+    "email": "El correo electrónico ya está en uso.",
+}
+EMAIL_INDEX_NAMES = ("email_unique", "email_1")
+_INDEX_NAME_RE = re.compile(r"index: (\S+)")
+
+# Si los índices únicos de usuarios existen (ver ensure_user_indexes)
+_user_indexes_ready = False
+
+
+def ensure_user_indexes():
+    """
+    Crea los índices únicos de usuario y email (create_index es idempotente).
+
+    Con ellos el registro no necesita comprobar antes si el usuario existe.
+
+    Returns:
+        True si los índices existen
+    """
+    global _user_indexes_ready
+    if db is None:
+        return False
+    try:
+        db.users.create_index("username", unique=True, name="username_unique")
+        db.users.create_index("email", unique=True, name="email_unique")
+    except PyMongoError as e:
+        # Por ejemplo, si ya hay duplicados guardados de antes de existir los índices
+        print(f"No se pudieron crear los índices únicos de usuarios: {e}")
+        return False
+    _user_indexes_ready = True
+    return True
+
+
+def duplicate_user_field(error):
+    """
+    Indica qué campo ("username" o "email") repitió un registro.
+
+    Usa keyPattern/keyValue del error si el servidor los incluye; si no, el
+    nombre del índice que aparece en el mensaje. Nunca se busca en el mensaje
+    completo, que también contiene el valor repetido.
+
+    Args:
+        error: DuplicateKeyError de la inserción del usuario
+    """
+    details = error.details or {}
+    key = details.get("keyPattern") or details.get("keyValue")
+    if key:
+        return "email" if "email" in key else "username"
+    match = _INDEX_NAME_RE.search(str(error))
+    return "email" if match and match.group(1) in EMAIL_INDEX_NAMES else "username"
+
+
+def hash_password(password, rounds=None):
+    """Devuelve el hash bcrypt de una contraseña."""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds or BCRYPT_ROUNDS))
+
+
+def password_needs_rehash(hashed_password):
+    """Indica si un hash bcrypt usa un coste menor que BCRYPT_ROUNDS."""
+    try:
+        # Formato: $2b$<coste>$<sal y hash>
+        return int(hashed_password.split(b"$")[2]) < BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
 def register_user(username, password, email):
-    """Registra un nuevo usuario con contraseña hasheada."""
+    """
+    Registra un nuevo usuario con contraseña hasheada.
+
+    La unicidad de usuario y email la garantizan los índices únicos: se hace
+    una sola inserción y se interpreta el DuplicateKeyError. Si los índices no
+    se pudieron crear, se comprueba antes con consultas, como sin ellos.
+    """
     if db is None:
         return False, "La conexión a la base de datos no está establecida."
-    
-    users_collection = db.users
-    
-    # Verificar si el usuario o el email ya existen
-    if users_collection.find_one({"username": username}):
-        return False, "El nombre de usuario ya existe."
-    if users_collection.find_one({"email": email}):
-        return False, "El correo electrónico ya está en uso."
-
-    # Hashear la contraseña
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-    
+
+    if not _user_indexes_ready and not ensure_user_indexes():
+        # Sin índices únicos la inserción aceptaría duplicados
+        if db.users.find_one({"username": username}):
+            return False, DUPLICATE_USER_MESSAGES["username"]
+        if db.users.find_one({"email": email}):
+            return False, DUPLICATE_USER_MESSAGES["email"]
+
     user_data = {
         "username": username,
-        "password": hashed_password,
+        "password": hash_password(password),
         "email": email,
         "created_at": datetime.now()
     }
-    users_collection.insert_one(user_data)
+    try:
+        db.users.insert_one(user_data)
+    except DuplicateKeyError as e:
+        return False, DUPLICATE_USER_MESSAGES[duplicate_user_field(e)]
+    except PyMongoError as e:
+        print(f"Error al registrar el usuario: {e}")
+        return False, "No se pudo registrar el usuario."
     return True, "Usuario registrado con éxito."
 
+
 def check_user(username, password):
-    """Verifica las credenciales de un usuario comparando la contraseña hasheada."""
+    """
+    Verifica las credenciales de un usuario comparando la contraseña hasheada.
+
+    Si el hash se generó con un coste menor que el actual, se rehace con la
+    contraseña recién verificada y se guarda.
+    """
     if db is None:
         print("La conexión a la base de datos no está establecida.")
         return None
 
     users_collection = db.users
     user = users_collection.find_one({"username": username})
-    
+
     if user and bcrypt.checkpw(password.encode('utf-8'), user['password']):
         print(f"Usuario '{username}' autenticado correctamente.")
+        if password_needs_rehash(user['password']):
+            new_hash = hash_password(password)
+            try:
+                # Condicionado al hash anterior para no pisar un cambio de contraseña simultáneo
+                users_collection.update_one({"_id": user["_id"], "password": user["password"]},
+                                            {"$set": {"password": new_hash}})
+                user["password"] = new_hash
+            except PyMongoError as e:
+                print(f"No se pudo actualizar el hash de la contraseña: {e}")
         return user
     else:
         print("Credenciales inválidas.")
         return None
 
+
+def register_user_async(username, password, email) -> Future:
+    """Ejecuta `register_user` en el pool de autenticación y devuelve su Future."""
+    return _get_auth_pool().submit(register_user, username, password, email)
+
+
+def check_user_async(username, password, issue_token=False) -> Future:
+    """
+    Ejecuta `check_user` en el pool de autenticación y devuelve su Future.
+
+    Con `issue_token` el Future devuelve (usuario, token de sesión firmado);
+    el token es None si las credenciales no son válidas o no hay JWT_SECRET.
+    """
+    if not issue_token:
+        return _get_auth_pool().submit(check_user, username, password)
+
+    def check_and_issue():
+        from utils.session_token import get_session_tokens
+        user = check_user(username, password)
+        return user, (get_session_tokens().issue(user) if user else None)
+
+    return _get_auth_pool().submit(check_and_issue)
+
 # --- Funciones de Gestión de Materias ---
 def get_subjects(user_id):
     """Obtiene todas las materias de un usuario."""
     if db is None: return []
     subjects_collection = db.subjects
-    return list(subjects_collection.find({"user_id": user_id}))
+    # Cada llamador recibe su propia lista (los documentos son compartidos)
+    return list(_flight.do(("subjects", user_id), lambda: list(subjects_collection.find({"user_id": user_id}))))
 
 def add_subject(user_id, name, color):
     """Añade una nueva materia para un usuario."""
@@ -91,14 +243,15 @@ def add_subject(user_id, name, color):
     subjects_collection = db.subjects
     subject_data = {"user_id": user_id, "name": name, "color": color}
     result = subjects_collection.insert_one(subject_data)
+    bump_version(db, user_id, "subjects")
     return result.inserted_id
 
 def delete_subject(subject_id):
     """Elimina una materia por su ID."""
     if db is None: return False
     subjects_collection = db.subjects
-    result = subjects_collection.delete_one({"_id": ObjectId(subject_id)})
-    return result.deleted_count > 0
-
-# --- Inicializar Conexión al Cargar el Módulo ---
-connect_to_db()
\ No newline at end of file
+    deleted = subjects_collection.find_one_and_delete({"_id": ObjectId(subject_id)})
+    if deleted is None:
+        return False
+    bump_version(db, deleted.get("user_id"), "subjects")
+    return True
@@ -0,0 +1,317 @@
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bson.objectid import ObjectId
+
+FORMATS = ("jsonl", "parquet")
+
+# Documentos por viaje del cursor: lotes grandes reducen los viajes sin cargar toda la colección
+EXPORT_BATCH_SIZE = 2000
+# Filas que se acumulan antes de escribir un row group de Parquet
+ROW_GROUP_SIZE = 50000
+GZIP_LEVEL = 6
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class ExportSpec:
+    """Qué se exporta de una colección: campos, tipos y campos de usuario y de fecha."""
+
+    def __init__(self, name: str, collection: str, user_field: str, time_field: Optional[str],
+                 columns: Sequence[Tuple[str, str]]):
+        """
+        Args:
+            name: Nombre del conjunto exportado (se usa en los archivos)
+            collection: Colección de MongoDB
+            user_field: Campo con el usuario dueño del documento
+            time_field: Campo de fecha por el que se divide la exportación (None si no hay)
+            columns: Columnas como (campo, tipo) con tipo 'string', 'int', 'bool' o 'timestamp'
+        """
+        self.name = name
+        self.collection = collection
+        self.user_field = user_field
+        self.time_field = time_field
+        self.columns = list(columns)
+
+    @property
+    def projection(self) -> Dict[str, int]:
+        return {field: 1 for field, _ in self.columns if field != "_id"}
+
+
+EXPORTS = {
+    "sessions": ExportSpec("sessions", "sesiones_estudio", "usuario_id", "fecha_hora", [
+        ("_id", "string"), ("usuario_id", "string"), ("materia", "string"),
+        ("duracion_minutos", "int"), ("fecha_hora", "timestamp"), ("notas", "string")]),
+    "goals": ExportSpec("goals", "metas", "usuario_id", "fecha_inicio", [
+        ("_id", "string"), ("usuario_id", "string"), ("materia", "string"),
+        ("minutos_objetivo", "int"), ("periodo", "string"), ("fecha_inicio", "timestamp"),
+        ("fecha_fin", "timestamp"), ("completada", "bool")]),
+    "subjects": ExportSpec("subjects", "subjects", "user_id", None, [
+        ("_id", "string"), ("user_id", "string"), ("name", "string"), ("color", "string")]),
+}
+
+
+def split_range(start: datetime, end: datetime, parts: int) -> List[Tuple[datetime, datetime]]:
+    """Divide [start, end) en `parts` intervalos consecutivos de igual duración."""
+    parts = max(1, parts)
+    step = (end - start) / parts
+    bounds = [start + step * i for i in range(parts)] + [end]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts) if bounds[i] < bounds[i + 1]] or [(start, end)]
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return str(value)
+
+
+def _coerce(value: Any, kind: str) -> Any:
+    """Convierte un valor al tipo de su columna; None si no se puede (p. ej., una duración no numérica)."""
+    if value is None:
+        return None
+    try:
+        if kind == "string":
+            return value if isinstance(value, str) else str(value)
+        if kind == "int":
+            number = value if type(value) is int else int(float(value))
+            return number if INT64_MIN <= number <= INT64_MAX else None
+        if kind == "bool":
+            if isinstance(value, bool):
+                return value
+            return bool(value) if isinstance(value, (int, float)) else None
+        if kind == "timestamp":
+            return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return value
+
+
+def _row(doc: Dict[str, Any], columns: Sequence[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Documento con solo las columnas exportadas, cada una convertida a su tipo.
+
+    Los documentos antiguos o importados pueden tener tipos mezclados; un valor
+    que no encaja en el esquema de Parquet haría fallar el row group entero.
+    """
+    return {field: str(doc.get(field)) if field == "_id" else _coerce(doc.get(field), kind)
+            for field, kind in columns}
+
+
+class _JsonlGzWriter:
+    """Escribe filas como JSON Lines comprimido con gzip."""
+
+    extension = ".jsonl.gz"
+
+    def __init__(self, path: str, spec: ExportSpec):
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=GZIP_LEVEL)
+
+    def write(self, row: Dict[str, Any]):
+        self._file.write(json.dumps(row, ensure_ascii=False, default=_json_default))
+        self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    """
+    Escribe filas en Parquet (columnar, comprimido con zstd) en row groups.
+
+    Solo se guardan en memoria las filas del row group en curso. Necesita
+    pyarrow, que es opcional: el resto de la aplicación no lo usa.
+    """
+
+    extension = ".parquet"
+
+    def __init__(self, path: str, spec: ExportSpec):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("La exportación a Parquet necesita pyarrow (pip install pyarrow).")
+        types = {"string": pa.string(), "int": pa.int64(), "bool": pa.bool_(), "timestamp": pa.timestamp("ms")}
+        self._pa = pa
+        self._schema = pa.schema([(field, types[kind]) for field, kind in spec.columns])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+        self._columns = {field: [] for field, _ in spec.columns}
+        self._pending = 0
+
+    def write(self, row: Dict[str, Any]):
+        for field, values in self._columns.items():
+            values.append(row.get(field))
+        self._pending += 1
+        if self._pending >= ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        table = self._pa.Table.from_pydict(self._columns, schema=self._schema)
+        self._writer.write_table(table)
+        for values in self._columns.values():
+            values.clear()
+        self._pending = 0
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+WRITERS = {"jsonl": _JsonlGzWriter, "parquet": _ParquetWriter}
+
+
+class Exporter:
+    """
+    Exporta sesiones, metas y materias en streaming.
+
+    Los documentos se leen de cursores del servidor con un `batch_size` grande
+    y se escriben fila a fila, así que la memoria usada no depende del tamaño
+    de los datos. Las colecciones con fecha se pueden dividir en intervalos de
+    tiempo que se exportan en paralelo, cada uno a su propio archivo.
+    """
+
+    def __init__(self, db, batch_size: int = EXPORT_BATCH_SIZE):
+        """
+        Args:
+            db: Base de datos de pymongo
+            batch_size: Documentos por viaje del cursor
+        """
+        self.db = db
+        self.batch_size = batch_size
+
+    def _query(self, spec: ExportSpec, users: Optional[Sequence[str]],
+               start: Optional[datetime], end: Optional[datetime], undated: bool = False) -> Dict[str, Any]:
+        query = {}
+        if users:
+            query[spec.user_field] = users[0] if len(users) == 1 else {"$in": list(users)}
+        if spec.time_field and undated:
+            # Sin fecha, con null o con otro tipo: quedan fuera de cualquier intervalo
+            query[spec.time_field] = {"$not": {"$type": "date"}}
+        elif spec.time_field and (start or end):
+            condition = {}
+            if start:
+                condition["$gte"] = start
+            if end:
+                condition["$lt"] = end
+            query[spec.time_field] = condition
+        return query
+
+    def time_bounds(self, spec: ExportSpec, users: Optional[Sequence[str]] = None) -> Optional[Tuple[datetime, datetime]]:
+        """Fecha mínima y máxima de la colección (dos consultas con límite 1)."""
+        collection = self.db[spec.collection]
+        query = self._query(spec, users, None, None)
+        query.setdefault(spec.time_field, {})["$type"] = "date"
+        first = list(collection.find(query, {spec.time_field: 1}).sort(spec.time_field, 1).limit(1))
+        last = list(collection.find(query, {spec.time_field: 1}).sort(spec.time_field, -1).limit(1))
+        if not first:
+            return None
+        return first[0][spec.time_field], last[0][spec.time_field]
+
+    def export_part(self, spec: ExportSpec, path: str, fmt: str = "jsonl",
+                    users: Optional[Sequence[str]] = None,
+                    start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    undated: bool = False) -> Dict[str, Any]:
+        """
+        Exporta los documentos de un intervalo a un archivo.
+
+        Con `undated` exporta en cambio los documentos cuyo campo de fecha
+        falta o no es una fecha.
+
+        Returns:
+            Resumen con el archivo, las filas, los bytes y los segundos
+        """
+        started = time.perf_counter()
+        query = self._query(spec, users, start, end, undated)
+        cursor = self.db[spec.collection].find(query, spec.projection, batch_size=self.batch_size)
+        rows = 0
+        writer = WRITERS[fmt](path, spec)
+        try:
+            for doc in cursor:
+                writer.write(_row(doc, spec.columns))
+                rows += 1
+        finally:
+            writer.close()
+            cursor.close()
+        return {
+            "conjunto": spec.name,
+            "archivo": path,
+            "desde": start,
+            "hasta": end,
+            "sin_fecha": undated,
+            "filas": rows,
+            "bytes": os.path.getsize(path),
+            "segundos": round(time.perf_counter() - started, 2),
+        }
+
+    def plan(self, spec: ExportSpec, directory: str, fmt: str = "jsonl",
+             users: Optional[Sequence[str]] = None,
+             start: Optional[datetime] = None, end: Optional[datetime] = None,
+             parts: int = 1) -> List[Tuple[str, Optional[datetime], Optional[datetime], bool]]:
+        """
+        Decide los archivos de una exportación.
+
+        Sin intervalo pedido, dividir por fechas dejaría fuera los documentos
+        sin una fecha válida: van a una parte más (`-sin-fecha`), de modo que
+        con cualquier número de partes se exporta lo mismo.
+
+        Returns:
+            Lista de (ruta, desde, hasta, sin_fecha), un elemento por parte
+        """
+        extension = WRITERS[fmt].extension
+        if spec.time_field is None or parts <= 1:
+            return [(os.path.join(directory, f"{spec.name}{extension}"), start, end, False)]
+
+        undated = []
+        if start is None and end is None:
+            undated = [(os.path.join(directory, f"{spec.name}-sin-fecha{extension}"), None, None, True)]
+
+        if start is None or end is None:
+            bounds = self.time_bounds(spec, users)
+            if bounds is None:
+                return [(os.path.join(directory, f"{spec.name}{extension}"), start, end, False)]
+            start = start or bounds[0]
+            # El final es exclusivo: se amplía un milisegundo para incluir el último documento
+            end = end or bounds[1] + timedelta(milliseconds=1)
+
+        return [(os.path.join(directory, f"{spec.name}-{i:03d}{extension}"), a, b, False)
+                for i, (a, b) in enumerate(split_range(start, end, parts))] + undated
+
+    def export(self, names: Iterable[str], directory: str, fmt: str = "jsonl",
+               users: Optional[Sequence[str]] = None,
+               start: Optional[datetime] = None, end: Optional[datetime] = None,
+               parts: int = 1, workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Exporta varios conjuntos, con las partes de cada uno en paralelo.
+
+        Args:
+            names: Conjuntos de EXPORTS ('sessions', 'goals', 'subjects')
+            directory: Directorio de salida (se crea si no existe)
+            fmt: 'jsonl' (gzip) o 'parquet'
+            users: Usuarios a exportar (None para toda la institución)
+            start: Inicio del intervalo (incluido)
+            end: Fin del intervalo (excluido)
+            parts: Intervalos de tiempo en que se divide cada conjunto con fecha
+            workers: Partes que se exportan a la vez
+
+        Returns:
+            Un resumen por archivo escrito
+        """
+        if fmt not in WRITERS:
+            raise ValueError(f"Formato no soportado: {fmt}")
+        os.makedirs(directory, exist_ok=True)
+        jobs = []
+        for name in names:
+            spec = EXPORTS[name]
+            for path, a, b, undated in self.plan(spec, directory, fmt, users, start, end, parts):
+                jobs.append((spec, path, a, b, undated))
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="export") as pool:
+            futures = [pool.submit(self.export_part, spec, path, fmt, users, a, b, undated)
+                       for spec, path, a, b, undated in jobs]
+            return [future.result() for future in futures]
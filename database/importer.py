@@ -0,0 +1,470 @@
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from database.versions import KINDS, bump_versions
+from models.estudio import Estudio
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_WORKERS = 4
+DEFAULT_SUBJECT_COLOR = "#DA6C6C"  # El mismo color por defecto que el gestor de materias
+DUPLICATE_KEY_ERROR = 11000
+MAX_REPORTED_ERRORS = 20
+PROGRESS_INTERVAL = 5.0  # Segundos entre avisos de progreso
+
+# Nombres de columna aceptados para cada campo de Estudio
+FIELD_ALIASES = {
+    "usuario_id": ("usuario_id", "usuario", "username", "user"),
+    "materia": ("materia", "subject"),
+    "duracion_minutos": ("duracion_minutos", "duracion", "minutos", "minutes", "duration"),
+    "fecha_hora": ("fecha_hora", "fecha", "date", "datetime", "timestamp"),
+    "notas": ("notas", "notes"),
+}
+
+
+def default_checkpoint_path(path: str) -> str:
+    """Checkpoint de un archivo dentro del directorio de datos (uno por ruta absoluta)."""
+    from utils.storage import data_dir
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12]
+    directory = data_dir() / "imports"
+    directory.mkdir(exist_ok=True)
+    return str(directory / f"{os.path.basename(path)}.{digest}.json")
+
+
+def session_id(data: Dict[str, Any]) -> ObjectId:
+    """
+    _id determinista para una sesión.
+
+    Los 4 primeros bytes son la fecha de la sesión (como en un ObjectId normal)
+    y el resto un hash de su contenido. Importar dos veces el mismo archivo, o
+    repetir un lote tras una interrupción, produce los mismos _id y la base de
+    datos descarta los duplicados.
+    """
+    fecha = data["fecha_hora"]
+    timestamp = int(fecha.timestamp()) & 0xFFFFFFFF
+    key = "\x1f".join(str(data.get(field, "")) for field in
+                      ("usuario_id", "materia", "duracion_minutos", "fecha_hora", "notas"))
+    return ObjectId(timestamp.to_bytes(4, "big") + hashlib.sha1(key.encode("utf-8")).digest()[:8])
+
+
+def client_session_id(usuario: str, client_id: str, fecha: datetime) -> ObjectId:
+    """
+    _id de una sesión creada sin conexión por un cliente, a partir de su id local.
+
+    Mismo esquema que `session_id`: reenviar la sesión (p. ej., si se perdió la
+    respuesta de una sincronización) produce el mismo _id y no la duplica.
+    """
+    timestamp = int(fecha.timestamp()) & 0xFFFFFFFF
+    key = f"{usuario}\x1f{client_id}"
+    return ObjectId(timestamp.to_bytes(4, "big") + hashlib.sha1(key.encode("utf-8")).digest()[:8])
+
+
+def _open_text(path: str):
+    """Abre un archivo de texto, descomprimiéndolo si termina en .gz."""
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_rows(path: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Lee un CSV (con cabecera) o un JSONL fila a fila, sin cargarlo en memoria.
+
+    Yields:
+        Tuplas (número de fila empezando en 1, fila). Las líneas JSON inválidas
+        se entregan como la excepción que produjeron para contarlas como rechazo.
+    """
+    name = path[:-3] if path.endswith(".gz") else path
+    with _open_text(path) as f:
+        if name.endswith(".csv"):
+            yield from enumerate(csv.DictReader(f), start=1)
+            return
+        number = 0
+        for line in f:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, e
+
+
+def _field(row: Dict[str, Any], field: str):
+    for alias in FIELD_ALIASES[field]:
+        value = row.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _parse_fecha(value: Any) -> datetime:
+    """
+    Convierte la fecha de una fila en un datetime local sin zona.
+
+    Acepta texto ISO 8601, segundos desde la época y el JSON extendido de
+    mongoexport: {"$date": milisegundos}, {"$date": {"$numberLong": "..."}}
+    o {"$date": "ISO"}.
+
+    Raises:
+        ValueError: Si falta la fecha o no es válida (también si está fuera de rango)
+    """
+    if value is None:
+        raise ValueError("falta la fecha")
+    try:
+        fecha = value
+        if isinstance(fecha, dict):
+            fecha = fecha["$date"]
+            if isinstance(fecha, dict):
+                fecha = int(fecha["$numberLong"])
+            if isinstance(fecha, (int, float)) and not isinstance(fecha, bool):
+                fecha = fecha / 1000  # mongoexport usa milisegundos
+        if isinstance(fecha, (int, float)) and not isinstance(fecha, bool):
+            fecha = datetime.fromtimestamp(fecha)
+        else:
+            fecha = datetime.fromisoformat(fecha.strip().replace("Z", "+00:00"))
+            if fecha.tzinfo is not None:
+                # Las fechas del resto de la aplicación son locales y sin zona
+                fecha = fecha.astimezone().replace(tzinfo=None)
+        # El _id de la sesión se deriva de la marca de tiempo (p. ej., el año 1 no la tiene)
+        fecha.timestamp()
+    except (AttributeError, KeyError, TypeError, ValueError, OverflowError, OSError):
+        # OverflowError/OSError: marcas de tiempo fuera del rango de datetime o del sistema
+        raise ValueError(f"fecha inválida: {value!r}")
+    return fecha
+
+
+def parse_row(row: Dict[str, Any], default_user: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Valida una fila y la convierte en el documento de una sesión (Estudio.to_dict).
+
+    Raises:
+        ValueError: Si falta un campo obligatorio o tiene un valor inválido
+    """
+    if not isinstance(row, dict):
+        raise ValueError("la fila no es un objeto")
+
+    usuario = _field(row, "usuario_id") or default_user
+    materia = _field(row, "materia")
+    if not usuario:
+        raise ValueError("falta el usuario")
+    if not materia:
+        raise ValueError("falta la materia")
+
+    try:
+        duracion = int(float(_field(row, "duracion_minutos")))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"duración inválida: {_field(row, 'duracion_minutos')!r}")
+    if duracion <= 0:
+        raise ValueError(f"la duración debe ser positiva: {duracion}")
+
+    fecha = _parse_fecha(_field(row, "fecha_hora"))
+
+    notas = _field(row, "notas")
+    return Estudio(str(usuario).strip(), str(materia).strip(), duracion,
+                   str(notas) if notas is not None else "", fecha).to_dict()
+
+
+class ImportStats:
+    """Contadores de una importación (se actualizan desde varios hilos)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.read = 0
+        self.skipped = 0  # Ya importadas según el checkpoint
+        self.rejected = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.subjects_created = 0
+        self.goals_completed = 0
+        self.errors: List[str] = []
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def reject(self, number: int, reason: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"fila {number}: {reason}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed
+        return {
+            "filas_leidas": self.read,
+            "filas_omitidas": self.skipped,
+            "filas_rechazadas": self.rejected,
+            "sesiones_insertadas": self.inserted,
+            "sesiones_duplicadas": self.duplicates,
+            "lotes": self.batches,
+            "materias_creadas": self.subjects_created,
+            "metas_completadas": self.goals_completed,
+            "segundos": round(elapsed, 2),
+            "filas_por_segundo": round(self.read / elapsed, 1) if elapsed > 0 else 0,
+            "insertadas_por_segundo": round(self.inserted / elapsed, 1) if elapsed > 0 else 0,
+            "errores": list(self.errors),
+        }
+
+
+class SessionImporter:
+    """
+    Importa sesiones de estudio históricas desde CSV o JSONL.
+
+    El archivo se lee en streaming y cada fila se valida como un `Estudio`. Las
+    materias se resuelven contra las del usuario sin distinguir mayúsculas. Las
+    sesiones se escriben con `insert_many(ordered=False)` en lotes grandes, con
+    varios lotes en paralelo. Cada sesión tiene un _id determinista, así que
+    repetir un lote nunca duplica datos.
+
+    El progreso se guarda en un checkpoint con la última fila cuyos lotes (y
+    todos los anteriores) ya están escritos. Si la importación se interrumpe,
+    vuelve a empezar desde ahí. Las materias nuevas y las metas alcanzadas se
+    actualizan al final, con una escritura masiva cada una.
+    """
+
+    def __init__(self, db, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = DEFAULT_WORKERS,
+                 checkpoint_path: Optional[str] = None, default_user: Optional[str] = None,
+                 on_progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Inicializa el importador.
+
+        Args:
+            db: Base de datos de pymongo
+            batch_size: Sesiones por lote de insert_many
+            workers: Lotes que se escriben a la vez
+            checkpoint_path: Archivo JSON del checkpoint (None para no reanudar)
+            default_user: Usuario de las filas que no lo indican
+            on_progress: Recibe las estadísticas cada PROGRESS_INTERVAL segundos
+        """
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.checkpoint_path = checkpoint_path
+        self.default_user = default_user
+        self.on_progress = on_progress
+
+        self._subjects: Dict[str, Dict[str, str]] = {}  # usuario -> {nombre en minúsculas: nombre}
+        self._new_subjects: Dict[Tuple[str, str], str] = {}
+        self._touched: Dict[Tuple[str, str], List[datetime]] = {}  # (usuario, materia) -> [mín, máx]
+
+    # --- Checkpoint ---
+
+    def _checkpoint_key(self, path: str) -> Dict[str, Any]:
+        stat = os.stat(path)
+        return {"archivo": os.path.abspath(path), "tamano": stat.st_size, "modificado": stat.st_mtime}
+
+    def load_checkpoint(self, path: str) -> int:
+        """Última fila ya importada de este archivo (0 si no hay checkpoint o el archivo cambió)."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Checkpoint ilegible, se importa desde el principio: {e}")
+            return 0
+        if {k: data.get(k) for k in ("archivo", "tamano", "modificado")} != self._checkpoint_key(path):
+            print("El checkpoint es de otro archivo o el archivo cambió; se importa desde el principio.")
+            return 0
+        return int(data.get("fila", 0))
+
+    def _save_checkpoint(self, path: str, row: int):
+        if not self.checkpoint_path:
+            return
+        data = {**self._checkpoint_key(path), "fila": row}
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def clear_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    # --- Materias ---
+
+    def _resolve_subject(self, usuario: str, materia: str) -> str:
+        """Devuelve el nombre de la materia tal como la tiene el usuario, o la registra como nueva."""
+        known = self._subjects.get(usuario)
+        if known is None:
+            known = {s["name"].lower(): s["name"] for s in self.db.subjects.find({"user_id": usuario}, {"name": 1})}
+            self._subjects[usuario] = known
+        name = known.get(materia.lower())
+        if name is None:
+            name = known[materia.lower()] = materia
+            self._new_subjects[(usuario, name)] = DEFAULT_SUBJECT_COLOR
+        return name
+
+    # --- Escritura ---
+
+    def _insert_batch(self, docs: List[Dict[str, Any]], stats: ImportStats):
+        inserted = len(docs)
+        duplicates = 0
+        try:
+            self.db.sesiones_estudio.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            other = [err for err in errors if err.get("code") != DUPLICATE_KEY_ERROR]
+            if other:
+                raise
+            duplicates = len(errors)
+            inserted = e.details.get("nInserted", len(docs) - duplicates)
+        with stats.lock:
+            stats.inserted += inserted
+            stats.duplicates += duplicates
+            stats.batches += 1
+
+    def run(self, path: str, restart: bool = False) -> Dict[str, Any]:
+        """
+        Importa un archivo.
+
+        Args:
+            path: Ruta del CSV o JSONL (opcionalmente .gz)
+            restart: Ignorar el checkpoint y empezar desde la primera fila
+
+        Returns:
+            Estadísticas de la importación (ImportStats.as_dict)
+        """
+        stats = ImportStats()
+        resume_after = 0 if restart else self.load_checkpoint(path)
+        if resume_after:
+            print(f"Reanudando después de la fila {resume_after}.")
+
+        in_flight: Deque[Tuple[int, Future]] = deque()  # (última fila del lote, Future), en orden
+        committed = resume_after
+        last_report = time.perf_counter()
+
+        def commit_finished():
+            """Avanza el checkpoint por el prefijo de lotes ya escritos."""
+            nonlocal committed
+            while in_flight and in_flight[0][1].done():
+                row, future = in_flight.popleft()
+                future.result()  # Propaga los errores que no son duplicados
+                committed = row
+            self._save_checkpoint(path, committed)
+
+        batch: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="import") as pool:
+            for number, row in iter_rows(path):
+                imported = number <= resume_after
+                if imported:
+                    stats.skipped += 1
+                else:
+                    stats.read += 1
+                try:
+                    if isinstance(row, Exception):
+                        raise ValueError(f"JSON inválido: {row}")
+                    data = parse_row(row, self.default_user)
+                except ValueError as e:
+                    if not imported:
+                        stats.reject(number, str(e))
+                    continue
+
+                data["materia"] = self._resolve_subject(data["usuario_id"], data["materia"])
+                data["_id"] = session_id(data)
+                span = self._touched.setdefault((data["usuario_id"], data["materia"]),
+                                                [data["fecha_hora"], data["fecha_hora"]])
+                span[0] = min(span[0], data["fecha_hora"])
+                span[1] = max(span[1], data["fecha_hora"])
+                if imported:
+                    # Ya escrita antes de la interrupción; solo cuenta para materias y metas
+                    continue
+                batch.append(data)
+
+                if len(batch) >= self.batch_size:
+                    # Como mucho dos lotes por hilo en memoria
+                    while sum(not f.done() for _, f in in_flight) >= self.workers * 2:
+                        wait([f for _, f in in_flight], return_when=FIRST_COMPLETED)
+                    in_flight.append((number, pool.submit(self._insert_batch, batch, stats)))
+                    batch = []
+                    commit_finished()
+
+                now = time.perf_counter()
+                if self.on_progress and now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    self.on_progress(stats.as_dict())
+
+            if batch:
+                in_flight.append((number, pool.submit(self._insert_batch, batch, stats)))
+            wait([f for _, f in in_flight])
+            commit_finished()
+
+        stats.subjects_created = self._create_subjects()
+        stats.goals_completed = self._complete_goals()
+        # Una sola escritura para invalidar las estadísticas y metas de todos los usuarios importados
+        bump_versions(self.db, [usuario for usuario, _ in self._touched], *KINDS)
+        self.clear_checkpoint()
+        return stats.as_dict()
+
+    # --- Actualizaciones al final ---
+
+    def _create_subjects(self) -> int:
+        """Crea en una sola escritura las materias que no existían."""
+        if not self._new_subjects:
+            return 0
+        docs = [{"user_id": usuario, "name": name, "color": color}
+                for (usuario, name), color in self._new_subjects.items()]
+        self.db.subjects.insert_many(docs, ordered=False)
+        return len(docs)
+
+    def _complete_goals(self) -> int:
+        """
+        Marca como completadas las metas activas que alcanzan su objetivo con lo importado.
+
+        Se hace una consulta de metas, una agregación de minutos por meta y una
+        única bulk_write, en lugar de revisar las metas sesión a sesión.
+        """
+        if not self._touched:
+            return 0
+        users = sorted({usuario for usuario, _ in self._touched})
+        metas = [m for m in self.db.metas.find({"usuario_id": {"$in": users}, "completada": False})
+                 if (m.get("usuario_id"), m.get("materia")) in self._touched
+                 and m.get("fecha_inicio") and m.get("fecha_fin")
+                 and m["fecha_inicio"] <= self._touched[(m["usuario_id"], m["materia"])][1]
+                 and self._touched[(m["usuario_id"], m["materia"])][0] < m["fecha_fin"]]
+        if not metas:
+            return 0
+
+        # Minutos de cada meta en su ventana, en una sola agregación
+        goals = [{"id": m["_id"], "usuario": m["usuario_id"], "materia": m["materia"],
+                  "inicio": m["fecha_inicio"], "fin": m["fecha_fin"]} for m in metas]
+        pipeline = [
+            {"$match": {
+                "usuario_id": {"$in": users},
+                "materia": {"$in": sorted({m["materia"] for m in metas})},
+                "fecha_hora": {"$gte": min(m["fecha_inicio"] for m in metas),
+                               "$lt": max(m["fecha_fin"] for m in metas)},
+            }},
+            # Una sesión puede contar para varias metas: se calculan todas y se despliegan
+            {"$project": {"duracion_minutos": 1, "metas": {"$filter": {
+                "input": {"$literal": goals}, "as": "m",
+                "cond": {"$and": [{"$eq": ["$$m.usuario", "$usuario_id"]},
+                                  {"$eq": ["$$m.materia", "$materia"]},
+                                  {"$gte": ["$fecha_hora", "$$m.inicio"]},
+                                  {"$lt": ["$fecha_hora", "$$m.fin"]}]},
+            }}}},
+            {"$unwind": "$metas"},
+            {"$group": {"_id": "$metas.id", "minutos": {"$sum": "$duracion_minutos"}}},
+        ]
+        minutos = {doc["_id"]: doc["minutos"] for doc in self.db.sesiones_estudio.aggregate(pipeline)}
+
+        updates = [UpdateOne({"_id": m["_id"], "completada": False}, {"$set": {"completada": True}})
+                   for m in metas if minutos.get(m["_id"], 0) >= m.get("minutos_objetivo", 0) > 0]
+        if not updates:
+            return 0
+        return self.db.metas.bulk_write(updates, ordered=False).modified_count
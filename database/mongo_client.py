@@ -1,10 +1,21 @@
 from pymongo import MongoClient
 import certifi
 from typing import Dict, List, Any, Optional, TypeVar, Generic, Type
+from bson import json_util
 from bson.objectid import ObjectId
+from database.versions import COLLECTION_KINDS, bump_version
+from utils.singleflight import SingleFlight
 
 T = TypeVar('T')
 
+# Lecturas idénticas simultáneas (p. ej., varios paneles del dashboard) comparten un único viaje
+_flight = SingleFlight()
+
+
+def _query_key(value) -> str:
+    """Representación estable de una consulta para usarla como clave (admite fechas y ObjectId)."""
+    return json_util.dumps(value, sort_keys=True)
+
 class MongoDBClient:
     """Cliente para interactuar con MongoDB."""
     
@@ -164,19 +175,63 @@ class MongoRepository:
         if self.collection is None:
             return []
             
-        results = []
-        # Usamos el método find() estándar de PyMongo
-        for doc in self.collection.find(query or {}):
-            # Asumimos que el modelo tiene un método from_dict
-            if hasattr(self.model_class, 'from_dict'):
-                results.append(self.model_class.from_dict(doc))
-            else:
-                # Fallback en caso de que no exista el método
-                instance = self.model_class()
-                for key, value in doc.items():
-                    setattr(instance, key, value)
-                results.append(instance)
-        return results
+        # Usamos el método find() estándar de PyMongo. Los documentos se comparten entre
+        # llamadas simultáneas, pero cada llamador recibe sus propios modelos
+        docs = _flight.do(self._flight_key("find", query), lambda: list(self.collection.find(query or {})))
+        return [self._to_model(doc) for doc in docs]
+
+    def count(self, query=None):
+        """Cuenta los documentos que coinciden con la consulta"""
+        if self.collection is None:
+            return 0
+        return _flight.do(self._flight_key("count", query), self.collection.count_documents, query or {})
+
+    def _flight_key(self, operation, *args):
+        return (self.collection.full_name, operation, _query_key(args))
+
+    def find_page(self, query=None, skip=0, limit=100, sort=None, projection=None):
+        """
+        Devuelve una página de resultados ordenada en el servidor.
+
+        Args:
+            query: Consulta para filtrar documentos
+            skip: Número de documentos que se saltan
+            limit: Tamaño de la página
+            sort: Lista de tuplas (campo, dirección). Se añade _id como desempate
+                  para que el orden sea estable entre páginas.
+            projection: Campos que se devuelven (None para todos)
+
+        Returns:
+            Lista de modelos de la página
+        """
+        if self.collection is None:
+            return []
+
+        sort = list(sort or [])
+        if not any(field == "_id" for field, _ in sort):
+            sort.append(("_id", sort[-1][1] if sort else 1))
+
+        def fetch():
+            return list(self.collection.find(query or {}, projection).sort(sort).skip(skip).limit(limit))
+
+        docs = _flight.do(self._flight_key("find_page", query, skip, limit, sort, projection), fetch)
+        return [self._to_model(doc) for doc in docs]
+
+    def ensure_index(self, keys, **kwargs):
+        """Crea un índice si no existe (create_index es idempotente)"""
+        if self.collection is None:
+            return None
+        return self.collection.create_index(keys, **kwargs)
+
+    def _to_model(self, doc):
+        # Asumimos que el modelo tiene un método from_dict
+        if hasattr(self.model_class, 'from_dict'):
+            return self.model_class.from_dict(doc)
+        # Fallback en caso de que no exista el método
+        instance = self.model_class()
+        for key, value in doc.items():
+            setattr(instance, key, value)
+        return instance
         
     def save(self, model):
         """Guarda un modelo en la colección"""
@@ -198,6 +253,23 @@ class MongoRepository:
             # Insertar nuevo documento
             result = self.collection.insert_one(data)
             model._id = result.inserted_id
-            
+
+        self._bump_version(data.get("usuario_id"))
         return model
 
+    def delete_by_id(self, id):
+        """Elimina un documento por su ID"""
+        if self.collection is None:
+            raise ConnectionError("No hay conexión a la base de datos")
+        doc = self.collection.find_one_and_delete({"_id": ObjectId(id)})
+        if doc is None:
+            return False
+        self._bump_version(doc.get("usuario_id"))
+        return True
+
+    def _bump_version(self, usuario_id):
+        """Avisa de que cambiaron los datos del usuario (solo en las colecciones con versión)"""
+        kind = COLLECTION_KINDS.get(self.collection_name)
+        if kind is not None:
+            bump_version(self.db_client, usuario_id, kind)
+
@@ -0,0 +1,59 @@
+from typing import Dict, Iterable, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import PyMongoError
+
+# Colección con un documento por usuario: {_id: usuario, sessions: n, goals: n, subjects: n}
+VERSIONS_COLLECTION = "data_versions"
+
+# Tipo de dato que cambia al escribir en cada colección del modelo de la interfaz gráfica
+COLLECTION_KINDS = {
+    "sesiones_estudio": "sessions",
+    "metas": "goals",
+    "subjects": "subjects",
+}
+KINDS = ("sessions", "goals", "subjects")
+
+
+def empty_versions() -> Dict[str, int]:
+    return {kind: 0 for kind in KINDS}
+
+
+def bump_version(db, usuario: Optional[str], *kinds: str) -> Optional[Dict[str, int]]:
+    """
+    Incrementa la versión de los datos de un usuario tras escribirlos.
+
+    Cada escritura en sesiones, metas o materias debe llamarla después de
+    guardar los datos (nunca antes), de modo que una versión leída antes de
+    consultar los datos nunca etiquete datos más antiguos que ella. Con la
+    versión, el servicio HTTP responde 304 a los clientes que ya tienen los
+    datos al día sin recalcularlos.
+
+    Returns:
+        Las versiones actuales del usuario, o None si no se pudo actualizar
+    """
+    if db is None or not usuario or not kinds:
+        return None
+    try:
+        doc = db[VERSIONS_COLLECTION].find_one_and_update(
+            {"_id": usuario}, {"$inc": {kind: 1 for kind in kinds}},
+            upsert=True, return_document=ReturnDocument.AFTER)
+    except PyMongoError as e:
+        # Una versión sin incrementar solo retrasa la invalidación: no se interrumpe la escritura
+        print(f"No se pudo actualizar la versión de datos de '{usuario}': {e}")
+        return None
+    return {**empty_versions(), **{kind: doc.get(kind, 0) for kind in KINDS}}
+
+
+def bump_versions(db, usuarios: Iterable[str], *kinds: str) -> int:
+    """Incrementa las versiones de muchos usuarios con una sola escritura masiva."""
+    updates = [UpdateOne({"_id": usuario}, {"$inc": {kind: 1 for kind in kinds}}, upsert=True)
+               for usuario in sorted(set(usuarios)) if usuario]
+    if db is None or not updates or not kinds:
+        return 0
+    try:
+        db[VERSIONS_COLLECTION].bulk_write(updates, ordered=False)
+    except PyMongoError as e:
+        print(f"No se pudieron actualizar las versiones de datos: {e}")
+        return 0
+    return len(updates)
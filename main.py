@@ -1,8 +1,8 @@
+import importlib
+import queue
+import threading
 import tkinter as tk
-from tkinter import font
-from database import connect_to_db, check_user, register_user
-from ui.gui import MainDashboardFrame
-from ui.auth_gui import LoginFrame, RegisterFrame
+from tkinter import font, messagebox
 
 # --- Colores del diseño ---
 COLOR_PALETTE = {
@@ -12,15 +12,29 @@ COLOR_PALETTE = {
     "text": "#333333"
 }
 
+# Módulo y clase de cada pantalla. Solo el login se importa al arrancar; el
+# resto (el dashboard arrastra matplotlib, PIL y los clientes de las APIs) se
+# importa y se construye la primera vez que se navega a él.
+FRAMES = {
+    "LoginFrame": ("ui.auth_gui", "LoginFrame"),
+    "RegisterFrame": ("ui.auth_gui", "RegisterFrame"),
+    "MainDashboardFrame": ("ui.gui", "MainDashboardFrame"),
+}
+
+# Módulos pesados que se precargan en segundo plano mientras se muestra el login
+PRELOAD_MODULES = ("ui.gui",)
+
+POLL_INTERVAL_MS = 50
+
+
 class EduTrackerApp(tk.Tk):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.db_client = connect_to_db()
-        if self.db_client is None:
-            print("No se pudo conectar a la base de datos. Saliendo.")
-            self.destroy()
-            return
+        self.db_client = None
+        self._db_state = "connecting"  # 'connecting', 'connected' o 'failed'
+        self._startup_results = queue.Queue()
+        self._pending_action = None
 
         self.title("EduTracker")
         self.geometry("900x650")
@@ -32,50 +46,164 @@ class EduTrackerApp(tk.Tk):
         self.title_font = font.Font(family="Helvetica", size=18, weight="bold")
 
         # Contenedor para las diferentes pantallas (frames)
-        container = tk.Frame(self, bg=COLOR_PALETTE["bg"])
-        container.pack(side="top", fill="both", expand=True)
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
+        self.container = tk.Frame(self, bg=COLOR_PALETTE["bg"])
+        self.container.pack(side="top", fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
 
+        # Las pantallas se construyen la primera vez que se muestran
         self.frames = {}
-        for F in (LoginFrame, RegisterFrame, MainDashboardFrame):
-            page_name = F.__name__
-            frame = F(parent=container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
-
         self.show_frame("LoginFrame")
 
+        # La conexión a MongoDB y la precarga de módulos no retrasan la ventana de login
+        threading.Thread(target=self._startup_worker, name="startup", daemon=True).start()
+        self.after(POLL_INTERVAL_MS, self._poll_startup)
+
+    def _startup_worker(self):
+        """Conecta con la base de datos y precarga los módulos pesados (hilo secundario)."""
+        # Un token de sesión válido evita volver a pedir usuario y contraseña
+        try:
+            from utils.session_token import get_session_tokens
+            session = get_session_tokens().load()
+        except Exception as e:
+            print(f"No se pudo restaurar la sesión: {e}")
+            session = None
+
+        try:
+            from database import connect_to_db
+            db_client = connect_to_db()
+        except Exception as e:
+            print(f"Error al conectar con la base de datos: {e}")
+            db_client = None
+        self._startup_results.put(("db", db_client, session))
+
+        for module in PRELOAD_MODULES:
+            try:
+                importlib.import_module(module)
+            except Exception as e:
+                # Se volverá a intentar (y se verá el error) al navegar a la pantalla
+                print(f"No se pudo precargar {module}: {e}")
+
+    def _poll_startup(self):
+        """Recoge en el hilo de Tk el resultado de la conexión."""
+        try:
+            _, db_client, session = self._startup_results.get_nowait()
+        except queue.Empty:
+            self.after(POLL_INTERVAL_MS, self._poll_startup)
+            return
+
+        self.db_client = db_client
+        if db_client is None:
+            self._db_state = "failed"
+            print("No se pudo conectar a la base de datos. Saliendo.")
+            messagebox.showerror("Error de conexión", "No se pudo conectar a la base de datos.")
+            self.destroy()
+            return
+
+        self._db_state = "connected"
+        # Ejecutar el login o registro que el usuario pidió mientras se conectaba
+        action, self._pending_action = self._pending_action, None
+        if action is not None:
+            action()
+        elif session is not None:
+            from utils.session_token import user_from_claims
+            self.open_dashboard(user_from_claims(session))
+
+    def _when_connected(self, action):
+        """Ejecuta `action` ahora si hay conexión o en cuanto se establezca."""
+        if self._db_state == "connected":
+            action()
+        elif self._db_state == "connecting":
+            self._pending_action = action
+            self.config(cursor="watch")
+            self.title("EduTracker - Conectando...")
+
+    def get_frame(self, page_name):
+        """Devuelve un frame, importándolo y construyéndolo la primera vez."""
+        frame = self.frames.get(page_name)
+        if frame is None:
+            module_name, class_name = FRAMES[page_name]
+            frame_class = getattr(importlib.import_module(module_name), class_name)
+            frame = frame_class(parent=self.container, controller=self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[page_name] = frame
+        return frame
+
     def show_frame(self, page_name):
         """Muestra un frame por su nombre."""
-        frame = self.frames[page_name]
+        frame = self.get_frame(page_name)
         frame.tkraise()
 
+    def _when_done(self, future, callback):
+        """Espera sin bloquear a que termine `future` y llama a `callback` en el hilo de Tk."""
+        if not future.done():
+            self.after(POLL_INTERVAL_MS, self._when_done, future, callback)
+            return
+        self.config(cursor="")
+        self.title("EduTracker")
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo completar la operación: {e}")
+            return
+        callback(result)
+
+    def _set_busy(self, text):
+        self.config(cursor="watch")
+        self.title(f"EduTracker - {text}")
+
+    def open_dashboard(self, user):
+        """Muestra el dashboard del usuario autenticado."""
+        self.get_frame("MainDashboardFrame").set_user(user)
+        self.show_frame("MainDashboardFrame")
+
+    def logout(self):
+        """Cierra la sesión: borra el token local y vuelve al login."""
+        from utils.session_token import get_session_tokens
+        get_session_tokens().clear()
+        self.show_frame("LoginFrame")
+
     def attempt_login(self, username, password):
         """Intenta iniciar sesión y cambia al dashboard si tiene éxito."""
-        from tkinter import messagebox
-        user = check_user(username, password)
-        if user:
-            self.frames["MainDashboardFrame"].set_user(user)
-            self.show_frame("MainDashboardFrame")
-        else:
-            messagebox.showerror("Error de inicio de sesión", "Usuario o contraseña incorrectos.")
+        def on_result(result):
+            user, token = result
+            if user:
+                get_session_tokens().save(token)
+                self.open_dashboard(user)
+            else:
+                messagebox.showerror("Error de inicio de sesión", "Usuario o contraseña incorrectos.")
+
+        from utils.session_token import get_session_tokens
+
+        def login():
+            # bcrypt se ejecuta en el pool de autenticación, no en el hilo de Tk
+            from database import check_user_async
+            self._set_busy("Iniciando sesión...")
+            self._when_done(check_user_async(username, password, issue_token=True), on_result)
+
+        self._when_connected(login)
 
     def attempt_register(self, username, password, email):
         """Intenta registrar un nuevo usuario."""
-        from tkinter import messagebox
         if not username or not password or not email:
             messagebox.showerror("Error", "Todos los campos son obligatorios.")
             return
-        
-        success, message = register_user(username, password, email)
-        if success:
-            messagebox.showinfo("Éxito", "Usuario registrado correctamente. Ahora puedes iniciar sesión.")
-            self.show_frame("LoginFrame")
-        else:
-            messagebox.showerror("Error de registro", message)
 
+        def on_result(result):
+            success, message = result
+            if success:
+                messagebox.showinfo("Éxito", "Usuario registrado correctamente. Ahora puedes iniciar sesión.")
+                self.show_frame("LoginFrame")
+            else:
+                messagebox.showerror("Error de registro", message)
+
+        def register():
+            from database import register_user_async
+            self._set_busy("Registrando...")
+            self._when_done(register_user_async(username, password, email), on_result)
+
+        self._when_connected(register)
 
 if __name__ == "__main__":
     app = EduTrackerApp()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
@@ -0,0 +1,561 @@
+"""
+Servicio HTTP de EduTracker para clientes web y móviles.
+
+Es un servidor asyncio (aiohttp) que comparte con la aplicación de escritorio
+el modelo de datos y los tokens de sesión (JWT HS256 firmados con JWT_SECRET).
+Usa un único pool de conexiones asíncronas a MongoDB (motor) para todas las
+peticiones y ejecuta bcrypt en un pool de hilos, fuera del event loop.
+
+Rutas:
+    POST /auth/register   {"username", "password", "email"}
+    POST /auth/login      {"username", "password"} -> {"token", "expira"}
+    GET  /sessions        ?limit=50&cursor=...&subject=...&since=...  (paginación por clave)
+    POST /sessions        {"materia", "duracion_minutos", "notas", "fecha_hora"}
+    GET  /goals           ?all=1 para incluir completadas y vencidas
+    POST /goals           {"materia", "minutos_objetivo", "periodo"}
+    GET  /stats           ?since=...
+    POST /sync            {"sessions": [...], "watermarks": {"goals", "subjects"}}
+    GET  /metrics, GET /health
+
+Las rutas de datos necesitan la cabecera `Authorization: Bearer <token>`.
+GET /goals y GET /stats devuelven un ETag y responden 304 a If-None-Match
+mientras no cambien los datos del usuario (ver server/etag.py).
+
+Uso:
+    python -m server.app
+    python -m server.app --port 8080 --host 0.0.0.0
+"""
+import argparse
+import asyncio
+import base64
+import functools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+import bcrypt
+from aiohttp import web
+from bson.objectid import ObjectId
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from api.circuit_breaker import breaker_metrics
+from database import (AUTH_WORKERS, DUPLICATE_USER_MESSAGES, duplicate_user_field, hash_password,
+                      password_needs_rehash)
+from database.importer import DUPLICATE_KEY_ERROR, FIELD_ALIASES, client_session_id, parse_row
+from models.estudio import Estudio
+from models.meta import Meta, PeriodoMeta
+from server.etag import BodyCache, VersionCache, etag_matches, make_etag
+from server.metrics import Metrics
+from utils.session_token import SessionTokens
+from utils.singleflight import SingleFlight
+from utils.stats import calcular_estadisticas, calcular_progreso_metas, consulta_sesiones_metas
+
+load_dotenv("configuracion.env")
+
+DEFAULT_PORT = int(os.getenv("PORT", "5000"))
+DB_POOL_SIZE = int(os.getenv("SERVER_DB_POOL_SIZE", "50"))
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_SYNC_SESSIONS = 1000
+
+# Rutas que no necesitan token
+PUBLIC_ROUTES = {"/auth/register", "/auth/login", "/health", "/metrics"}
+
+STATS_PROJECTION = {"materia": 1, "duracion_minutos": 1, "fecha_hora": 1}
+GOAL_SESSIONS_PROJECTION = {"materia": 1, "duracion_minutos": 1, "fecha_hora": 1}
+
+
+# --- Utilidades ---
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    return str(value)
+
+
+_dumps = functools.partial(json.dumps, ensure_ascii=False, default=_json_default)
+
+
+def json_response(data: Any, status: int = 200, **kwargs) -> web.Response:
+    return web.json_response(data, status=status, dumps=_dumps, **kwargs)
+
+
+HTTP_ERRORS = {400: web.HTTPBadRequest, 401: web.HTTPUnauthorized, 404: web.HTTPNotFound, 409: web.HTTPConflict}
+
+
+def error(status: int, message: str) -> web.HTTPException:
+    """Excepción HTTP con cuerpo JSON {"error": mensaje}."""
+    return HTTP_ERRORS[status](text=_dumps({"error": message}), content_type="application/json")
+
+
+async def read_json(request: web.Request) -> Dict[str, Any]:
+    try:
+        data = await request.json()
+    except ValueError:
+        raise error(400, "El cuerpo debe ser JSON.")
+    if not isinstance(data, dict):
+        raise error(400, "El cuerpo debe ser un objeto JSON.")
+    return data
+
+
+def parse_datetime(value: Optional[str], name: str) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise error(400, f"'{name}' debe ser una fecha ISO (AAAA-MM-DD[THH:MM:SS]).")
+
+
+def parse_positive_int(value: Any, name: str) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = 0
+    if number <= 0:
+        raise error(400, f"'{name}' debe ser un entero positivo.")
+    return number
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """Cursor opaco con la clave (fecha_hora, _id) del último elemento de una página."""
+    raw = f"{doc['fecha_hora'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        fecha, oid = raw.split("|")
+        return datetime.fromisoformat(fecha), ObjectId(oid)
+    except Exception:
+        raise error(400, "Cursor no válido.")
+
+
+def session_json(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc["_id"]),
+        "materia": doc.get("materia"),
+        "duracion_minutos": doc.get("duracion_minutos", 0),
+        "fecha_hora": doc.get("fecha_hora"),
+        "notas": doc.get("notas"),
+    }
+
+
+async def conditional_json(request: web.Request, resource: str, kinds: Sequence[str],
+                           compute: Callable[[], Awaitable[Any]]) -> web.Response:
+    """
+    Respuesta JSON con ETag para datos derivados de los de un usuario.
+
+    El ETag sale de las versiones de datos del usuario, que normalmente están
+    en memoria. Si el cliente ya tiene esa versión (If-None-Match) se responde
+    304 sin tocar la base de datos. Si otro cliente ya pidió la misma versión,
+    se reutiliza el cuerpo serializado. Solo en los demás casos se llama a
+    `compute`, y las peticiones simultáneas de la misma versión comparten esa
+    única llamada.
+    """
+    app = request.app
+    user = request["user"]
+    versions = await app["versions"].get(user)
+    etag = make_etag(resource, user, versions, kinds, request.query_string)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    not_modified = etag_matches(request.headers.get("If-None-Match"), etag)
+    app["metrics"].cache(f"{resource}_304", not_modified)
+    if not_modified:
+        return web.Response(status=304, headers=headers)
+
+    body = app["bodies"].get(etag)
+    app["metrics"].cache(f"{resource}_cuerpo", body is not None)
+    if body is None:
+        async def build():
+            body = _dumps(await compute()).encode("utf-8")
+            app["bodies"].put(etag, body)
+            return body
+
+        body = await app["flight"].do_async(etag, build)
+    return web.Response(body=body, content_type="application/json", charset="utf-8", headers=headers)
+
+
+async def run_blocking(request: web.Request, fn, *args):
+    """Ejecuta una función bloqueante (bcrypt) en el pool de autenticación."""
+    return await asyncio.get_running_loop().run_in_executor(request.app["auth_pool"], fn, *args)
+
+
+# --- Middlewares ---
+
+@web.middleware
+async def metrics_middleware(request: web.Request, handler):
+    """Mide la latencia y el código de cada petición por ruta (no por URL concreta)."""
+    metrics: Metrics = request.app["metrics"]
+    route = request.match_info.route.resource
+    name = f"{request.method} {route.canonical if route is not None else 'desconocida'}"
+    started = time.perf_counter()
+    metrics.in_flight += 1
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        metrics.in_flight -= 1
+        metrics.observe(name, status, time.perf_counter() - started)
+
+
+@web.middleware
+async def auth_middleware(request: web.Request, handler):
+    """Comprueba el token Bearer (solo HMAC, sin consultar la base de datos)."""
+    # Las rutas públicas y las que no existen (404/405) no necesitan token
+    if request.path in PUBLIC_ROUTES or request.match_info.http_exception is not None:
+        return await handler(request)
+    header = request.headers.get("Authorization", "")
+    token = header[7:] if header.startswith("Bearer ") else ""
+    claims = request.app["tokens"].verify(token)
+    if claims is None:
+        raise error(401, "Token ausente, no válido o caducado.")
+    request["user"] = claims["sub"]
+    return await handler(request)
+
+
+# --- Autenticación ---
+
+async def register(request: web.Request) -> web.Response:
+    data = await read_json(request)
+    username = str(data.get("username", "")).strip()
+    password = str(data.get("password", ""))
+    email = str(data.get("email", "")).strip()
+    if not username or not password or not email:
+        raise error(400, "Todos los campos son obligatorios.")
+
+    hashed = await run_blocking(request, hash_password, password)
+    try:
+        # Los índices únicos deciden si el usuario o el email ya existen
+        await request.app["db"].users.insert_one({
+            "username": username, "password": hashed, "email": email, "created_at": datetime.now()})
+    except DuplicateKeyError as e:
+        raise error(409, DUPLICATE_USER_MESSAGES[duplicate_user_field(e)])
+    return json_response({"username": username, "email": email}, status=201)
+
+
+async def login(request: web.Request) -> web.Response:
+    data = await read_json(request)
+    username = str(data.get("username", ""))
+    password = str(data.get("password", ""))
+    users = request.app["db"].users
+    user = await users.find_one({"username": username})
+
+    valid = user is not None and await run_blocking(
+        request, bcrypt.checkpw, password.encode("utf-8"), user["password"])
+    if not valid:
+        raise error(401, "Usuario o contraseña incorrectos.")
+
+    if password_needs_rehash(user["password"]):
+        new_hash = await run_blocking(request, hash_password, password)
+        await users.update_one({"_id": user["_id"], "password": user["password"]},
+                               {"$set": {"password": new_hash}})
+        request.app["metrics"].increment("bcrypt_rehash")
+
+    tokens: SessionTokens = request.app["tokens"]
+    token = tokens.issue(user)
+    return json_response({"token": token, "expira": tokens.verify(token)["exp"]})
+
+
+# --- Sesiones de estudio ---
+
+async def list_sessions(request: web.Request) -> web.Response:
+    """
+    Sesiones del usuario, de la más reciente a la más antigua.
+
+    Paginación por clave: el cursor guarda (fecha_hora, _id) del último
+    elemento y la página siguiente empieza justo después, así que cada página
+    cuesta lo mismo aunque el historial sea enorme (a diferencia de skip).
+    """
+    params = request.query
+    limit = min(parse_positive_int(params.get("limit", DEFAULT_PAGE_SIZE), "limit"), MAX_PAGE_SIZE)
+    query: Dict[str, Any] = {"usuario_id": request["user"]}
+    if params.get("subject"):
+        query["materia"] = params["subject"]
+    since = parse_datetime(params.get("since"), "since")
+    if since:
+        query["fecha_hora"] = {"$gte": since}
+    if params.get("cursor"):
+        fecha, oid = decode_cursor(params["cursor"])
+        query["$or"] = [{"fecha_hora": {"$lt": fecha}}, {"fecha_hora": fecha, "_id": {"$lt": oid}}]
+
+    cursor = request.app["db"].sesiones_estudio.find(query).sort([("fecha_hora", -1), ("_id", -1)])
+    docs = await cursor.limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return json_response({"items": [session_json(doc) for doc in docs[:limit]], "cursor": next_cursor})
+
+
+async def create_session(request: web.Request) -> web.Response:
+    data = await read_json(request)
+    materia = str(data.get("materia", "")).strip()
+    if not materia:
+        raise error(400, "La materia es obligatoria.")
+    duracion = parse_positive_int(data.get("duracion_minutos"), "duracion_minutos")
+    fecha = parse_datetime(data.get("fecha_hora"), "fecha_hora")
+
+    doc = Estudio(request["user"], materia, duracion, str(data.get("notas") or ""), fecha).to_dict()
+    result = await request.app["db"].sesiones_estudio.insert_one(doc)
+    doc["_id"] = result.inserted_id
+    await request.app["versions"].bump(request["user"], "sessions")
+    return json_response(session_json(doc), status=201)
+
+
+# --- Metas ---
+
+async def list_goals(request: web.Request) -> web.Response:
+    """Metas con su progreso; admite If-None-Match."""
+    db = request.app["db"]
+    user = request["user"]
+    include_all = request.query.get("all") in ("1", "true")
+
+    async def compute():
+        query: Dict[str, Any] = {"usuario_id": user}
+        if not include_all:
+            query["completada"] = False
+        metas = await db.metas.find(query).sort("fecha_inicio", -1).to_list(length=None)
+        now = datetime.now()
+        if not include_all:
+            metas = [m for m in metas if m.get("fecha_fin") and m["fecha_fin"] >= now]
+        if not metas:
+            return {"items": []}
+        sesiones = await db.sesiones_estudio.find(consulta_sesiones_metas(user, metas),
+                                                  GOAL_SESSIONS_PROJECTION).to_list(length=None)
+        return {"items": calcular_progreso_metas(metas, sesiones, now)}
+
+    # El progreso depende de las metas y de las sesiones
+    return await conditional_json(request, "goals", ("goals", "sessions"), compute)
+
+
+async def create_goal(request: web.Request) -> web.Response:
+    data = await read_json(request)
+    materia = str(data.get("materia", "")).strip()
+    if not materia:
+        raise error(400, "La materia es obligatoria.")
+    objetivo = parse_positive_int(data.get("minutos_objetivo"), "minutos_objetivo")
+    try:
+        periodo = PeriodoMeta(data.get("periodo", PeriodoMeta.SEMANAL.value))
+    except ValueError:
+        raise error(400, "'periodo' debe ser " + ", ".join(p.value for p in PeriodoMeta) + ".")
+
+    doc = Meta(request["user"], materia, objetivo, periodo).to_dict()
+    result = await request.app["db"].metas.insert_one(doc)
+    doc["_id"] = result.inserted_id
+    await request.app["versions"].bump(request["user"], "goals")
+    return json_response(calcular_progreso_metas([doc], [])[0], status=201)
+
+
+# --- Estadísticas ---
+
+async def stats(request: web.Request) -> web.Response:
+    """Estadísticas de `calcular_estadisticas`; admite If-None-Match."""
+    query: Dict[str, Any] = {"usuario_id": request["user"]}
+    since = parse_datetime(request.query.get("since"), "since")
+    if since:
+        query["fecha_hora"] = {"$gte": since}
+
+    async def compute():
+        sesiones = []
+        async for doc in request.app["db"].sesiones_estudio.find(query, STATS_PROJECTION).batch_size(1000):
+            sesiones.append(Estudio.from_dict(doc))
+        return calcular_estadisticas(sesiones)
+
+    return await conditional_json(request, "stats", ("sessions",), compute)
+
+
+# --- Sincronización ---
+
+def goal_json(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc["_id"]),
+        "materia": doc.get("materia"),
+        "minutos_objetivo": doc.get("minutos_objetivo", 0),
+        "periodo": doc.get("periodo"),
+        "fecha_inicio": doc.get("fecha_inicio"),
+        "fecha_fin": doc.get("fecha_fin"),
+        "completada": doc.get("completada", False),
+    }
+
+
+def subject_json(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": str(doc["_id"]), "name": doc.get("name"), "color": doc.get("color")}
+
+
+# Conjuntos que se descargan al sincronizar: (colección, campo de usuario, serializador)
+SYNC_SNAPSHOTS = {
+    "goals": ("metas", "usuario_id", goal_json),
+    "subjects": ("subjects", "user_id", subject_json),
+}
+
+
+async def sync(request: web.Request) -> web.Response:
+    """
+    Sincroniza un cliente que estuvo sin conexión en una sola petición.
+
+    Sube: las sesiones creadas sin conexión, cada una con un `client_id`
+    generado por el cliente. Se guardan con un único insert_many(ordered=False)
+    y con un _id derivado del client_id, así que reenviar un lote (si se perdió
+    la respuesta) no duplica nada.
+
+    Baja: para metas y materias, el cliente envía la versión de datos que
+    tiene (su marca de agua). Si la del servidor es distinta, recibe el
+    conjunto completo del usuario, que ya incluye modificaciones y borrados.
+    Si es la misma, no se consulta la colección.
+    """
+    app = request.app
+    db = app["db"]
+    user = request["user"]
+    data = await read_json(request)
+    items = data.get("sessions") or []
+    if not isinstance(items, list) or len(items) > MAX_SYNC_SESSIONS:
+        raise error(400, f"'sessions' debe ser una lista de como mucho {MAX_SYNC_SESSIONS} sesiones.")
+
+    docs, accepted, rejected = [], [], []
+    for item in items:
+        client_id = str(item.get("client_id") or "") if isinstance(item, dict) else ""
+        if not client_id:
+            rejected.append({"client_id": None, "error": "falta client_id"})
+            continue
+        # El usuario siempre es el del token, nunca el que diga la sesión
+        fields = {k: v for k, v in item.items() if k not in FIELD_ALIASES["usuario_id"]}
+        try:
+            doc = parse_row(fields, default_user=user)
+        except ValueError as e:
+            rejected.append({"client_id": client_id, "error": str(e)})
+            continue
+        doc["_id"] = client_session_id(user, client_id, doc["fecha_hora"])
+        doc["client_id"] = client_id
+        docs.append(doc)
+        accepted.append(client_id)
+
+    inserted = 0
+    if docs:
+        try:
+            inserted = len((await db.sesiones_estudio.insert_many(docs, ordered=False)).inserted_ids)
+        except BulkWriteError as e:
+            # Las duplicadas ya se habían guardado en una sincronización anterior
+            if any(err.get("code") != DUPLICATE_KEY_ERROR for err in e.details.get("writeErrors", [])):
+                raise
+            inserted = e.details.get("nInserted", 0)
+    versions = await (app["versions"].bump(user, "sessions") if inserted else app["versions"].get(user))
+
+    watermarks = data.get("watermarks") if isinstance(data.get("watermarks"), dict) else {}
+    response: Dict[str, Any] = {
+        "accepted": accepted,
+        "rejected": rejected,
+        "inserted": inserted,
+        "watermarks": {kind: versions[kind] for kind in SYNC_SNAPSHOTS},
+    }
+    for kind, (collection, user_field, to_json) in SYNC_SNAPSHOTS.items():
+        if watermarks.get(kind) != versions[kind]:
+            async def load(collection=collection, user_field=user_field, to_json=to_json):
+                return [to_json(doc) async for doc in db[collection].find({user_field: user})]
+
+            # Varios dispositivos sincronizando a la vez comparten la consulta de la misma versión
+            response[kind] = await app["flight"].do_async(("sync", kind, user, versions[kind]), load)
+    app["metrics"].increment("sync_sesiones", len(items))
+    return json_response(response)
+
+
+# --- Operación ---
+
+async def health(request: web.Request) -> web.Response:
+    return json_response({"ok": True})
+
+
+async def metrics(request: web.Request) -> web.Response:
+    # Los breakers de las APIs externas que use este proceso, junto a los ratios de las cachés
+    return json_response({**request.app["metrics"].snapshot(), "breakers": breaker_metrics()})
+
+
+async def _on_startup(app: web.Application):
+    client = app["mongo_client"]
+    if client is None:
+        client = AsyncIOMotorClient(app["mongo_uri"], maxPoolSize=app["pool_size"], serverSelectionTimeoutMS=5000)
+        app["mongo_client"] = client
+    await client.admin.command("ping")
+    app["db"] = db = client[app["db_name"]]
+    await db.users.create_index("username", unique=True, name="username_unique")
+    await db.users.create_index("email", unique=True, name="email_unique")
+    # Cubre el filtro por usuario y el orden de la paginación por clave
+    await db.sesiones_estudio.create_index([("usuario_id", 1), ("fecha_hora", -1), ("_id", -1)])
+    await db.metas.create_index([("usuario_id", 1), ("completada", 1)])
+    await db.subjects.create_index("user_id")
+    app["versions"] = VersionCache(db)
+    app["versions"].start()
+
+
+async def _on_cleanup(app: web.Application):
+    await app["versions"].stop()
+    app["mongo_client"].close()
+    app["auth_pool"].shutdown(wait=False)
+
+
+def create_app(mongo_uri: Optional[str] = None, db_name: Optional[str] = None,
+               secret: Optional[str] = None, pool_size: int = DB_POOL_SIZE,
+               mongo_client=None) -> web.Application:
+    """
+    Crea la aplicación aiohttp.
+
+    Args:
+        mongo_uri: URI de MongoDB (por defecto MONGO_URI)
+        db_name: Base de datos (por defecto DB_NAME)
+        secret: Clave de los tokens (por defecto JWT_SECRET)
+        pool_size: Conexiones máximas del pool de motor
+        mongo_client: Cliente asíncrono ya creado (p. ej., uno en memoria en las pruebas);
+                      si se indica, no se usan mongo_uri ni pool_size
+    """
+    secret = secret or os.getenv("JWT_SECRET")
+    if not secret:
+        raise RuntimeError("El servidor necesita JWT_SECRET para firmar los tokens.")
+
+    app = web.Application(middlewares=[metrics_middleware, auth_middleware])
+    app["mongo_uri"] = mongo_uri or os.getenv("MONGO_URI")
+    app["db_name"] = db_name or os.getenv("DB_NAME")
+    app["pool_size"] = pool_size
+    app["mongo_client"] = mongo_client
+    app["tokens"] = SessionTokens(secret)  # Sin archivo: el servidor no guarda tokens
+    app["metrics"] = Metrics()
+    app["bodies"] = BodyCache()
+    app["flight"] = SingleFlight()
+    # bcrypt libera el GIL: los hilos calculan hashes en paralelo sin bloquear el event loop
+    app["auth_pool"] = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="bcrypt")
+
+    app.router.add_post("/auth/register", register)
+    app.router.add_post("/auth/login", login)
+    app.router.add_get("/sessions", list_sessions)
+    app.router.add_post("/sessions", create_session)
+    app.router.add_get("/goals", list_goals)
+    app.router.add_post("/goals", create_goal)
+    app.router.add_get("/stats", stats)
+    app.router.add_post("/sync", sync)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics)
+
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--mongo-uri", help="Por defecto MONGO_URI de configuracion.env")
+    parser.add_argument("--db-name", help="Por defecto DB_NAME de configuracion.env")
+    args = parser.parse_args()
+    web.run_app(create_app(args.mongo_uri, args.db_name), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+from pymongo import ReturnDocument
+
+from database.versions import KINDS, VERSIONS_COLLECTION, empty_versions
+
+# Sin change stream, segundos que se confía en una versión leída antes de volver a leerla
+VERSION_TTL = 1.0
+# Las respuestas dependen también de la hora (media de la última semana, metas vencidas):
+# el ETag cambia al menos una vez por intervalo
+ETAG_TIME_BUCKET = 60
+MAX_CACHED_BODIES = 2048
+
+
+class VersionCache:
+    """
+    Versiones de datos por usuario (colección `data_versions`) en memoria.
+
+    Las escrituras del propio servidor actualizan la caché al momento. Las de
+    otros procesos (la aplicación de escritorio, los comandos, el importador)
+    llegan por un change stream, si el servidor de MongoDB lo permite (replica
+    set o Atlas); así una petición condicional se resuelve sin consultar la
+    base de datos. Sin change stream, cada versión se relee como mucho una vez
+    cada VERSION_TTL segundos con una búsqueda por _id.
+    """
+
+    def __init__(self, db, ttl: float = VERSION_TTL, clock=time.monotonic):
+        self.collection = db[VERSIONS_COLLECTION]
+        self.ttl = ttl
+        self.clock = clock
+        self.watching = False
+        self._versions: Dict[str, Dict[str, int]] = {}
+        self._read_at: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _store(self, usuario: str, doc: Optional[dict]):
+        self._versions[usuario] = {**empty_versions(), **{k: (doc or {}).get(k, 0) for k in KINDS}}
+        self._read_at[usuario] = self.clock()
+
+    async def get(self, usuario: str) -> Dict[str, int]:
+        """Versiones actuales del usuario (de memoria si están al día)."""
+        versions = self._versions.get(usuario)
+        if versions is not None and (self.watching or self.clock() - self._read_at[usuario] < self.ttl):
+            return versions
+        self._store(usuario, await self.collection.find_one({"_id": usuario}))
+        return self._versions[usuario]
+
+    async def bump(self, usuario: str, *kinds: str) -> Dict[str, int]:
+        """Incrementa las versiones tras una escritura del servidor (después de guardar los datos)."""
+        doc = await self.collection.find_one_and_update(
+            {"_id": usuario}, {"$inc": {kind: 1 for kind in kinds}},
+            upsert=True, return_document=ReturnDocument.AFTER)
+        self._store(usuario, doc)
+        return self._versions[usuario]
+
+    def start(self):
+        """Empieza a escuchar los cambios de versión de otros procesos."""
+        self._task = asyncio.ensure_future(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _watch(self):
+        try:
+            async with self.collection.watch(full_document="updateLookup") as stream:
+                # Lo leído antes de abrir el stream pudo perderse algún cambio
+                self._versions.clear()
+                self.watching = True
+                async for change in stream:
+                    doc = change.get("fullDocument")
+                    if doc is not None:
+                        self._store(doc["_id"], doc)
+        except Exception as e:
+            # Por ejemplo, un mongod sin replica set (o un cliente sin change streams):
+            # se sigue con relecturas cada VERSION_TTL
+            print(f"Sin change stream de versiones ({e}); se releen cada {self.ttl:g} s.")
+        finally:
+            self.watching = False
+
+
+def make_etag(resource: str, usuario: str, versions: Dict[str, int], kinds: Sequence[str],
+              query: str = "", now: Optional[float] = None) -> str:
+    """
+    ETag de una respuesta calculada a partir de los datos de un usuario.
+
+    Depende solo de las versiones de los datos usados, de los parámetros de la
+    consulta y del intervalo de tiempo actual, no del contenido, así que se
+    calcula sin consultar la base de datos.
+    """
+    bucket = int((now if now is not None else time.time()) // ETAG_TIME_BUCKET)
+    key = "|".join([resource, usuario, query, str(bucket)] + [f"{k}={versions.get(k, 0)}" for k in kinds])
+    return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Indica si la cabecera If-None-Match incluye el ETag (o es *)."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    # Comparación débil: W/"x" y "x" son equivalentes
+    normalize = lambda value: value[2:] if value.startswith("W/") else value
+    return "*" in candidates or normalize(etag) in {normalize(c) for c in candidates}
+
+
+class BodyCache:
+    """Cuerpos ya serializados por ETag (LRU), para no recalcular ni reserializar respuestas."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_BODIES):
+        self.max_entries = max_entries
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def get(self, etag: str) -> Optional[bytes]:
+        body = self._bodies.get(etag)
+        if body is not None:
+            self._bodies.move_to_end(etag)
+        return body
+
+    def put(self, etag: str, body: bytes):
+        self._bodies[etag] = body
+        self._bodies.move_to_end(etag)
+        while len(self._bodies) > self.max_entries:
+            self._bodies.popitem(last=False)
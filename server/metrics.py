@@ -0,0 +1,91 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+# Latencias recientes que se guardan por ruta para calcular percentiles
+LATENCY_WINDOW = 4096
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil por el método del rango más cercano sobre una lista ordenada."""
+    if not values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(values)) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+class RouteStats:
+    """Contadores y latencias recientes de una ruta."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0  # Respuestas 5xx
+        self.status: Dict[int, int] = {}
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "peticiones": self.requests,
+            "errores": self.errors,
+            "estados": {str(code): count for code, count in sorted(self.status.items())},
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        }
+
+
+class Metrics:
+    """
+    Métricas en memoria del servicio HTTP.
+
+    Cuenta peticiones, códigos de estado y latencias por ruta (con una ventana
+    de las últimas LATENCY_WINDOW para los percentiles), las peticiones en
+    curso y los aciertos de las cachés. Es seguro usarlo desde el event loop
+    y desde hilos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, RouteStats] = {}
+        self._counters: Dict[str, int] = {}
+        self._caches: Dict[str, List[int]] = {}  # nombre -> [aciertos, fallos]
+        self.in_flight = 0
+        self.started = time.time()
+
+    def observe(self, route: str, status: int, seconds: float):
+        """Registra una petición terminada."""
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats()
+            stats.requests += 1
+            stats.status[status] = stats.status.get(status, 0) + 1
+            if status >= 500:
+                stats.errors += 1
+            stats.latencies.append(seconds)
+
+    def increment(self, name: str, amount: int = 1):
+        """Incrementa un contador con nombre (p. ej., 'bcrypt_rehash')."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def cache(self, name: str, hit: bool):
+        """Registra un acierto o un fallo de una caché (p. ej., respuestas 304 por ETag)."""
+        with self._lock:
+            counts = self._caches.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "segundos_activo": round(time.time() - self.started, 1),
+                "en_curso": self.in_flight,
+                "rutas": {route: stats.snapshot() for route, stats in sorted(self._routes.items())},
+                "contadores": dict(sorted(self._counters.items())),
+                "caches": {name: {"aciertos": hits, "fallos": misses,
+                                  "ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0}
+                           for name, (hits, misses) in sorted(self._caches.items())},
+            }
@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from api.book_index import BookIndex, normalize, tokenize
+
+BOOKS = [
+    {"title": "Álgebra lineal", "authors": ["Stanley Grossman"], "subjects": ["Matemáticas"]},
+    {"title": "Cálculo de una variable", "authors": ["James Stewart"], "subjects": ["Matemáticas", "Cálculo"]},
+    {"title": "Física universitaria", "authors": ["Sears", "Zemansky"], "subjects": ["Física"]},
+]
+
+
+@pytest.fixture
+def make_index(tmp_path):
+    indexes = []
+
+    def make(**kwargs):
+        # Sin fusiones automáticas: las pruebas llaman a flush() cuando toca
+        index = BookIndex(tmp_path / "books.bin", **{"merge_delay": 3600, **kwargs})
+        indexes.append(index)
+        return index
+
+    yield make
+    for index in indexes:
+        if index._merge_timer is not None:
+            index._merge_timer.cancel()
+        index._close()
+
+
+def titles(books):
+    return [book["title"] for book in books]
+
+
+def test_tokenize_normaliza_tildes_plurales_y_palabras_vacias():
+    assert normalize("Árbol Ñandú Pingüino") == "arbol nandu pinguino"
+    assert tokenize("Las Matemáticas de la Física") == ["matematica", "fisica"]
+    # La "s" final solo se quita en palabras de más de tres letras
+    assert tokenize("gas bus lapices") == ["gas", "bus", "lapice"]
+
+
+def test_busqueda_en_el_delta_antes_de_guardar(make_index):
+    index = make_index()
+    assert index.search("algebra") == []
+    assert index.add_books(BOOKS) == 3
+    assert not os.path.exists(index.path)
+
+    # Sin tildes, en plural y con el prefijo de las búsquedas por materia
+    assert titles(index.search("ALGEBRA")) == ["Álgebra lineal"]
+    assert titles(index.search("subject:matematicas", limit=5)) == ["Álgebra lineal", "Cálculo de una variable"]
+    # El título pesa más que las materias
+    assert titles(index.search("cálculo"))[0] == "Cálculo de una variable"
+
+
+def test_flush_y_recarga_con_mmap(make_index):
+    index = make_index()
+    index.add_books(BOOKS[:2])
+    index.flush()
+    assert os.path.exists(index.path)
+    assert index._delta == []
+    assert len(index) == 2
+
+    # Otro proceso (o un reinicio) lee el archivo
+    reloaded = make_index()
+    assert len(reloaded) == 2
+    assert titles(reloaded.search("stewart")) == ["Cálculo de una variable"]
+
+    # Los resultados combinan el archivo y el delta
+    reloaded.add_books(BOOKS[2:])
+    assert titles(reloaded.search("fisica algebra", limit=5)) == ["Física universitaria", "Álgebra lineal"]
+    reloaded.flush()
+    assert len(reloaded) == 3
+    assert not [name for name in os.listdir(os.path.dirname(index.path)) if name.endswith(".tmp")]
+
+
+def test_no_duplica_libros_ya_indexados(make_index):
+    index = make_index()
+    index.add_books(BOOKS)
+    index.flush()
+    # La clave es título y primer autor normalizados
+    assert index.add_books([{"title": "ALGEBRA LINEAL", "authors": ["Stanley Grossman"]}]) == 0
+    assert index.add_books([{"title": "Álgebra lineal", "authors": ["Otro autor"]}]) == 1
+    assert len(index) == 4
+
+
+def test_fusion_conserva_los_mas_recientes(make_index):
+    index = make_index(max_documents=2)
+    index.add_books(BOOKS)
+    index.flush()
+    assert len(index) == 2
+    assert index.search("algebra") == []
+    assert titles(index.search("fisica")) == ["Física universitaria"]
+    # El libro descartado se puede volver a añadir
+    assert index.add_books(BOOKS[:1]) == 1
+
+
+def test_el_umbral_fuerza_la_fusion_en_segundo_plano(make_index):
+    index = make_index(merge_threshold=2)
+    index.add_books(BOOKS)
+    timer = index._merge_timer
+    assert timer is not None and timer.interval == 0
+    timer.join(5)
+    assert index._delta == []
+    assert len(index) == 3
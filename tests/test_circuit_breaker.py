@@ -0,0 +1,126 @@
+import types
+
+import pytest
+
+from api import circuit_breaker
+from api.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = types.SimpleNamespace(value=100.0)
+    monkeypatch.setattr(circuit_breaker, "time", types.SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("prueba", failure_threshold=2, latency_budget=1.0, reset_timeout=30.0)
+
+
+def fail():
+    raise ConnectionError("sin conexión")
+
+
+def test_ciclo_cerrado_abierto_semiabierto_cerrado(breaker, clock):
+    assert breaker.call(lambda: "ok") == "ok"
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    assert breaker.state == OPEN
+
+    # Abierto: falla al instante sin llamar a la función
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(calls.append, 1)
+    assert calls == []
+
+    clock.value += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+    metrics = breaker.metrics()
+    assert metrics["trips"] == 1
+    assert metrics["short_circuits"] == 1
+    assert metrics["failures"] == 2
+    assert metrics["consecutive_failures"] == 0
+
+
+def test_una_prueba_fallida_vuelve_a_abrir(breaker, clock):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    clock.value += 30
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == OPEN
+    assert not breaker._probe_in_flight
+
+    # El temporizador vuelve a empezar desde la prueba fallida
+    clock.value += 29
+    assert breaker.state == OPEN
+    clock.value += 1
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_las_llamadas_lentas_abren_el_circuito(breaker, clock):
+    def slow():
+        clock.value += 1.5
+        return "tarde"
+
+    # La respuesta lenta se devuelve, pero cuenta como fallo
+    assert breaker.call(slow) == "tarde"
+    assert breaker.state == CLOSED
+    assert breaker.call(slow) == "tarde"
+    assert breaker.state == OPEN
+    assert breaker.metrics()["slow_calls"] == 2
+
+
+def test_solo_pasa_una_prueba_a_la_vez(breaker, clock):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    clock.value += 30
+
+    def probe():
+        # Mientras la prueba está en curso, el resto sigue fallando al instante
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "otra")
+        return "ok"
+
+    assert breaker.call(probe) == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_una_prueba_interrumpida_no_bloquea_el_breaker(breaker, clock):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    clock.value += 30
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        breaker.call(interrupted)
+    # No se registró nada, pero la siguiente llamada puede hacer de prueba
+    assert not breaker._probe_in_flight
+    assert breaker.state == HALF_OPEN
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_breaker_metrics_de_los_compartidos(clock, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    breaker = circuit_breaker.get_breaker("api.uno", failure_threshold=1)
+    assert circuit_breaker.get_breaker("api.uno") is breaker
+    circuit_breaker.get_breaker("api.dos")
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+
+    assert [m["name"] for m in circuit_breaker.breaker_metrics()] == ["api.uno", "api.dos"]
+    [metrics] = circuit_breaker.breaker_metrics("api.uno")
+    assert metrics["state"] == OPEN
+    assert metrics["trips"] == 1
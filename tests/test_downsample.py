@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from utils.downsample import lttb
+
+
+def test_series_cortas_o_umbral_pequeno_no_cambian():
+    x, y = [0, 1, 2], [5, 6, 7]
+    for threshold in (2, 3, 10):
+        rx, ry = lttb(x, y, threshold)
+        assert list(rx) == x and list(ry) == y
+
+
+@pytest.mark.parametrize("threshold", [3, 10, 100])
+def test_conserva_extremos_y_orden(threshold):
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 30)
+    rx, ry = lttb(x, y, threshold)
+    assert len(rx) == len(ry) == threshold
+    assert rx[0] == 0 and rx[-1] == 999
+    assert np.all(np.diff(rx) > 0)
+    # Cada punto elegido es un punto real de la serie
+    assert np.allclose(ry, y[rx.astype(int)])
+
+
+def test_conserva_los_picos():
+    y = np.zeros(500)
+    y[123] = 50
+    y[377] = -40
+    rx, ry = lttb(np.arange(500), y, 20)
+    assert 123 in rx and 377 in rx
+    assert ry.max() == 50 and ry.min() == -40
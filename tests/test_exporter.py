@@ -0,0 +1,53 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.exporter import Exporter
+
+mongomock = pytest.importorskip("mongomock")
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().edutracker
+    start = datetime(2024, 1, 1)
+    db.sesiones_estudio.insert_many([
+        {"usuario_id": "ana", "materia": "Física", "duracion_minutos": 30 + i, "fecha_hora": start + timedelta(days=i)}
+        for i in range(10)
+    ])
+    # Documentos antiguos o importados: sin fecha, con null o con tipos mezclados
+    db.sesiones_estudio.insert_many([
+        {"usuario_id": "ana", "materia": "Física", "duracion_minutos": "30"},
+        {"usuario_id": "ana", "materia": "Física", "duracion_minutos": "abc", "fecha_hora": None},
+        {"usuario_id": "ana", "materia": 7, "duracion_minutos": 1.5, "fecha_hora": "2024-02-01"},
+    ])
+    return db
+
+
+def _jsonl_rows(results):
+    rows = []
+    for result in results:
+        with gzip.open(result["archivo"], "rt", encoding="utf-8") as f:
+            rows += [json.loads(line) for line in f]
+    return rows
+
+
+@pytest.mark.parametrize("parts", [1, 4])
+def test_dividir_en_partes_no_pierde_documentos(db, tmp_path, parts):
+    results = Exporter(db).export(["sessions"], str(tmp_path), "jsonl", parts=parts)
+    assert sum(result["filas"] for result in results) == 13
+    assert len(_jsonl_rows(results)) == 13
+
+
+def test_los_valores_se_convierten_al_tipo_de_la_columna(db, tmp_path):
+    rows = _jsonl_rows(Exporter(db).export(["sessions"], str(tmp_path), "jsonl"))
+    assert sorted(str(row["duracion_minutos"]) for row in rows[10:]) == ["1", "30", "None"]
+    assert {row["materia"] for row in rows} == {"Física", "7"}
+
+
+def test_parquet_con_tipos_mezclados(db, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    results = Exporter(db).export(["sessions"], str(tmp_path), "parquet", parts=3)
+    assert sum(pq.read_table(result["archivo"]).num_rows for result in results) == 13
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+from database.importer import parse_row
+
+BASE = {"usuario_id": "ana", "materia": "Física", "duracion_minutos": 30, "fecha_hora": "2023-11-14T10:00:00"}
+
+
+def test_parse_row_fila_valida():
+    doc = parse_row(BASE)
+    assert doc["usuario_id"] == "ana"
+    assert doc["duracion_minutos"] == 30
+    assert doc["fecha_hora"] == datetime(2023, 11, 14, 10, 0)
+
+
+@pytest.mark.parametrize("value", [
+    {"$date": 1700000000000},
+    {"$date": {"$numberLong": "1700000000000"}},
+    1700000000,
+])
+def test_parse_row_fechas_numericas(value):
+    # mongoexport usa milisegundos; un número suelto son segundos
+    assert parse_row({**BASE, "fecha_hora": value})["fecha_hora"] == datetime.fromtimestamp(1700000000)
+
+
+@pytest.mark.parametrize("changes", [
+    {"duracion_minutos": float("inf")},
+    {"duracion_minutos": float("nan")},
+    {"duracion_minutos": "-5"},
+    {"fecha_hora": 1e20},
+    {"fecha_hora": float("-inf")},
+    {"fecha_hora": {"$date": {"$numberLong": "x"}}},
+    {"fecha_hora": "0001-01-01T00:00:00"},
+    {"fecha_hora": None},
+])
+def test_parse_row_valores_invalidos_son_value_error(changes):
+    # El importador y /sync solo esperan ValueError: cualquier otra excepción abortaría el lote
+    with pytest.raises(ValueError):
+        parse_row({**BASE, **changes})
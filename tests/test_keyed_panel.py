@@ -0,0 +1,104 @@
+"""Diffing de KeyedPanel con filas falsas: no necesita pantalla."""
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+from ui.keyed_panel import KeyedPanel  # noqa: E402
+
+
+class FakeRow:
+    def __init__(self, log):
+        self.log = log
+        self.values = None
+        self.packed = False
+        self.destroyed = False
+
+    def pack(self, **options):
+        self.packed = True
+        self.log.append(("pack", self.values[0]))
+
+    def pack_forget(self):
+        self.packed = False
+
+    def destroy(self):
+        self.destroyed = True
+        self.log.append(("destroy", self.values[0]))
+
+
+@pytest.fixture
+def panel(monkeypatch):
+    # Sin ventana: el Frame no se crea de verdad y las filas son objetos falsos
+    monkeypatch.setattr(tk.Frame, "__init__", lambda self, *args, **kwargs: None)
+    log = []
+
+    def create_row(parent):
+        log.append(("create",))
+        return FakeRow(log)
+
+    def update_row(row, item):
+        row.values = item
+        log.append(("update", item[0]))
+
+    panel = KeyedPanel(None, create_row, update_row, key=lambda item: item[0])
+    panel.log = log
+    return panel
+
+
+def packed_order(panel):
+    return [entry[1] for entry in panel.log if entry[0] == "pack"]
+
+
+def test_primera_carga_crea_y_coloca_todas_las_filas(panel):
+    panel.set_items([("a", 1), ("b", 2)])
+    assert len(panel) == 2
+    assert panel.log.count(("create",)) == 2
+    assert packed_order(panel) == ["a", "b"]
+
+
+def test_sin_cambios_no_toca_ninguna_fila(panel):
+    panel.set_items([("a", 1), ("b", 2)])
+    panel.log.clear()
+    panel.set_items([("a", 1), ("b", 2)])
+    assert panel.log == []
+
+
+def test_actualiza_solo_las_filas_que_cambian(panel):
+    panel.set_items([("a", 1), ("b", 2)])
+    row_a = panel.row("a")
+    panel.log.clear()
+    panel.set_items([("a", 1), ("b", 3)])
+    # Mismas claves en el mismo orden: no se recolocan
+    assert panel.log == [("update", "b")]
+    assert panel.row("a") is row_a
+    assert panel.row("b").values == ("b", 3)
+
+
+def test_crea_las_nuevas_y_destruye_las_que_desaparecen(panel):
+    panel.set_items([("a", 1), ("b", 2)])
+    row_b = panel.row("b")
+    panel.log.clear()
+    panel.set_items([("b", 2), ("c", 4)])
+    assert ("destroy", "a") in panel.log
+    assert panel.log.count(("create",)) == 1
+    assert ("update", "b") not in panel.log
+    assert panel.row("a") is None
+    assert panel.row("b") is row_b
+    assert packed_order(panel) == ["b", "c"]
+
+
+def test_reordena_sin_recrear(panel):
+    panel.set_items([("a", 1), ("b", 2), ("c", 3)])
+    rows = {key: panel.row(key) for key in "abc"}
+    panel.log.clear()
+    panel.set_items([("c", 3), ("a", 1), ("b", 2)])
+    assert ("create",) not in panel.log
+    assert packed_order(panel) == ["c", "a", "b"]
+    assert all(panel.row(key) is row for key, row in rows.items())
+
+
+def test_vaciar_el_panel(panel):
+    panel.set_items([("a", 1)])
+    row = panel.row("a")
+    panel.set_items([])
+    assert len(panel) == 0
+    assert row.destroyed
@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+from utils.pomodoro import BREAK, WORK, PomodoroTimer, format_time
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clocks():
+    # Relojes independientes: el monótono no tiene relación con la hora real
+    return FakeClock(50.0), FakeClock(1_700_000_000.0)
+
+
+@pytest.fixture
+def make_timer(tmp_path, clocks):
+    clock, wall_clock = clocks
+
+    def make(path=tmp_path / "pomodoro.json", **kwargs):
+        return PomodoroTimer(path, **{"work_seconds": 60, "break_seconds": 20, **kwargs},
+                             clock=clock, wall_clock=wall_clock)
+
+    return make
+
+
+def advance(clocks, seconds):
+    for clock in clocks:
+        clock.advance(seconds)
+
+
+def test_cuenta_desde_el_plazo_y_cambia_de_fase(make_timer, clocks):
+    timer = make_timer()
+    assert timer.display_seconds() == 60
+    assert timer.seconds_until_change() is None
+
+    timer.start()
+    advance(clocks, 0.25)
+    assert timer.display_seconds() == 60
+    assert timer.seconds_until_change() == pytest.approx(0.75)
+    assert timer.tick() == []
+
+    advance(clocks, 59.75)
+    assert timer.tick() == [(WORK, BREAK)]
+    assert timer.phase == BREAK
+    assert timer.display_seconds() == 20
+
+    # Un tick retrasado encadena las fases desde el final de la anterior, sin perder tiempo
+    advance(clocks, 85)
+    assert timer.tick() == [(BREAK, WORK), (WORK, BREAK)]
+    assert timer.remaining() == pytest.approx(15)
+
+
+def test_pausa_conserva_el_tiempo_y_reset_vuelve_al_trabajo(make_timer, clocks):
+    timer = make_timer()
+    timer.start()
+    advance(clocks, 10)
+    timer.pause()
+    advance(clocks, 1000)
+    assert timer.remaining() == 50
+    assert timer.tick() == []
+
+    assert timer.set_duration(30)
+    timer.start()
+    assert not timer.set_duration(10)
+    timer.reset()
+    assert (timer.phase, timer.running, timer.remaining()) == (WORK, False, 60)
+
+
+def test_restaura_en_pausa_y_en_marcha(make_timer, clocks):
+    paused = make_timer()
+    paused.start()
+    advance(clocks, 15)
+    paused.pause()
+    restored = make_timer()
+    assert (restored.phase, restored.running, restored.remaining()) == (WORK, False, 45)
+
+    restored.start()
+    advance(clocks, 5)
+    # Tras reiniciar el proceso el reloj monótono empieza en otro valor
+    clocks[0].now = 3.0
+    restored = make_timer()
+    assert restored.running
+    assert restored.remaining() == pytest.approx(40)
+
+
+def test_encadena_las_fases_que_terminaron_con_la_aplicacion_cerrada(make_timer, clocks):
+    timer = make_timer()
+    timer.start()
+    # 60 s de trabajo + 20 de descanso + 60 de trabajo + 5 del descanso siguiente
+    advance(clocks, 145)
+    clocks[0].now = 0.0
+
+    restored = make_timer(work_seconds=999, break_seconds=999)
+    assert restored.tick() == [(WORK, BREAK), (BREAK, WORK), (WORK, BREAK)]
+    assert restored.tick() == []
+    assert restored.phase == BREAK
+    # Las duraciones son las guardadas, no las del constructor
+    assert restored.remaining() == pytest.approx(15)
+
+
+@pytest.mark.parametrize("state", [
+    {"phase": "work", "running": True, "remaining": 10, "deadline_wall": 0, "work_seconds": 0, "break_seconds": 20},
+    {"phase": "work", "running": False, "remaining": 10, "work_seconds": 60, "break_seconds": -5},
+    {"phase": "work", "running": True, "remaining": 10, "deadline_wall": "-Infinity",
+     "work_seconds": 60, "break_seconds": 20},
+    {"phase": "work", "running": False, "remaining": "NaN", "work_seconds": 60, "break_seconds": 20},
+    {"phase": "work"},
+])
+def test_estado_no_valido_empieza_de_cero(make_timer, tmp_path, state):
+    path = tmp_path / "pomodoro.json"
+    path.write_text(json.dumps(state), encoding="utf-8")
+    timer = make_timer(path)
+    assert (timer.phase, timer.running, timer.remaining()) == (WORK, False, 60)
+    assert timer.tick() == []
+
+
+def test_sin_archivo_no_guarda_nada(make_timer, tmp_path):
+    timer = make_timer(path=None)
+    timer.start()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_format_time():
+    assert format_time(0) == "00:00"
+    assert format_time(25 * 60) == "25:00"
+    assert format_time(61.9) == "01:01"
@@ -0,0 +1,67 @@
+import threading
+from datetime import date
+
+import pytest
+
+from api.quote_store import QuoteStore
+
+DAY = date(2024, 5, 17)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "quotes.sqlite3"
+
+
+def _wait_for_refresh():
+    for thread in threading.enumerate():
+        if thread.name == "quote-store-refresh":
+            thread.join(timeout=5)
+
+
+def test_frase_del_dia_determinista_entre_almacenes(tmp_path):
+    first = QuoteStore(tmp_path / "a.sqlite3").get_daily_quote(DAY)
+    second = QuoteStore(tmp_path / "b.sqlite3").get_daily_quote(DAY)
+    assert first == second
+    assert first["quote"] and first["author"]
+
+
+def test_la_frase_elegida_se_respeta_aunque_crezca_el_corpus(path):
+    store = QuoteStore(path)
+    chosen = store.get_daily_quote(DAY)
+    store.add_quotes([{"quote": f"Frase nueva {i}", "author": "Autor"} for i in range(50)])
+    # Otro proceso (otra conexión al mismo archivo) lee la elección guardada
+    assert QuoteStore(path).get_daily_quote(DAY) == chosen
+
+
+def test_add_quotes_ignora_repetidas(path):
+    store = QuoteStore(path)
+    before = store.count()
+    assert store.add_quotes([{"quote": "Única", "author": "A"}, {"quote": "Única", "author": "A"}]) == 1
+    assert store.count() == before + 1
+
+
+def test_solo_un_proceso_reserva_la_actualizacion_del_dia(path):
+    first, second = QuoteStore(path), QuoteStore(path)
+    assert first.claim_daily_refresh(DAY) is True
+    assert second.claim_daily_refresh(DAY) is False
+    assert first.claim_daily_refresh(DAY) is False
+
+    first.release_daily_refresh(DAY)
+    assert QuoteStore(path).claim_daily_refresh(DAY) is True
+
+
+def test_una_descarga_fallida_libera_la_reserva(path):
+    store = QuoteStore(path)
+    store.refresh_in_background(lambda: [])  # fetch_quotes devuelve [] sin conexión
+    _wait_for_refresh()
+    assert QuoteStore(path).claim_daily_refresh() is True
+
+
+def test_una_descarga_correcta_mantiene_la_reserva(path):
+    store = QuoteStore(path)
+    before = store.count()
+    store.refresh_in_background(lambda: [{"quote": "Desde la API", "author": "B"}])
+    _wait_for_refresh()
+    assert store.count() == before + 1
+    assert QuoteStore(path).claim_daily_refresh() is False
@@ -0,0 +1,88 @@
+import types
+
+import pytest
+
+from api import response_cache
+from api.response_cache import ResponseCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = headers or {}
+
+    def json(self):
+        return self.payload
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """Responde con ETag "v1" y 304 si el cliente ya lo tiene."""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, stream=False, **kwargs):
+        self.requests.append((url, dict(headers or {})))
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, {"url": url, "n": len(self.requests)}, {"ETag": '"v1"'})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = types.SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(response_cache, "time", types.SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
+
+
+@pytest.fixture
+def cache(tmp_path, session, clock):
+    return ResponseCache(tmp_path / "cache.sqlite3", max_entries=2, session=session)
+
+
+def test_entrada_fresca_no_toca_la_red(cache, session):
+    first = cache.get_json("https://x/a", ttl=60)
+    assert cache.get_json("https://x/a", ttl=60) == first
+    assert len(session.requests) == 1
+
+
+def test_entrada_caducada_se_sirve_y_se_revalida_con_etag(cache, session, clock):
+    first = cache.get_json("https://x/a", ttl=60)
+    clock.value += 120
+    assert cache.get_json("https://x/a", ttl=60) == first  # Sin esperar a la red
+    cache._executor.shutdown(wait=True)
+
+    url, headers = session.requests[-1]
+    assert headers["If-None-Match"] == '"v1"'
+    # El 304 renueva la fecha de descarga: vuelve a estar fresca
+    assert cache.get_json("https://x/a", ttl=60) == first
+    assert len(session.requests) == 2
+
+
+def test_expulsa_la_menos_usada(cache, session, clock):
+    for name in ("a", "b"):
+        cache.get_json(f"https://x/{name}")
+        clock.value += 1
+    cache.get_json("https://x/a")  # "a" pasa a ser la más reciente
+    clock.value += 1
+    cache.get_json("https://x/c")
+
+    assert cache._read("https://x/b") is None
+    assert cache._read("https://x/a") is not None
+    assert cache._read("https://x/c") is not None
+
+
+def test_la_clave_no_depende_del_orden_de_los_parametros():
+    assert ResponseCache.make_key("u", {"b": 1, "a": 2}) == ResponseCache.make_key("u", {"a": 2, "b": 1})
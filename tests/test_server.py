@@ -0,0 +1,164 @@
+"""Prueba de humo del servicio HTTP con una base de datos en memoria (mongomock-motor)."""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("aiohttp")
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+import database  # noqa: E402
+from server.app import create_app  # noqa: E402
+
+SECRET = "clave-de-pruebas-" + "x" * 32
+USER = {"username": "ana", "password": "secreta", "email": "ana@example.com"}
+
+
+@pytest.fixture(autouse=True)
+def fast_bcrypt(monkeypatch):
+    monkeypatch.setattr(database, "BCRYPT_ROUNDS", 4)
+
+
+@asynccontextmanager
+async def api_client():
+    app = create_app(db_name="edutracker_test", secret=SECRET, mongo_client=mongomock_motor.AsyncMongoMockClient())
+    async with TestClient(TestServer(app)) as client:
+        yield client
+
+
+async def login(client, user=USER):
+    response = await client.post("/auth/register", json=user)
+    assert response.status == 201
+    response = await client.post("/auth/login", json=user)
+    assert response.status == 200
+    return {"Authorization": f"Bearer {(await response.json())['token']}"}
+
+
+def test_registro_y_login():
+    async def scenario():
+        async with api_client() as client:
+            await login(client)
+
+            response = await client.post("/auth/register", json={**USER, "email": "otro@example.com"})
+            assert response.status == 409
+            assert (await response.json())["error"] == "El nombre de usuario ya existe."
+
+            response = await client.post("/auth/login", json={**USER, "password": "mala"})
+            assert response.status == 401
+
+            response = await client.get("/sessions")
+            assert response.status == 401
+
+    asyncio.run(scenario())
+
+
+def test_paginacion_de_sesiones_con_cursor():
+    async def scenario():
+        async with api_client() as client:
+            headers = await login(client)
+            start = datetime(2024, 1, 1, 10, 0)
+            for i in range(5):
+                body = {"materia": "Física", "duracion_minutos": 10 + i,
+                        "fecha_hora": (start + timedelta(hours=i)).isoformat()}
+                response = await client.post("/sessions", headers=headers, json=body)
+                assert response.status == 201
+
+            durations, params = [], {"limit": "2"}
+            while True:
+                response = await client.get("/sessions", headers=headers, params=params)
+                assert response.status == 200
+                page = await response.json()
+                assert len(page["items"]) <= 2
+                durations += [item["duracion_minutos"] for item in page["items"]]
+                if not page["cursor"]:
+                    break
+                params["cursor"] = page["cursor"]
+            # De la más reciente a la más antigua, sin repetir ni saltarse ninguna
+            assert durations == [14, 13, 12, 11, 10]
+
+    asyncio.run(scenario())
+
+
+def test_stats_y_metas_responden_304_hasta_que_cambian_los_datos():
+    async def scenario():
+        async with api_client() as client:
+            headers = await login(client)
+            await client.post("/goals", headers=headers, json={"materia": "Física", "minutos_objetivo": 60})
+
+            etags = {}
+            for path in ("/stats", "/goals"):
+                response = await client.get(path, headers=headers)
+                assert response.status == 200
+                etags[path] = response.headers["ETag"]
+
+                response = await client.get(path, headers={**headers, "If-None-Match": etags[path]})
+                assert response.status == 304
+
+            # Una sesión nueva cambia las estadísticas y el progreso de las metas
+            await client.post("/sessions", headers=headers, json={"materia": "Física", "duracion_minutos": 30})
+            for path, etag in etags.items():
+                response = await client.get(path, headers={**headers, "If-None-Match": etag})
+                assert response.status == 200
+                assert response.headers["ETag"] != etag
+
+    asyncio.run(scenario())
+
+
+def test_sync_acepta_rechaza_y_no_duplica():
+    async def scenario():
+        async with api_client() as client:
+            headers = await login(client)
+            # Cuerpo escrito a mano: 1e400 es un número JSON válido que se lee como infinito
+            body = """{"sessions": [
+                {"client_id": "c1", "materia": "Física", "duracion_minutos": 30, "fecha_hora": "2024-03-01T10:00:00"},
+                {"client_id": "c2", "materia": "Física", "duracion_minutos": 1e400, "fecha_hora": "2024-03-01T11:00:00"},
+                {"client_id": "c3", "materia": "Física", "duracion_minutos": 30, "fecha_hora": 1e20},
+                {"client_id": "c4", "materia": "Física", "duracion_minutos": 30, "fecha_hora": "0001-01-01T00:00:00"},
+                {"materia": "Física", "duracion_minutos": 30, "fecha_hora": "2024-03-01T12:00:00"}
+            ]}"""
+            response = await client.post("/sync", headers={**headers, "Content-Type": "application/json"}, data=body)
+            assert response.status == 200
+            result = await response.json()
+            assert result["accepted"] == ["c1"]
+            assert [item["client_id"] for item in result["rejected"]] == ["c2", "c3", "c4", None]
+            assert result["inserted"] == 1
+            assert result["goals"] == [] and result["subjects"] == []
+
+            # Reenviar el lote (respuesta perdida) no duplica; con las marcas al día no se descarga nada
+            session = {"client_id": "c1", "materia": "Física", "duracion_minutos": 30,
+                       "fecha_hora": "2024-03-01T10:00:00"}
+            response = await client.post("/sync", headers=headers,
+                                         json={"sessions": [session], "watermarks": result["watermarks"]})
+            again = await response.json()
+            assert again["accepted"] == ["c1"] and again["inserted"] == 0
+            assert "goals" not in again and "subjects" not in again
+
+            response = await client.get("/sessions", headers=headers)
+            assert len((await response.json())["items"]) == 1
+
+            # Una meta nueva cambia la marca de agua de las metas
+            await client.post("/goals", headers=headers, json={"materia": "Física", "minutos_objetivo": 60})
+            response = await client.post("/sync", headers=headers, json={"watermarks": again["watermarks"]})
+            changed = await response.json()
+            assert [goal["materia"] for goal in changed["goals"]] == ["Física"]
+            assert "subjects" not in changed
+
+    asyncio.run(scenario())
+
+
+def test_metrics_incluye_caches_y_breakers():
+    async def scenario():
+        async with api_client() as client:
+            headers = await login(client)
+            await client.get("/stats", headers=headers)
+
+            response = await client.get("/metrics")
+            assert response.status == 200
+            data = await response.json()
+            assert data["caches"]["stats_304"]["fallos"] == 1
+            assert isinstance(data["breakers"], list)
+
+    asyncio.run(scenario())
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+CALLERS = 8
+
+
+def test_do_agrupa_llamadas_simultaneas():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return ["resultado"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("clave", fetch))) for _ in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    # Los que no son el primero esperan al resultado compartido
+    deadline = time.monotonic() + 5
+    while len(flight._calls) != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [["resultado"]] * CALLERS
+    assert all(result is results[0] for result in results)
+    assert flight._calls == {}
+
+
+def test_do_comparte_la_excepcion_y_libera_la_clave():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("sin conexión")
+
+    def call():
+        try:
+            flight.do("clave", failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(errors) == 2
+    # No es una caché: al terminar, la siguiente llamada vuelve a ejecutar la función
+    assert flight.do("clave", lambda: "otra vez") == "otra vez"
+
+
+def test_do_async_agrupa_corrutinas_simultaneas():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return {"valor": value}
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do_async("clave", fetch, 1) for _ in range(CALLERS)))
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight._tasks == {}
+
+        # Claves distintas no se agrupan
+        await asyncio.gather(flight.do_async("a", fetch, 2), flight.do_async("b", fetch, 3))
+        assert calls == [1, 2, 3]
+
+    asyncio.run(scenario())
+
+
+def test_do_async_cancelar_un_llamador_no_cancela_la_llamada_compartida():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "hecho"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do_async("clave", fetch))
+        second = asyncio.ensure_future(flight.do_async("clave", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "hecho"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(scenario())
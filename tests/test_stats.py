@@ -0,0 +1,67 @@
+import argparse
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.stats import calcular_progreso_metas, consulta_sesiones_metas
+
+NOW = datetime(2024, 5, 15, 12, 0)
+
+
+def meta(materia, inicio=None, fin=None, **extra):
+    return {"_id": f"id-{materia}", "usuario_id": "ana", "materia": materia, "minutos_objetivo": 60,
+            "fecha_inicio": inicio, "fecha_fin": fin, "completada": False, **extra}
+
+
+def sesion(materia, fecha, minutos=30):
+    return {"materia": materia, "duracion_minutos": minutos, "fecha_hora": fecha}
+
+
+def test_consulta_cubre_todas_las_metas_con_periodo():
+    metas = [meta("Física", NOW - timedelta(days=7), NOW + timedelta(days=1)),
+             meta("Álgebra", NOW - timedelta(days=3), NOW + timedelta(days=4)),
+             meta("Química")]
+    assert consulta_sesiones_metas("ana", metas) == {
+        "usuario_id": "ana",
+        "materia": {"$in": ["Física", "Álgebra"]},
+        "fecha_hora": {"$gte": NOW - timedelta(days=7), "$lt": NOW + timedelta(days=4)},
+    }
+
+
+def test_consulta_sin_metas_con_periodo_no_devuelve_nada():
+    assert consulta_sesiones_metas("ana", [meta("Química")]) == {"usuario_id": "ana", "materia": {"$in": []}}
+
+
+def test_progreso_cuenta_solo_las_sesiones_del_periodo():
+    metas = [meta("Física", NOW - timedelta(days=7), NOW + timedelta(days=1)),
+             meta("Química", NOW - timedelta(days=14), NOW - timedelta(days=7)),
+             meta("Historia")]
+    sesiones = [sesion("Física", NOW - timedelta(days=1)),
+                sesion("Física", NOW - timedelta(days=8)),
+                sesion("Química", NOW - timedelta(days=10), 90),
+                sesion("Historia", NOW - timedelta(days=1))]
+
+    fisica, quimica, historia = calcular_progreso_metas(metas, sesiones, NOW)
+    assert (fisica["minutos_logrados"], fisica["progreso"], fisica["estado"]) == (30, 50.0, "Activa")
+    assert (quimica["minutos_logrados"], quimica["progreso"], quimica["estado"]) == (90, 150.0, "Vencida")
+    # Sin periodo: no acumula sesiones ni vence
+    assert (historia["minutos_logrados"], historia["estado"], historia["fecha_fin"]) == (0, "Activa", None)
+
+
+def test_cmd_goals_con_metas_sin_fecha_de_fin():
+    mongomock = pytest.importorskip("mongomock")
+    from ui.commands import Context, cmd_goals
+
+    ctx = Context()
+    ctx._db = mongomock.MongoClient()["edutracker_test"]
+    now = datetime.now()
+    ctx.db.metas.insert_many([meta("Física", now - timedelta(days=1), now + timedelta(days=6)), meta("Historia")])
+    ctx.db.sesiones_estudio.insert_one({"usuario_id": "ana", **sesion("Física", now - timedelta(hours=1))})
+
+    args = argparse.Namespace(users=["ana"], all_users=False, all=False)
+    rows, _ = cmd_goals(args, ctx)
+    assert [(r["materia"], r["minutos_logrados"]) for r in rows] == [("Física", 30)]
+
+    args.all = True
+    rows, _ = cmd_goals(args, ctx)
+    assert sorted((r["materia"], r["minutos_logrados"]) for r in rows) == [("Física", 30), ("Historia", 0)]
@@ -0,0 +1,252 @@
+import itertools
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+BACKGROUND_WORKERS = 4
+POLL_INTERVAL_MS = 30
+
+# Tipos de mensaje que los hilos dejan en la cola de resultados
+_ITEM = "item"
+_RESULT = "result"
+_ERROR = "error"
+
+# Prefijo de las claves internas de las tareas enviadas sin clave
+_UNIQUE = "_unique"
+
+
+def _is_unique(key) -> bool:
+    return isinstance(key, tuple) and len(key) == 2 and key[0] == _UNIQUE
+
+
+class BackgroundExecutor:
+    """
+    Capa de ejecución en segundo plano para la interfaz Tk.
+
+    Las consultas a la base de datos y a las APIs se ejecutan en un pool de
+    hilos; sus resultados se dejan en una cola que el hilo de Tk vacía con
+    `after()`, de modo que los callbacks siempre se ejecutan en el hilo de Tk y
+    la ventana nunca se bloquea esperando una consulta.
+
+    Cada tarea lleva una clave. Enviar una tarea con una clave que ya tiene otra
+    en curso la reemplaza: la anterior se cancela si aún no ha empezado y, si ya
+    se está ejecutando, su resultado se descarta al llegar. Así, recargar un
+    panel varias veces seguidas solo pinta los datos de la última petición.
+    Las tareas sin clave (por ejemplo, guardados) nunca se descartan.
+    """
+
+    def __init__(self, widget, workers: int = BACKGROUND_WORKERS):
+        """
+        Inicializa el executor.
+
+        Args:
+            widget: Widget de Tk usado para programar el sondeo de la cola
+            workers: Número de hilos del pool
+        """
+        self.widget = widget
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gui")
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._generations: Dict[Hashable, int] = {}
+        self._futures: Dict[Hashable, Future] = {}
+        self._callbacks: Dict[Any, Dict[str, Optional[Callable]]] = {}
+        self._unique_keys = itertools.count()
+        self._polling = False
+
+    def submit(self, key: Optional[Hashable], fn: Callable[..., Any], *args,
+               on_success: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_done: Optional[Callable[[], None]] = None, **kwargs) -> None:
+        """
+        Ejecuta `fn` en segundo plano. Debe llamarse desde el hilo de Tk.
+
+        Args:
+            key: Clave de la tarea; una nueva tarea con la misma clave reemplaza
+                 a la anterior. None para una tarea que no se puede reemplazar.
+            fn: Función bloqueante a ejecutar
+            on_success: Recibe el resultado de `fn` (hilo de Tk)
+            on_error: Recibe la excepción lanzada por `fn` (hilo de Tk)
+            on_done: Se llama al terminar, con éxito o con error (hilo de Tk)
+        """
+        self._submit(key, self._run, fn, args, kwargs,
+                     {"item": None, "success": on_success, "error": on_error, "done": on_done})
+
+    def submit_iter(self, key: Optional[Hashable], fn: Callable[..., Iterable[Any]], *args,
+                    on_item: Callable[[Any], None],
+                    on_error: Optional[Callable[[Exception], None]] = None,
+                    on_done: Optional[Callable[[], None]] = None, **kwargs) -> None:
+        """
+        Ejecuta en segundo plano una función que produce resultados poco a poco.
+
+        Cada elemento se entrega a `on_item` en el hilo de Tk en cuanto está
+        disponible. Si la tarea se reemplaza o se cancela, deja de consumirse
+        el iterador.
+
+        Args:
+            key: Clave de la tarea (ver `submit`)
+            fn: Función que devuelve un iterable
+            on_item: Recibe cada elemento (hilo de Tk)
+            on_error: Recibe la excepción lanzada al iterar (hilo de Tk)
+            on_done: Se llama al terminar (hilo de Tk)
+        """
+        self._submit(key, self._run_iter, fn, args, kwargs,
+                     {"item": on_item, "success": None, "error": on_error, "done": on_done})
+
+    def cancel(self, key: Hashable) -> None:
+        """Descarta la tarea en curso con esa clave. Sus callbacks no se llamarán."""
+        with self._lock:
+            self._invalidate(key)
+
+    def cancel_all(self) -> None:
+        """Descarta todas las tareas con clave en curso (por ejemplo, al cambiar de usuario)."""
+        with self._lock:
+            for key in list(self._futures):
+                if not _is_unique(key):
+                    self._invalidate(key)
+
+    def is_pending(self, key: Hashable) -> bool:
+        """Indica si hay una tarea vigente con esa clave."""
+        with self._lock:
+            return key in self._futures
+
+    def shutdown(self) -> None:
+        """Descarta las tareas pendientes y detiene el pool."""
+        with self._lock:
+            for key in list(self._futures):
+                self._invalidate(key)
+        self._executor.shutdown(wait=False)
+
+    def _submit(self, key, runner, fn, args, kwargs, callbacks):
+        if key is None:
+            key = (_UNIQUE, next(self._unique_keys))
+        with self._lock:
+            self._invalidate(key)
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+            self._callbacks[(key, generation)] = callbacks
+            future = self._executor.submit(runner, key, generation, fn, args, kwargs)
+            self._futures[key] = future
+        self._start_polling()
+
+    def _invalidate(self, key):
+        """Marca como obsoleta la tarea actual de una clave (con el lock tomado)."""
+        future = self._futures.pop(key, None)
+        if future is None:
+            return
+        future.cancel()  # Solo tiene efecto si aún no ha empezado
+        generation = self._generations[key]
+        self._callbacks.pop((key, generation), None)
+        self._generations[key] = generation + 1
+
+    def _is_current(self, key, generation) -> bool:
+        with self._lock:
+            return self._generations.get(key) == generation and key in self._futures
+
+    def _run(self, key, generation, fn, args, kwargs):
+        """Ejecuta la tarea (hilo del pool)."""
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._results.put((_ERROR, key, generation, e))
+        else:
+            self._results.put((_RESULT, key, generation, result))
+
+    def _run_iter(self, key, generation, fn, args, kwargs):
+        """Consume el iterable de la tarea mientras siga vigente (hilo del pool)."""
+        try:
+            for item in fn(*args, **kwargs):
+                if not self._is_current(key, generation):
+                    return
+                self._results.put((_ITEM, key, generation, item))
+        except Exception as e:
+            self._results.put((_ERROR, key, generation, e))
+        else:
+            self._results.put((_RESULT, key, generation, None))
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.widget.after(POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        """Entrega en el hilo de Tk los resultados de las tareas vigentes."""
+        try:
+            while True:
+                kind, key, generation, value = self._results.get_nowait()
+                with self._lock:
+                    callbacks = self._callbacks.get((key, generation))
+                    if callbacks is None:
+                        continue  # Tarea reemplazada o cancelada
+                    if kind != _ITEM:
+                        del self._callbacks[(key, generation)]
+                        self._futures.pop(key, None)
+                        if _is_unique(key):
+                            del self._generations[key]
+
+                if kind == _ITEM:
+                    self._dispatch(callbacks["item"], value)
+                elif kind == _RESULT:
+                    self._dispatch(callbacks["success"], value)
+                    self._dispatch(callbacks["done"])
+                else:
+                    if callbacks["error"] is not None:
+                        self._dispatch(callbacks["error"], value)
+                    else:
+                        print(f"Error en tarea en segundo plano: {value}")
+                    self._dispatch(callbacks["done"])
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            pending = bool(self._futures)
+        if pending:
+            self.widget.after(POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False
+
+    @staticmethod
+    def _dispatch(callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            # Un callback que falla (p. ej., su ventana ya se cerró) no debe detener el sondeo
+            print(f"Error al procesar el resultado de una tarea: {e}")
+
+
+class LoadingIndicator:
+    """
+    Indicador de carga superpuesto en la esquina superior derecha de un panel.
+
+    Se muestra mientras haya alguna tarea activa asociada y se oculta cuando
+    terminan todas. Usa `place`, así que no altera la distribución del panel.
+    """
+
+    def __init__(self, parent, text: str = "Cargando...", **label_options):
+        """
+        Inicializa el indicador.
+
+        Args:
+            parent: Panel sobre el que se muestra
+            text: Texto del indicador
+            label_options: Opciones adicionales para el Label (colores, fuente)
+        """
+        label_options.setdefault("font", ("Helvetica", 8, "italic"))
+        self.label = tk.Label(parent, text=text, **label_options)
+        self._active = set()
+
+    def show(self, key: Hashable = None) -> None:
+        """Muestra el indicador para la tarea `key`."""
+        self._active.add(key)
+        if self.label.winfo_exists():
+            self.label.place(relx=1.0, rely=0.0, anchor="ne")
+            self.label.lift()
+
+    def hide(self, key: Hashable = None) -> None:
+        """Indica que la tarea `key` terminó; se oculta si no queda ninguna."""
+        self._active.discard(key)
+        if not self._active and self.label.winfo_exists():
+            self.label.place_forget()
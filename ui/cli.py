@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 
@@ -10,9 +11,10 @@ from models.usuario import Usuario
 from models.estudio import Estudio
 from models.meta import Meta, PeriodoMeta
 from database.mongo_client import MongoDBClient, MongoRepository
-from api.quotes_api import QuotesAPI
+from api.quote_provider import get_quote_provider
 from api.books_api import BooksAPI
 from utils.stats import calcular_estadisticas
+from utils.pomodoro import WORK, format_time, get_pomodoro_timer
 
 class CLI:
     """Interfaz de línea de comandos para la aplicación EduTracker."""
@@ -28,7 +30,7 @@ class CLI:
         self.usuario_repo = MongoRepository(db_client, "usuarios", Usuario)
         self.estudio_repo = MongoRepository(db_client, "estudios", Estudio)
         self.meta_repo = MongoRepository(db_client, "metas", Meta)
-        self.quotes_api = QuotesAPI()
+        self.quote_provider = get_quote_provider()
         self.books_api = BooksAPI()
         self.usuario_actual = None
     
@@ -66,6 +68,7 @@ class CLI:
                 print("6. Buscar recursos")
                 print("7. Gestionar materias")
                 print("8. Cerrar sesión")
+                print("9. Temporizador Pomodoro")
                 print("0. Salir")
                 
                 opcion = input("\nSeleccione una opción: ")
@@ -86,6 +89,8 @@ class CLI:
                     self._gestionar_materias()
                 elif opcion == "8":
                     self.usuario_actual = None
+                elif opcion == "9":
+                    self._temporizador_pomodoro()
                 elif opcion == "0":
                     print("\n¡Gracias por usar EduTracker!")
                     sys.exit(0)
@@ -99,7 +104,8 @@ class CLI:
     def _mostrar_frase_motivacional(self):
         """Muestra una frase motivacional aleatoria."""
         try:
-            quote = self.quotes_api.get_random_quote()
+            # Lectura en memoria: las frases se descargan en segundo plano
+            quote = self.quote_provider.get_quote()
             if quote:
                 print("\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
                 print(f'"{quote["quote"]}"')
@@ -416,10 +422,20 @@ class CLI:
         print("\nMaterias disponibles:")
         for i, materia in enumerate(materias, 1):
             print(f"{i}. {materia}")
+        print("T. Todas mis materias")
+        print("L. Buscar en libros guardados (sin conexión)")
         
         # Seleccionar materia
+        opcion = input("\nSeleccione una materia (número, T o L): ")
+        if opcion.strip().lower() == "t":
+            self._buscar_recursos_todas(materias)
+            return
+        if opcion.strip().lower() == "l":
+            self._buscar_recursos_locales()
+            return
+        
         try:
-            seleccion = int(input("\nSeleccione una materia (número): "))
+            seleccion = int(opcion)
             if seleccion < 1 or seleccion > len(materias):
                 input("\nSelección inválida. Presione Enter para continuar...")
                 return
@@ -437,16 +453,129 @@ class CLI:
             print("\nNo se encontraron libros relacionados.")
         else:
             print("\nLibros recomendados:")
-            for i, libro in enumerate(libros, 1):
-                autores = ", ".join(libro["authors"])
-                print(f"\n{i}. {libro['title']} ({libro['year']})")
-                print(f"   Autor(es): {autores}")
-                if "subjects" in libro and libro["subjects"]:
-                    temas = ", ".join(libro["subjects"][:3])  # Mostrar solo los primeros 3 temas
-                    print(f"   Temas: {temas}")
+            self._imprimir_libros(libros)
+        
+        input("\nPresione Enter para continuar...")
+    
+    def _buscar_recursos_todas(self, materias: List[str]):
+        """
+        Busca recursos para todas las materias a la vez.
+        
+        Los resultados se muestran a medida que llega la respuesta de cada materia.
+        
+        Args:
+            materias: Materias del usuario
+        """
+        print(f"\nBuscando libros para {len(materias)} materias...")
+        
+        for materia, libros in self.books_api.iter_books_by_subjects(materias):
+            print(f"\n===== {materia} =====")
+            if not libros:
+                print("No se encontraron libros relacionados.")
+            else:
+                self._imprimir_libros(libros)
+        
+        input("\nPresione Enter para continuar...")
+    
+    def _buscar_recursos_locales(self):
+        """Busca en los libros ya descargados usando el índice local."""
+        consulta = input("\nTexto a buscar (título, autor o tema): ")
+        if not consulta.strip():
+            input("\nLa búsqueda no puede estar vacía. Presione Enter para continuar...")
+            return
+        
+        libros = self.books_api.search_local(consulta, limit=10)
+        if not libros:
+            print("\nNo se encontraron libros guardados para esa búsqueda.")
+        else:
+            print("\nLibros guardados:")
+            self._imprimir_libros(libros)
         
         input("\nPresione Enter para continuar...")
     
+    def _imprimir_libros(self, libros: List[Dict[str, Any]]):
+        """
+        Muestra una lista de libros.
+        
+        Args:
+            libros: Libros devueltos por BooksAPI
+        """
+        for i, libro in enumerate(libros, 1):
+            autores = ", ".join(libro["authors"])
+            print(f"\n{i}. {libro['title']} ({libro['year']})")
+            print(f"   Autor(es): {autores}")
+            if "subjects" in libro and libro["subjects"]:
+                temas = ", ".join(libro["subjects"][:3])  # Mostrar solo los primeros 3 temas
+                print(f"   Temas: {temas}")
+    
+    def _temporizador_pomodoro(self):
+        """Temporizador Pomodoro en la consola. Comparte el estado guardado con la interfaz gráfica."""
+        timer = get_pomodoro_timer()
+        while True:
+            self._limpiar_pantalla()
+            print("\n===== Temporizador Pomodoro =====")
+            self._avisar_cambios_pomodoro(timer.tick())
+            
+            fase = "Trabajo" if timer.phase == WORK else "Descanso"
+            estado = "en marcha" if timer.running else "en pausa"
+            print(f"\n{fase}: {format_time(timer.display_seconds())} ({estado})")
+            
+            print("\n1. Iniciar / ver el tiempo")
+            print("2. Pausar")
+            print("3. Reiniciar")
+            print("4. Cambiar la duración de la fase actual")
+            print("0. Volver")
+            
+            opcion = input("\nSeleccione una opción: ")
+            
+            if opcion == "1":
+                timer.start()
+                self._mostrar_pomodoro(timer)
+            elif opcion == "2":
+                timer.pause()
+            elif opcion == "3":
+                timer.reset()
+            elif opcion == "4":
+                try:
+                    minutos = int(input("\nMinutos: "))
+                    if minutos <= 0:
+                        raise ValueError
+                except ValueError:
+                    input("\nDebe ingresar un número mayor a 0. Presione Enter para continuar...")
+                    continue
+                if not timer.set_duration(minutos * 60):
+                    input("\nPause el temporizador antes de cambiar la duración. Presione Enter para continuar...")
+            elif opcion == "0":
+                return
+            else:
+                input("\nOpción inválida. Presione Enter para continuar...")
+    
+    def _mostrar_pomodoro(self, timer):
+        """
+        Muestra la cuenta atrás hasta que el usuario pulsa Ctrl+C.
+        
+        Solo se despierta cuando cambia el segundo mostrado; el temporizador
+        sigue en marcha al volver al menú.
+        """
+        print("\nPresione Ctrl+C para volver al menú.\n")
+        try:
+            while timer.running:
+                self._avisar_cambios_pomodoro(timer.tick())
+                fase = "Trabajo " if timer.phase == WORK else "Descanso"
+                print(f"\r{fase} {format_time(timer.display_seconds())}", end="", flush=True)
+                time.sleep(timer.seconds_until_change() or 0)
+        except KeyboardInterrupt:
+            print()
+    
+    def _avisar_cambios_pomodoro(self, cambios):
+        """Avisa de los cambios de fase del temporizador (solo del último si hay varios)."""
+        if not cambios:
+            return
+        if cambios[-1][1] == WORK:
+            print("\a\n¡Descanso terminado! Es hora de volver al trabajo.")
+        else:
+            print("\a\n¡Tiempo de trabajo completado! Es hora de un descanso.")
+    
     def _gestionar_materias(self):
         """Gestiona las materias del usuario."""
         while True:
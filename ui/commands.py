@@ -0,0 +1,418 @@
+"""
+Comandos no interactivos de EduTracker para scripts, tuberías y cron.
+
+A diferencia de `ui/cli.py` (menús con input()), cada subcomando recibe todo
+por argumentos, escribe el resultado en stdout como JSON, JSON Lines o CSV y
+termina con un código de salida (0 correcto, 1 error, 2 argumentos inválidos).
+Los mensajes de diagnóstico van a stderr para no mezclarse con los datos.
+
+Usa el mismo modelo de datos que la interfaz gráfica (colecciones `users`,
+`sesiones_estudio` y `metas`, con el nombre de usuario como `usuario_id`) y
+abre una sola conexión a MongoDB por invocación, solo si el comando la necesita.
+
+Uso:
+    python -m ui.commands log-session --user ana --subject Física --minutes 45
+    python -m ui.commands sessions --user ana --since 7d --format csv
+    python -m ui.commands stats --all-users --format jsonl
+    python -m ui.commands goals --user ana --user luis
+    python -m ui.commands search-books "álgebra lineal" --limit 3
+    python -m ui.commands import-sessions historico.csv --workers 8
+    python -m ui.commands export --all-users --to parquet --parts 8 --output exportacion/
+"""
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from models.estudio import Estudio
+from utils.stats import calcular_estadisticas, calcular_progreso_metas, consulta_sesiones_metas
+
+FORMATS = ("json", "jsonl", "csv")
+
+SESSION_FIELDS = ["id", "usuario", "materia", "duracion_minutos", "fecha_hora", "notas"]
+STATS_FIELDS = ["usuario", "total_sesiones", "total_minutos", "promedio_diario_ultima_semana",
+                "minutos_por_materia", "minutos_por_dia_semana"]
+GOAL_FIELDS = ["id", "usuario", "materia", "periodo", "minutos_objetivo", "minutos_logrados",
+               "progreso", "estado", "fecha_inicio", "fecha_fin"]
+BOOK_FIELDS = ["title", "authors", "year", "subjects", "cover_url"]
+IMPORT_FIELDS = ["filas_leidas", "filas_omitidas", "filas_rechazadas", "sesiones_insertadas",
+                 "sesiones_duplicadas", "lotes", "materias_creadas", "metas_completadas",
+                 "segundos", "filas_por_segundo", "insertadas_por_segundo", "errores"]
+EXPORT_FIELDS = ["conjunto", "archivo", "desde", "hasta", "sin_fecha", "filas", "bytes", "segundos"]
+
+# Documentos que se piden a MongoDB por viaje al recorrer cursores grandes
+CURSOR_BATCH_SIZE = 1000
+
+
+class CommandError(Exception):
+    """Error que se muestra al usuario en stderr y termina con código 1."""
+
+
+class Context:
+    """Estado compartido por una invocación: una única conexión a la base de datos."""
+
+    def __init__(self):
+        self._db = None
+
+    @property
+    def db(self):
+        """Base de datos, conectando la primera vez que se usa."""
+        if self._db is None:
+            # pymongo y bcrypt solo se importan si el comando usa la base de datos
+            from database import connect_to_db
+            self._db = connect_to_db()
+            if self._db is None:
+                raise CommandError("No se pudo conectar a la base de datos.")
+        return self._db
+
+    def close(self):
+        if self._db is not None:
+            import database
+            if database.client is not None:
+                database.client.close()
+            self._db = None
+
+
+# --- Argumentos ---
+
+def parse_time(text: str) -> datetime:
+    """
+    Convierte un argumento de fecha en datetime.
+
+    Acepta fechas ISO ("2024-05-01", "2024-05-01T08:30") o intervalos
+    relativos a ahora ("30m", "12h", "7d", "2w").
+    """
+    units = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+    text = text.strip()
+    if text[-1:].lower() in units and text[:-1].isdigit():
+        return datetime.now() - timedelta(**{units[text[-1].lower()]: int(text[:-1])})
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha no válida: '{text}' (use AAAA-MM-DD[THH:MM] o 7d, 12h...)")
+
+
+def positive_int(text: str) -> int:
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"debe ser un entero positivo: '{text}'")
+    return value
+
+
+def _user_filter(args) -> Dict[str, Any]:
+    """Filtro por `usuario_id` según --user / --all-users."""
+    if args.all_users:
+        return {}
+    return {"usuario_id": args.users[0] if len(args.users) == 1 else {"$in": args.users}}
+
+
+def _date_filter(args, field: str = "fecha_hora") -> Dict[str, Any]:
+    condition = {}
+    if getattr(args, "since", None):
+        condition["$gte"] = args.since
+    if getattr(args, "until", None):
+        condition["$lt"] = args.until
+    return {field: condition} if condition else {}
+
+
+# --- Salida ---
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    return str(value)
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    if isinstance(value, (list, tuple)) and all(isinstance(v, str) for v in value):
+        return "; ".join(value)
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    return "" if value is None else value
+
+
+def write_rows(rows: Iterable[Dict[str, Any]], fields: Sequence[str], fmt: str, out) -> int:
+    """
+    Escribe filas en el formato pedido.
+
+    JSON Lines y CSV se escriben fila a fila según llegan (sirven para
+    resultados de cualquier tamaño); JSON escribe una única lista.
+
+    Returns:
+        Número de filas escritas
+    """
+    count = 0
+    if fmt == "json":
+        rows = list(rows)
+        json.dump(rows, out, ensure_ascii=False, indent=2, default=_json_default)
+        out.write("\n")
+        return len(rows)
+
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=list(fields), extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: _csv_value(row.get(key)) for key in fields})
+            count += 1
+        return count
+
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False, default=_json_default))
+        out.write("\n")
+        count += 1
+    return count
+
+
+# --- Subcomandos ---
+
+def _session_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc["_id"]),
+        "usuario": doc.get("usuario_id"),
+        "materia": doc.get("materia"),
+        "duracion_minutos": doc.get("duracion_minutos", 0),
+        "fecha_hora": doc.get("fecha_hora"),
+        "notas": doc.get("notas"),
+    }
+
+
+def cmd_log_session(args, ctx: Context):
+    """Registra una sesión de estudio y devuelve el documento guardado."""
+    sesion = Estudio(args.user, args.subject, args.minutes, args.notes, args.at)
+    data = sesion.to_dict()
+    data["_id"] = ctx.db.sesiones_estudio.insert_one(dict(data)).inserted_id
+    from database.versions import bump_version
+    bump_version(ctx.db, args.user, "sessions")
+    return [_session_row(data)], SESSION_FIELDS
+
+
+def cmd_sessions(args, ctx: Context):
+    """Lista sesiones, de la más reciente a la más antigua, sin cargarlas todas en memoria."""
+    query = {**_user_filter(args), **_date_filter(args)}
+    if args.subject:
+        query["materia"] = args.subject
+    cursor = ctx.db.sesiones_estudio.find(query).sort([("fecha_hora", -1), ("_id", -1)])
+    cursor = cursor.batch_size(CURSOR_BATCH_SIZE)
+    if args.limit:
+        cursor = cursor.limit(args.limit)
+    return (_session_row(doc) for doc in cursor), SESSION_FIELDS
+
+
+def cmd_stats(args, ctx: Context):
+    """Estadísticas por usuario con `calcular_estadisticas`, las mismas que en el menú interactivo."""
+    query = {**_user_filter(args), **_date_filter(args)}
+    projection = {"usuario_id": 1, "materia": 1, "duracion_minutos": 1, "fecha_hora": 1}
+    # Ordenado por usuario para agrupar en streaming: en memoria solo hay un usuario a la vez
+    cursor = ctx.db.sesiones_estudio.find(query, projection).sort("usuario_id", 1)
+    cursor = cursor.batch_size(CURSOR_BATCH_SIZE)
+
+    def rows():
+        seen = set()
+        for usuario, docs in itertools.groupby(cursor, key=lambda doc: doc.get("usuario_id")):
+            seen.add(usuario)
+            yield {"usuario": usuario, **calcular_estadisticas([Estudio.from_dict(d) for d in docs])}
+        # Los usuarios pedidos sin sesiones también aparecen, con estadísticas a cero
+        for usuario in args.users or []:
+            if usuario not in seen:
+                yield {"usuario": usuario, **calcular_estadisticas([])}
+
+    return rows(), STATS_FIELDS
+
+
+def cmd_goals(args, ctx: Context):
+    """Metas con su progreso. Por defecto solo las activas, como el resumen del dashboard."""
+    query = _user_filter(args)
+    if not args.all:
+        query["completada"] = False
+    metas = list(ctx.db.metas.find(query).sort([("usuario_id", 1), ("fecha_inicio", -1)]))
+    now = datetime.now()
+    if not args.all:
+        # Igual que el servidor: una meta sin fecha de fin no está activa
+        metas = [m for m in metas if m.get("fecha_fin") and m["fecha_fin"] >= now]
+
+    def rows():
+        for usuario, group in itertools.groupby(metas, key=lambda m: m.get("usuario_id")):
+            group = list(group)
+            sesiones = list(ctx.db.sesiones_estudio.find(consulta_sesiones_metas(usuario, group),
+                                                         {"materia": 1, "duracion_minutos": 1, "fecha_hora": 1}))
+            yield from calcular_progreso_metas(group, sesiones, now)
+
+    return rows(), GOAL_FIELDS
+
+
+def cmd_search_books(args, ctx: Context):
+    """Busca libros en Open Library (o solo en el índice local con --offline)."""
+    from api.books_api import BooksAPI
+    api = BooksAPI()
+    if args.offline:
+        books = api.search_local(args.query, limit=args.limit)
+    else:
+        books = api.search_books(args.query, limit=args.limit)
+    if args.breakers:
+        from api.circuit_breaker import breaker_metrics
+        # Diagnóstico: va a stderr junto al resto de mensajes
+        for metrics in breaker_metrics():
+            print(json.dumps(metrics, ensure_ascii=False))
+    return books, BOOK_FIELDS
+
+
+def cmd_import_sessions(args, ctx: Context):
+    """Importa sesiones históricas desde CSV o JSONL; se puede reanudar si se interrumpe."""
+    from database.importer import SessionImporter, default_checkpoint_path
+
+    def progress(stats):
+        print(f"{stats['filas_leidas']} filas, {stats['sesiones_insertadas']} insertadas "
+              f"({stats['insertadas_por_segundo']}/s)", file=sys.stderr)
+
+    if not os.path.exists(args.file):
+        raise CommandError(f"No existe el archivo {args.file}")
+    importer = SessionImporter(ctx.db, batch_size=args.batch_size, workers=args.workers,
+                               checkpoint_path=args.checkpoint or default_checkpoint_path(args.file),
+                               default_user=args.user, on_progress=progress)
+    return [importer.run(args.file, restart=args.restart)], IMPORT_FIELDS
+
+
+def cmd_export(args, ctx: Context):
+    """Exporta sesiones, metas y materias a JSONL comprimido o Parquet, por partes en paralelo."""
+    from database.exporter import Exporter
+    exporter = Exporter(ctx.db, batch_size=args.batch_size)
+    try:
+        summary = exporter.export(args.what or ["sessions", "goals", "subjects"], args.output, args.to,
+                                  users=None if args.all_users else args.users,
+                                  start=args.since, end=args.until, parts=args.parts, workers=args.workers)
+    except RuntimeError as e:
+        raise CommandError(str(e))
+    return summary, EXPORT_FIELDS
+
+
+# --- Parser ---
+
+def _add_output(parser):
+    parser.add_argument("--format", choices=FORMATS, default="json", help="Formato de salida (por defecto json)")
+
+
+def _add_users(parser):
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("-u", "--user", dest="users", action="append", metavar="USUARIO",
+                       help="Usuario (se puede repetir)")
+    group.add_argument("--all-users", action="store_true", help="Todos los usuarios")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m ui.commands", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", metavar="COMANDO", required=True)
+
+    p = subparsers.add_parser("log-session", help="Registra una sesión de estudio")
+    p.add_argument("-u", "--user", required=True)
+    p.add_argument("-s", "--subject", required=True)
+    p.add_argument("-m", "--minutes", type=positive_int, required=True)
+    p.add_argument("--notes", default="")
+    p.add_argument("--at", type=parse_time, default=None, help="Fecha de la sesión (por defecto ahora)")
+    _add_output(p)
+    p.set_defaults(handler=cmd_log_session)
+
+    p = subparsers.add_parser("sessions", help="Lista sesiones de estudio")
+    _add_users(p)
+    p.add_argument("--since", type=parse_time, help="Desde (AAAA-MM-DD o 7d, 12h...)")
+    p.add_argument("--until", type=parse_time, help="Hasta, sin incluir")
+    p.add_argument("--subject")
+    p.add_argument("--limit", type=positive_int)
+    _add_output(p)
+    p.set_defaults(handler=cmd_sessions)
+
+    p = subparsers.add_parser("stats", help="Estadísticas de estudio por usuario")
+    _add_users(p)
+    p.add_argument("--since", type=parse_time)
+    p.add_argument("--until", type=parse_time)
+    _add_output(p)
+    p.set_defaults(handler=cmd_stats)
+
+    p = subparsers.add_parser("goals", help="Metas y su progreso")
+    _add_users(p)
+    p.add_argument("--all", action="store_true", help="Incluir metas completadas y vencidas")
+    _add_output(p)
+    p.set_defaults(handler=cmd_goals)
+
+    p = subparsers.add_parser("search-books", help="Busca libros")
+    p.add_argument("query")
+    p.add_argument("--limit", type=positive_int, default=5)
+    p.add_argument("--offline", action="store_true", help="Buscar solo en los libros guardados")
+    p.add_argument("--breakers", action="store_true",
+                   help="Mostrar en stderr el estado de los circuit breakers al terminar")
+    _add_output(p)
+    p.set_defaults(handler=cmd_search_books)
+
+    p = subparsers.add_parser("import-sessions", help="Importa sesiones desde CSV o JSONL (también .gz)")
+    p.add_argument("file")
+    p.add_argument("-u", "--user", help="Usuario de las filas que no lo indican")
+    p.add_argument("--batch-size", type=positive_int, default=1000, help="Sesiones por lote")
+    p.add_argument("--workers", type=positive_int, default=4, help="Lotes que se escriben a la vez")
+    p.add_argument("--checkpoint", help="Archivo de checkpoint (por defecto en el directorio de datos)")
+    p.add_argument("--restart", action="store_true", help="Ignorar el checkpoint y empezar de cero")
+    _add_output(p)
+    p.set_defaults(handler=cmd_import_sessions)
+
+    p = subparsers.add_parser("export", help="Exporta datos a JSONL comprimido o Parquet")
+    _add_users(p)
+    p.add_argument("--what", nargs="+", choices=["sessions", "goals", "subjects"],
+                   help="Conjuntos a exportar (por defecto todos)")
+    p.add_argument("--to", choices=["jsonl", "parquet"], default="jsonl",
+                   help="jsonl (gzip) o parquet (necesita pyarrow)")
+    p.add_argument("-o", "--output", default="exportacion", help="Directorio de salida")
+    p.add_argument("--since", type=parse_time)
+    p.add_argument("--until", type=parse_time)
+    p.add_argument("--parts", type=positive_int, default=1,
+                   help="Intervalos de tiempo en que se divide cada conjunto (un archivo por intervalo)")
+    p.add_argument("--workers", type=positive_int, default=4, help="Partes que se exportan a la vez")
+    p.add_argument("--batch-size", type=positive_int, default=2000, help="Documentos por viaje del cursor")
+    _add_output(p)
+    p.set_defaults(handler=cmd_export)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, out=None) -> int:
+    """
+    Ejecuta un subcomando.
+
+    Returns:
+        Código de salida
+    """
+    args = build_parser().parse_args(argv)
+    out = out or sys.stdout
+    ctx = Context()
+    try:
+        # Los print() de diagnóstico de otros módulos van a stderr; stdout queda solo para datos
+        with contextlib.redirect_stdout(sys.stderr):
+            rows, fields = args.handler(args, ctx)
+            write_rows(rows, fields, args.format, out)
+        return 0
+    except CommandError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Por ejemplo, `... | head`: no es un error
+        return 0
+    except Exception as e:
+        from pymongo.errors import PyMongoError
+        if not isinstance(e, PyMongoError):
+            raise
+        print(f"Error de base de datos: {e}", file=sys.stderr)
+        return 1
+    finally:
+        ctx.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
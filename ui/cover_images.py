@@ -0,0 +1,147 @@
+import hashlib
+import io
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from PIL import Image, ImageTk
+
+from api.http_client import get_session
+from utils.storage import data_dir
+
+THUMBNAIL_SIZE = (60, 90)
+MEMORY_CACHE_SIZE = 200
+DOWNLOAD_WORKERS = 6
+POLL_INTERVAL_MS = 40
+
+
+class CoverImageService:
+    """
+    Servicio de portadas de libros para la interfaz Tk.
+
+    Las portadas se descargan en paralelo y se decodifican y reducen con Pillow
+    fuera del hilo de Tk. Las miniaturas se guardan como JPEG en disco y las
+    imágenes listas para Tk se conservan en una caché LRU en memoria, de modo
+    que volver a mostrar un libro no requiere red ni decodificación.
+    """
+
+    def __init__(self, widget, size: Tuple[int, int] = THUMBNAIL_SIZE,
+                 memory_size: int = MEMORY_CACHE_SIZE, workers: int = DOWNLOAD_WORKERS):
+        """
+        Inicializa el servicio.
+
+        Args:
+            widget: Widget de Tk usado para programar callbacks en el hilo principal
+            size: Tamaño máximo (ancho, alto) de las miniaturas
+            memory_size: Número de imágenes que se mantienen en memoria
+            workers: Descargas simultáneas
+        """
+        self.widget = widget
+        self.size = size
+        self.memory_size = memory_size
+        self.session = get_session()
+        self.cache_dir = data_dir() / "covers"
+        self.cache_dir.mkdir(exist_ok=True)
+
+        self._photos: "OrderedDict[str, ImageTk.PhotoImage]" = OrderedDict()
+        self._pending: Dict[str, List[Callable]] = {}
+        self._results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="covers")
+        self._polling = False
+
+    def load(self, url: str, callback: Callable[[ImageTk.PhotoImage], None]):
+        """
+        Solicita una portada. Debe llamarse desde el hilo de Tk.
+
+        Args:
+            url: URL de la portada
+            callback: Función que recibe la imagen lista para Tk. Se llama en el
+                      hilo de Tk, de inmediato si la imagen ya está en memoria.
+        """
+        photo = self._photos.get(url)
+        if photo is not None:
+            self._photos.move_to_end(url)
+            callback(photo)
+            return
+
+        if url in self._pending:
+            self._pending[url].append(callback)
+            return
+
+        self._pending[url] = [callback]
+        self._executor.submit(self._prepare, url)
+        self._start_polling()
+
+    def _disk_path(self, url: str):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}_{self.size[0]}x{self.size[1]}.jpg"
+
+    def _prepare(self, url: str):
+        """Obtiene la miniatura desde disco o la descarga y la reduce (hilo secundario)."""
+        try:
+            path = self._disk_path(url)
+            if path.exists():
+                image = Image.open(path)
+                image.load()
+            else:
+                response = self.session.get(url)
+                response.raise_for_status()
+                image = Image.open(io.BytesIO(response.content))
+                image.draft("RGB", self.size)  # Decodificación JPEG reducida cuando es posible
+                image = image.convert("RGB")
+                image.thumbnail(self.size, Image.LANCZOS)
+                tmp_path = path.with_suffix(".tmp")
+                image.save(tmp_path, "JPEG", quality=85, optimize=True)
+                tmp_path.replace(path)
+            self._results.put((url, image))
+        except Exception as e:
+            print(f"Error al cargar la portada: {str(e)}")
+            self._results.put((url, None))
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.widget.after(POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        """Convierte en el hilo de Tk las imágenes ya preparadas y avisa a los interesados."""
+        try:
+            while True:
+                url, image = self._results.get_nowait()
+                callbacks = self._pending.pop(url, [])
+                if image is None:
+                    continue
+
+                photo = ImageTk.PhotoImage(image)
+                self._photos[url] = photo
+                if len(self._photos) > self.memory_size:
+                    self._photos.popitem(last=False)
+
+                for callback in callbacks:
+                    try:
+                        callback(photo)
+                    except Exception:
+                        # El widget de destino pudo destruirse mientras se descargaba
+                        pass
+        except queue.Empty:
+            pass
+
+        if self._pending:
+            self.widget.after(POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_cover_service(widget) -> CoverImageService:
+    """Devuelve el servicio de portadas compartido de la aplicación."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = CoverImageService(widget.nametowidget("."))
+        return _service
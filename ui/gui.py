@@ -10,8 +10,13 @@ from models.estudio import Estudio
 from models.meta import Meta, PeriodoMeta
 from database import get_subjects, add_subject, delete_subject
 from bson.objectid import ObjectId
-from utils.chart import ProgressChart
-from api.quotes_api import QuotesAPI  # Import movido al inicio
+from utils.chart import ProgressChart, TimelineChart
+from api.quote_provider import get_quote_provider
+from ui.background import BackgroundExecutor, LoadingIndicator
+from ui.virtual_table import VirtualTable
+from ui.refresh_scheduler import RefreshScheduler
+from ui.keyed_panel import KeyedPanel
+from utils.pomodoro import WORK, format_time, get_pomodoro_timer
 
 # Solo importar winsound en Windows
 if os.name == 'nt':
@@ -36,10 +41,19 @@ class MainDashboardFrame(tk.Frame):
         self.controller = controller
         self.db_client = controller.db_client
         self.current_user_id = None
-        self.pomodoro_running = False
-        self.pomodoro_phase = "work"  # 'work' o 'break'
-        self.pomodoro_time_left = 25 * 60  # 25 minutos en segundos
-        self.break_time = 5 * 60  # Valor por defecto
+        # El estado del temporizador vive fuera de los widgets y sobrevive a reinicios
+        self.pomodoro = get_pomodoro_timer()
+        self._pomodoro_job = None
+        # Consultas a la base de datos y a las APIs fuera del hilo de Tk
+        self.tasks = BackgroundExecutor(self)
+
+        # Cada cambio de datos refresca solo los paneles que dependen de él
+        self.refresher = RefreshScheduler(self)
+        self.refresher.register("recent_sessions", self.load_recent_sessions, depends_on=("session",))
+        self.refresher.register("goals_summary", self.load_goals_summary, depends_on=("session", "goal"))
+        self.refresher.register("subjects", self.load_subjects_into_combobox, depends_on=("subject",))
+        # Los colores de la gráfica salen de las materias
+        self.refresher.register("chart", self.update_chart, depends_on=("session", "subject"))
 
     def show_alert(self, title, message):
         """Muestra una alerta emergente con sonido."""
@@ -65,6 +79,10 @@ class MainDashboardFrame(tk.Frame):
         self.current_user_id = user_data["username"]
         self.controller.title(f"EduTracker - Usuario: {self.current_user_id}")
         
+        # Los resultados pendientes del usuario anterior ya no deben pintarse
+        self.tasks.cancel_all()
+        self.refresher.cancel()
+        self._cancel_pomodoro_job()
         for widget in self.winfo_children():
             widget.destroy()
 
@@ -75,11 +93,73 @@ class MainDashboardFrame(tk.Frame):
         self.create_dashboard_layout()
         self.refresh_data()
 
+        # Índice para filtrar y ordenar el historial en el servidor
+        self.run_in_background("session_index", self.estudio_repo.ensure_index,
+                               [("usuario_id", 1), ("fecha_hora", -1)])
+
+    def logout(self):
+        """Cierra la sesión del usuario actual y vuelve al login."""
+        self.tasks.cancel_all()
+        self.refresher.cancel()
+        self._cancel_pomodoro_job()
+        self.controller.logout()
+
     def refresh_data(self):
         """Recarga todos los datos del dashboard."""
-        self.load_recent_sessions()
-        self.load_goals_summary()
-        self.progress_chart.create_chart(self.estudio_repo)  # Actualizar gráfica
+        self.refresher.invalidate_all()
+
+    def data_changed(self, *changes):
+        """
+        Avisa de un cambio de datos ("session", "goal" o "subject").
+
+        Los paneles afectados se recargan una sola vez aunque se avise varias
+        veces en la misma vuelta del bucle de eventos.
+        """
+        self.refresher.notify(*changes)
+
+    def run_in_background(self, key, fn, *args, on_success=None, on_done=None, indicator=None,
+                          error_title=None, parent=None):
+        """
+        Ejecuta `fn` fuera del hilo de Tk mostrando un indicador de carga.
+
+        Args:
+            key: Clave de la tarea; una nueva tarea con la misma clave descarta
+                 el resultado de la anterior. None para tareas que no se reemplazan.
+            fn: Función bloqueante (consulta a la base de datos o a una API)
+            on_success: Recibe el resultado en el hilo de Tk
+            on_done: Se llama al terminar, con éxito o con error
+            indicator: LoadingIndicator del panel afectado
+            error_title: Si se indica, los errores se muestran en un cuadro de diálogo
+            parent: Ventana sobre la que se muestra el error
+        """
+        indicator_key = key if key is not None else object()
+        if indicator is not None:
+            indicator.show(indicator_key)
+
+        def on_error(e):
+            print(f"Error en segundo plano: {e}")
+            if error_title:
+                messagebox.showerror("Error", f"{error_title}: {e}", parent=parent or self)
+
+        def finished():
+            if indicator is not None:
+                indicator.hide(indicator_key)
+            if on_done is not None:
+                on_done()
+
+        self.tasks.submit(key, fn, *args, on_success=on_success, on_error=on_error, on_done=finished)
+
+    def loading_indicator(self, parent, bg=COLOR_PALETTE["widget_bg"]):
+        """Crea el indicador de carga de un panel."""
+        return LoadingIndicator(parent, bg=bg, fg=COLOR_PALETTE["text"])
+
+    def cancel_on_close(self, window, *keys):
+        """Descarta las tareas de una ventana secundaria cuando se cierra."""
+        def on_destroy(event):
+            if event.widget is window:
+                for key in keys:
+                    self.tasks.cancel(key)
+        window.bind("<Destroy>", on_destroy, add="+")
 
     def create_dashboard_layout(self):
         # --- Header ---
@@ -90,7 +170,7 @@ class MainDashboardFrame(tk.Frame):
                 bg=COLOR_PALETTE["bg"], fg="black").pack(side="left", padx=10)
         
         logout_btn = tk.Button(header_frame, text="Cerrar Sesión", bg=COLOR_PALETTE["accent"], 
-                              fg="black", relief="flat", command=lambda: self.controller.show_frame("LoginFrame"))
+                              fg="black", relief="flat", command=self.logout)
         logout_btn.pack(side="right", padx=5)
         
         goals_btn = tk.Button(header_frame, text="Gestionar Metas", bg=COLOR_PALETTE["primary"], 
@@ -101,6 +181,10 @@ class MainDashboardFrame(tk.Frame):
                                 fg="black", relief="flat", command=self.open_subject_manager)
         subjects_btn.pack(side="right", padx=5)
 
+        resources_btn = tk.Button(header_frame, text="Buscar Recursos", bg=COLOR_PALETTE["primary"], 
+                                 fg="black", relief="flat", command=self.open_resources_window)
+        resources_btn.pack(side="right", padx=5)
+
         # --- Contenedor Principal ---
         main_container = tk.Frame(self, bg=COLOR_PALETTE["bg"])
         main_container.pack(fill="both", expand=True, padx=20, pady=10)
@@ -127,11 +211,18 @@ class MainDashboardFrame(tk.Frame):
         self.goals_frame = tk.LabelFrame(right_panel, text="Resumen de Metas", 
                                         padx=10, pady=10, bg=COLOR_PALETTE["widget_bg"])
         self.goals_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+        self.goals_loading = self.loading_indicator(self.goals_frame)
+        # Una fila por meta que se actualiza en su sitio en cada recarga
+        self.goals_panel = KeyedPanel(self.goals_frame, self._create_goal_row, self._update_goal_row,
+                                      key=lambda item: item[0], empty_text="No tienes metas activas.",
+                                      bg=COLOR_PALETTE["widget_bg"])
+        self.goals_panel.pack(fill="x")
 
         # Historial de Sesiones
         sessions_frame = tk.LabelFrame(right_panel, text="Historial de Sesiones Recientes", 
                                      padx=10, pady=10, bg=COLOR_PALETTE["widget_bg"])
         sessions_frame.grid(row=1, column=0, sticky="nsew")
+        self.sessions_loading = self.loading_indicator(sessions_frame)
         
         self.sessions_tree = ttk.Treeview(sessions_frame, columns=("materia", "duracion", "fecha"), show="headings")
         self.sessions_tree.heading("materia", text="Materia")
@@ -142,23 +233,61 @@ class MainDashboardFrame(tk.Frame):
         self.sessions_tree.column("fecha", width=150)
         self.sessions_tree.pack(fill="both", expand=True)
 
+        history_btn = tk.Button(sessions_frame, text="Ver historial completo", bg=COLOR_PALETTE["primary"],
+                                fg="black", relief="flat", command=self.open_session_history)
+        history_btn.pack(anchor="e", pady=(5, 0))
+
         # --- Panel Inferior (Gráfica) ---
         bottom_panel = tk.Frame(self, bg=COLOR_PALETTE["bg"])
         bottom_panel.pack(fill="x", padx=20, pady=10)
     
+        # Selector del tipo de gráfica
+        self.chart_mode = "semanal"
+        self.chart_mode_btn = tk.Button(bottom_panel, text="Ver línea de tiempo", bg=COLOR_PALETTE["primary"],
+                                        fg="black", relief="flat", command=self.toggle_chart_mode)
+        self.chart_mode_btn.pack(anchor="e", pady=(0, 5))
+
         # Gráfica de progreso
         self.chart_frame = tk.Frame(bottom_panel, bg=COLOR_PALETTE["widget_bg"], height=300)
         self.chart_frame.pack(fill="both", expand=True, pady=(0, 10))
-        self.progress_chart = ProgressChart(self.chart_frame, self.current_user_id)
-        
-        # Cargar datos iniciales
-        self.refresh_data()
+        self.chart_loading = self.loading_indicator(self.chart_frame)
+        self.weekly_chart_frame = tk.Frame(self.chart_frame, bg=COLOR_PALETTE["widget_bg"])
+        self.weekly_chart_frame.pack(fill="both", expand=True)
+        self.progress_chart = ProgressChart(self.weekly_chart_frame, self.current_user_id)
+
+        # La línea de tiempo se crea la primera vez que se muestra
+        self.timeline_chart_frame = tk.Frame(self.chart_frame, bg=COLOR_PALETTE["widget_bg"])
+        self.timeline_chart = None
+
+    def update_chart(self):
+        """Actualiza la gráfica que está visible según el modo seleccionado."""
+        chart = self.timeline_chart if self.chart_mode == "timeline" else self.progress_chart
+        # Las consultas se hacen en segundo plano; solo el dibujo ocurre en el hilo de Tk
+        self.run_in_background("chart", chart.load_data, self.estudio_repo,
+                               on_success=chart.render, indicator=self.chart_loading)
+
+    def toggle_chart_mode(self):
+        """Alterna entre la gráfica semanal y la línea de tiempo."""
+        if self.chart_mode == "semanal":
+            self.chart_mode = "timeline"
+            self.weekly_chart_frame.pack_forget()
+            self.timeline_chart_frame.pack(fill="both", expand=True)
+            if self.timeline_chart is None:
+                self.timeline_chart = TimelineChart(self.timeline_chart_frame, self.current_user_id)
+            self.chart_mode_btn.config(text="Ver progreso semanal")
+        else:
+            self.chart_mode = "semanal"
+            self.timeline_chart_frame.pack_forget()
+            self.weekly_chart_frame.pack(fill="both", expand=True)
+            self.chart_mode_btn.config(text="Ver línea de tiempo")
+        self.refresher.invalidate("chart")
 
     def create_study_session_widget(self, parent):
         """Crea el widget para registrar una nueva sesión de estudio."""
         widget_frame = tk.LabelFrame(parent, text="Nueva Sesión de Estudio", 
                                    padx=10, pady=10, bg=COLOR_PALETTE["widget_bg"])
         widget_frame.pack(fill="x")
+        self.session_loading = self.loading_indicator(widget_frame)
 
         ttk.Label(widget_frame, text="Materia:", background=COLOR_PALETTE["widget_bg"]).grid(row=0, column=0, sticky="w", pady=2)
         self.materia_combobox = ttk.Combobox(widget_frame, state="readonly")
@@ -172,10 +301,8 @@ class MainDashboardFrame(tk.Frame):
         self.notas_entry = tk.Text(widget_frame, height=4, width=30)
         self.notas_entry.grid(row=2, column=1, sticky="ew", pady=2, padx=5)
 
-        save_btn = ttk.Button(widget_frame, text="Guardar Sesión", command=self.registrar_sesion_estudio)
-        save_btn.grid(row=3, column=1, sticky="e", pady=10)
-        
-        self.load_subjects_into_combobox()
+        self.save_session_btn = ttk.Button(widget_frame, text="Guardar Sesión", command=self.registrar_sesion_estudio)
+        self.save_session_btn.grid(row=3, column=1, sticky="e", pady=10)
 
     def create_pomodoro_widget(self, parent):
         """Crea un temporizador Pomodoro funcional."""
@@ -185,7 +312,7 @@ class MainDashboardFrame(tk.Frame):
         
         self.pomodoro_label = tk.Label(
             pomodoro_frame, 
-            text=self.format_time(self.pomodoro_time_left), 
+            text="", 
             font=("Helvetica", 24, "bold"),
             bg=COLOR_PALETTE["widget_bg"],
             fg=COLOR_PALETTE["work"]
@@ -194,7 +321,7 @@ class MainDashboardFrame(tk.Frame):
         
         self.phase_label = tk.Label(
             pomodoro_frame, 
-            text="Trabajo", 
+            text="", 
             font=("Helvetica", 12),
             bg=COLOR_PALETTE["widget_bg"],
             fg=COLOR_PALETTE["work"]
@@ -296,11 +423,14 @@ class MainDashboardFrame(tk.Frame):
             width=14
         ).grid(row=0, column=4, padx=2)
 
+        # Mostrar el estado guardado y reanudar si el temporizador estaba en marcha
+        self.update_pomodoro()
+
     def update_quote(self):
         """Actualiza la frase motivadora periódicamente."""
         try:
-            quotes_api = QuotesAPI()
-            quote = quotes_api.get_random_quote()
+            # Lectura en memoria: las frases se descargan en segundo plano
+            quote = get_quote_provider().get_quote()
             if quote:
                 self.quote_label.config(text=f'"{quote["quote"]}"\n- {quote["author"]}')
         except Exception as e:
@@ -312,79 +442,70 @@ class MainDashboardFrame(tk.Frame):
 
     def format_time(self, seconds):
         """Formatea segundos a MM:SS."""
-        mins, secs = divmod(seconds, 60)
-        return f"{mins:02d}:{secs:02d}"
+        return format_time(seconds)
 
     def set_pomodoro_time(self, minutes):
-        """Establece el tiempo de trabajo."""
-        if not self.pomodoro_running:
-            self.pomodoro_time_left = minutes * 60
-            self.pomodoro_label.config(text=self.format_time(self.pomodoro_time_left))
+        """Establece el tiempo de la fase actual."""
+        if self.pomodoro.set_duration(minutes * 60):
+            self.update_pomodoro()
 
     def start_pomodoro(self):
         """Inicia el temporizador Pomodoro."""
-        if not self.pomodoro_running:
-            self.pomodoro_running = True
-            self.start_button.config(state=tk.DISABLED)
-            self.pause_button.config(state=tk.NORMAL)
-            self.update_pomodoro()
+        self.pomodoro.start()
+        self.update_pomodoro()
 
     def pause_pomodoro(self):
         """Pausa el temporizador Pomodoro."""
-        if self.pomodoro_running:
-            self.pomodoro_running = False
-            self.start_button.config(state=tk.NORMAL)
-            self.pause_button.config(state=tk.DISABLED)
+        self.pomodoro.pause()
+        self.update_pomodoro()
 
     def reset_pomodoro(self):
         """Reinicia el temporizador Pomodoro."""
-        self.pomodoro_running = False
-        self.start_button.config(state=tk.NORMAL)
-        self.pause_button.config(state=tk.DISABLED)
-        
-        if self.pomodoro_phase == "work":
-            self.pomodoro_time_left = 25 * 60
-            self.phase_label.config(text="Trabajo", fg=COLOR_PALETTE["work"])
-            self.pomodoro_label.config(fg=COLOR_PALETTE["work"])
-        else:
-            self.pomodoro_phase = "work"
-            self.pomodoro_time_left = 25 * 60
-            self.phase_label.config(text="Trabajo", fg=COLOR_PALETTE["work"])
-            self.pomodoro_label.config(fg=COLOR_PALETTE["work"])
-        
-        self.pomodoro_label.config(text=self.format_time(self.pomodoro_time_left))
+        self.pomodoro.reset()
+        self.update_pomodoro()
+
+    def _cancel_pomodoro_job(self):
+        if self._pomodoro_job is not None:
+            self.after_cancel(self._pomodoro_job)
+            self._pomodoro_job = None
 
     def update_pomodoro(self):
-        """Actualiza el temporizador Pomodoro."""
-        if self.pomodoro_running:
-            if self.pomodoro_time_left > 0:
-                self.pomodoro_time_left -= 1
-                self.pomodoro_label.config(text=self.format_time(self.pomodoro_time_left))
-                self.after(1000, self.update_pomodoro)
+        """
+        Muestra el estado del temporizador y programa el siguiente repintado.
+
+        El tiempo restante se calcula a partir del instante de fin de la fase,
+        así que un repintado tardío no desplaza el temporizador. Solo se programa
+        un callback para el momento del siguiente cambio visible.
+        """
+        self._cancel_pomodoro_job()
+
+        transitions = self.pomodoro.tick()
+        if transitions:
+            # Si terminaron varias fases (p. ej., con la aplicación cerrada) se avisa solo de la última
+            if transitions[-1][1] == WORK:
+                self.show_alert("¡Descanso terminado!", "Es hora de volver al trabajo")
             else:
-                # Cambiar de fase
-                if self.pomodoro_phase == "work":
-                    # Mostrar alerta de fin de trabajo
-                    self.show_alert("¡Tiempo de trabajo completado!", "Es hora de un descanso")
-                    self.pomodoro_phase = "break"
-                    self.pomodoro_time_left = self.break_time  # Usar break_time
-                    self.phase_label.config(text="Descanso", fg=COLOR_PALETTE["break"])
-                    self.pomodoro_label.config(fg=COLOR_PALETTE["break"])
-                else:
-                    # Mostrar alerta de fin de descanso
-                    self.show_alert("¡Descanso terminado!", "Es hora de volver al trabajo")
-                    self.pomodoro_phase = "work"
-                    self.pomodoro_time_left = 25 * 60  # 25 minutos de trabajo
-                    self.phase_label.config(text="Trabajo", fg=COLOR_PALETTE["work"])
-                    self.pomodoro_label.config(fg=COLOR_PALETTE["work"])
-                
-                self.update_pomodoro()
+                self.show_alert("¡Tiempo de trabajo completado!", "Es hora de un descanso")
+
+        color = COLOR_PALETTE["work"] if self.pomodoro.phase == WORK else COLOR_PALETTE["break"]
+        self.phase_label.config(text="Trabajo" if self.pomodoro.phase == WORK else "Descanso", fg=color)
+        self.pomodoro_label.config(text=self.format_time(self.pomodoro.display_seconds()), fg=color)
+        self.start_button.config(state=tk.DISABLED if self.pomodoro.running else tk.NORMAL)
+        self.pause_button.config(state=tk.NORMAL if self.pomodoro.running else tk.DISABLED)
+
+        delay = self.pomodoro.seconds_until_change()
+        if delay is not None:
+            # Un milisegundo de margen para caer ya dentro del siguiente segundo
+            self._pomodoro_job = self.after(int(delay * 1000) + 1, self.update_pomodoro)
 
     def load_subjects_into_combobox(self):
         """Carga las materias del usuario en el combobox."""
-        subjects = get_subjects(self.current_user_id)
-        self.subject_map = {s['name']: s for s in subjects}
-        self.materia_combobox['values'] = list(self.subject_map.keys())
+        def show_subjects(subjects):
+            self.subject_map = {s['name']: s for s in subjects}
+            self.materia_combobox['values'] = list(self.subject_map.keys())
+
+        self.run_in_background("subjects", get_subjects, self.current_user_id,
+                               on_success=show_subjects, indicator=self.session_loading)
 
     def registrar_sesion_estudio(self):
         materia = self.materia_combobox.get()
@@ -397,43 +518,55 @@ class MainDashboardFrame(tk.Frame):
         
         try:
             duracion = int(duracion_str)
-            nueva_sesion = Estudio(self.current_user_id, materia, duracion, notas)
-            self.estudio_repo.save(nueva_sesion)
+        except ValueError:
+            messagebox.showerror("Error", "La duración debe ser un número entero.")
+            return
+
+        nueva_sesion = Estudio(self.current_user_id, materia, duracion, notas)
+
+        def on_saved(_):
             messagebox.showinfo("Éxito", "Sesión de estudio registrada.")
-            self.refresh_data()
+            self.data_changed("session")
             # Limpiar campos
             self.duracion_entry.delete(0, tk.END)
             self.notas_entry.delete("1.0", tk.END)
-        except ValueError:
-            messagebox.showerror("Error", "La duración debe ser un número entero.")
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo registrar la sesión: {e}")
+
+        # Evitar guardados duplicados mientras el anterior está en curso
+        self.save_session_btn.config(state=tk.DISABLED)
+        self.run_in_background(None, self.estudio_repo.save, nueva_sesion,
+                               on_success=on_saved, indicator=self.session_loading,
+                               error_title="No se pudo registrar la sesión",
+                               on_done=lambda: self.save_session_btn.config(state=tk.NORMAL))
 
     def load_recent_sessions(self):
         """Carga las 5 sesiones de estudio más recientes."""
-        for i in self.sessions_tree.get_children():
-            self.sessions_tree.delete(i)
-        
-        sesiones = self.estudio_repo.find({"usuario_id": self.current_user_id})
-        # Ordenar y limitar a 5
-        for sesion in sorted(sesiones, key=lambda s: s.fecha_hora, reverse=True)[:5]:
-            self.sessions_tree.insert("", "end", values=(
-                sesion.materia,
-                sesion.duracion_minutos,
-                sesion.fecha_hora.strftime("%Y-%m-%d %H:%M")
-            ))
+        def fetch():
+            # Ordenadas y limitadas en el servidor (usa el índice usuario_id + fecha_hora)
+            return self.estudio_repo.find_page({"usuario_id": self.current_user_id}, skip=0, limit=5,
+                                               sort=[("fecha_hora", -1)],
+                                               projection={"materia": 1, "duracion_minutos": 1, "fecha_hora": 1})
+
+        def show(sesiones):
+            for i in self.sessions_tree.get_children():
+                self.sessions_tree.delete(i)
+            for sesion in sesiones:
+                self.sessions_tree.insert("", "end", values=(
+                    sesion.materia,
+                    sesion.duracion_minutos,
+                    sesion.fecha_hora.strftime("%Y-%m-%d %H:%M")
+                ))
+
+        self.run_in_background("recent_sessions", fetch, on_success=show, indicator=self.sessions_loading)
 
     def load_goals_summary(self):
         """Muestra el progreso de las metas activas."""
-        for widget in self.goals_frame.winfo_children():
-            widget.destroy()
+        self.run_in_background("goals_summary", self._fetch_goals_progress,
+                               on_success=self._show_goals_summary, indicator=self.goals_loading)
 
+    def _fetch_goals_progress(self):
+        """Calcula el progreso de cada meta activa (hilo secundario)."""
         metas = self.meta_repo.find({"usuario_id": self.current_user_id, "completada": False})
-        if not metas:
-            tk.Label(self.goals_frame, text="No tienes metas activas.", 
-                    bg=COLOR_PALETTE["widget_bg"]).pack()
-            return
-
+        progreso_metas = []
         for meta in metas:
             if hasattr(meta, 'fecha_fin') and meta.fecha_fin and datetime.now() > meta.fecha_fin: 
                 continue  # Omitir metas vencidas
@@ -444,18 +577,39 @@ class MainDashboardFrame(tk.Frame):
                 "fecha_hora": {"$gte": meta.fecha_inicio, "$lt": meta.fecha_fin}
             })
             minutos_logrados = sum(s.duracion_minutos for s in sesiones)
+            progreso_metas.append((meta, minutos_logrados))
+        return metas, progreso_metas
+
+    def _show_goals_summary(self, result):
+        """Dibuja el resumen de metas con los datos ya calculados."""
+        _, progreso_metas = result
+        items = []
+        for meta, minutos_logrados in progreso_metas:
             progreso = (minutos_logrados / meta.minutos_objetivo) * 100 if meta.minutos_objetivo > 0 else 0
             
             # Manejar enum/string para el periodo
             periodo_str = meta.periodo.value if hasattr(meta.periodo, 'value') else meta.periodo
             
-            tk.Label(self.goals_frame, text=f"{meta.materia} ({periodo_str})", 
-                    bg=COLOR_PALETTE["widget_bg"]).pack(anchor="w")
-            progress_bar = ttk.Progressbar(self.goals_frame, orient="horizontal", 
-                                          length=200, mode="determinate", value=progreso)
-            progress_bar.pack(fill="x", pady=2)
-            tk.Label(self.goals_frame, text=f"{minutos_logrados} / {meta.minutos_objetivo} min", 
-                    font=("Helvetica", 8), bg=COLOR_PALETTE["widget_bg"]).pack(anchor="w", pady=(0, 5))
+            items.append((str(meta._id), f"{meta.materia} ({periodo_str})", progreso,
+                          f"{minutos_logrados} / {meta.minutos_objetivo} min"))
+        self.goals_panel.set_items(items)
+
+    def _create_goal_row(self, parent):
+        """Crea los widgets de una meta en el resumen."""
+        row = tk.Frame(parent, bg=COLOR_PALETTE["widget_bg"])
+        row.title_label = tk.Label(row, bg=COLOR_PALETTE["widget_bg"])
+        row.title_label.pack(anchor="w")
+        row.progress_bar = ttk.Progressbar(row, orient="horizontal", length=200, mode="determinate")
+        row.progress_bar.pack(fill="x", pady=2)
+        row.detail_label = tk.Label(row, font=("Helvetica", 8), bg=COLOR_PALETTE["widget_bg"])
+        row.detail_label.pack(anchor="w", pady=(0, 5))
+        return row
+
+    def _update_goal_row(self, row, item):
+        _, title, progreso, detail = item
+        row.title_label.config(text=title)
+        row.progress_bar.config(value=progreso)
+        row.detail_label.config(text=detail)
 
     def open_goal_manager(self):
         """Abre una ventana para gestionar las metas."""
@@ -474,8 +628,6 @@ class MainDashboardFrame(tk.Frame):
         tk.Label(add_frame, text="Materia:", bg=COLOR_PALETTE["bg"], fg="white").grid(row=0, column=0, sticky="w", pady=2, padx=5)
         materia_combobox = ttk.Combobox(add_frame, state="readonly")
         materia_combobox.grid(row=0, column=1, sticky="ew", pady=2, padx=5)
-        subjects = get_subjects(self.current_user_id)
-        materia_combobox['values'] = [s['name'] for s in subjects]
 
         tk.Label(add_frame, text="Minutos Objetivo:", bg=COLOR_PALETTE["bg"], fg="white").grid(row=1, column=0, sticky="w", pady=2, padx=5)
         minutos_entry = tk.Entry(add_frame)
@@ -490,6 +642,16 @@ class MainDashboardFrame(tk.Frame):
         # --- Lista de metas existentes ---
         list_frame = tk.LabelFrame(manager_win, text="Mis Metas", bg=COLOR_PALETTE["bg"], padx=10, pady=10)
         list_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        loading = self.loading_indicator(list_frame, bg=COLOR_PALETTE["bg"])
+
+        # Claves propias de esta ventana; al cerrarla se descartan sus tareas
+        subjects_key = ("goal_manager", "subjects")
+        list_key = ("goal_manager", "list")
+        self.cancel_on_close(manager_win, subjects_key, list_key)
+
+        self.run_in_background(subjects_key, get_subjects, self.current_user_id, indicator=loading,
+                               on_success=lambda subjects: materia_combobox.config(
+                                   values=[s['name'] for s in subjects]))
 
         metas_tree = ttk.Treeview(list_frame, columns=("materia", "objetivo", "periodo", "estado"), show="headings")
         metas_tree.heading("materia", text="Materia")
@@ -502,11 +664,10 @@ class MainDashboardFrame(tk.Frame):
         metas_tree.column("estado", width=100)
         metas_tree.pack(fill="both", expand=True)
 
-        def populate_goals_list():
+        def show_goals(all_metas):
             for i in metas_tree.get_children():
                 metas_tree.delete(i)
             
-            all_metas = self.meta_repo.find({"usuario_id": self.current_user_id})
             for meta in sorted(all_metas, key=lambda m: m.fecha_inicio, reverse=True):
                 estado = "Completada" if meta.completada else "Activa"
                 if not meta.completada and datetime.now() > meta.fecha_fin:
@@ -521,8 +682,14 @@ class MainDashboardFrame(tk.Frame):
                     periodo_str,
                     estado
                 ), iid=str(meta._id))
-            
-            self.refresh_data()
+
+        def populate_goals_list():
+            self.run_in_background(list_key, self.meta_repo.find, {"usuario_id": self.current_user_id},
+                                   on_success=show_goals, indicator=loading)
+
+        def goals_changed(_):
+            populate_goals_list()
+            self.data_changed("goal")
 
         def add_new_goal_action():
             materia = materia_combobox.get()
@@ -536,16 +703,16 @@ class MainDashboardFrame(tk.Frame):
             try:
                 minutos = int(minutos_str)
                 periodo = PeriodoMeta(periodo_str)
-                nueva_meta = Meta(self.current_user_id, materia, minutos, periodo)
-                self.meta_repo.save(nueva_meta)
-                
-                materia_combobox.set('')
-                minutos_entry.delete(0, tk.END)
-                populate_goals_list()
             except ValueError:
                 messagebox.showerror("Error", "Los minutos deben ser un número entero.", parent=manager_win)
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo registrar la meta: {e}", parent=manager_win)
+                return
+
+            nueva_meta = Meta(self.current_user_id, materia, minutos, periodo)
+            materia_combobox.set('')
+            minutos_entry.delete(0, tk.END)
+            self.run_in_background(None, self.meta_repo.save, nueva_meta, on_success=goals_changed,
+                                   indicator=loading, error_title="No se pudo registrar la meta",
+                                   parent=manager_win)
 
         def delete_selected_goal():
             selected_item_id = metas_tree.focus()
@@ -554,8 +721,9 @@ class MainDashboardFrame(tk.Frame):
                 return
             
             if messagebox.askyesno("Confirmar", "¿Seguro que quieres eliminar esta meta?", parent=manager_win):
-                self.meta_repo.delete_by_id(ObjectId(selected_item_id))
-                populate_goals_list()
+                self.run_in_background(None, self.meta_repo.delete_by_id, ObjectId(selected_item_id),
+                                       on_success=goals_changed, indicator=loading,
+                                       error_title="No se pudo eliminar la meta", parent=manager_win)
 
         add_btn = tk.Button(add_frame, text="Añadir Meta", command=add_new_goal_action, 
                            bg=COLOR_PALETTE["accent"], fg="white", relief="flat")
@@ -595,14 +763,18 @@ class MainDashboardFrame(tk.Frame):
                              bg=color_val.get(), relief="flat", fg="white")
         color_btn.pack(side="left", padx=5)
 
+        def subjects_changed(_):
+            populate_list()
+            self.data_changed("subject")  # Actualizar combobox y gráfica en el dashboard
+
         def add_new_subject_action():
             name = name_entry.get()
             color = color_val.get()
             if name and color:
-                add_subject(self.current_user_id, name, color)
                 name_entry.delete(0, tk.END)
-                populate_list()
-                self.load_subjects_into_combobox() # Actualizar combobox en dashboard
+                self.run_in_background(None, add_subject, self.current_user_id, name, color,
+                                       on_success=subjects_changed, indicator=loading,
+                                       error_title="No se pudo añadir la materia", parent=manager_win)
             else:
                 messagebox.showwarning("Datos incompletos", "El nombre y el color son necesarios.")
 
@@ -613,32 +785,236 @@ class MainDashboardFrame(tk.Frame):
         # Lista de materias existentes
         list_frame = tk.Frame(manager_win, bg=COLOR_PALETTE["bg"])
         list_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        loading = self.loading_indicator(list_frame, bg=COLOR_PALETTE["bg"])
+
+        list_key = ("subject_manager", "list")
+        self.cancel_on_close(manager_win, list_key)
 
         def populate_list():
-            for widget in list_frame.winfo_children():
-                widget.destroy()
-            
-            subjects = get_subjects(self.current_user_id)
-            for subject in subjects:
-                item_frame = tk.Frame(list_frame, bg=COLOR_PALETTE["widget_bg"], pady=5)
-                item_frame.pack(fill="x", pady=2)
-                
-                color = subject.get('color', "#CCCCCC")  # Color por defecto
-                
-                color_label = tk.Label(item_frame, text="  ", bg=color, width=3)
-                color_label.pack(side="left", padx=10)
-                
-                tk.Label(item_frame, text=subject.get('name', 'Nombre no encontrado'), 
-                        bg=COLOR_PALETTE["widget_bg"]).pack(side="left", expand=True, fill="x", anchor="w")
-                
-                def delete_action(s_id=subject.get('_id')):
-                    if messagebox.askyesno("Confirmar", "¿Seguro que quieres eliminar esta materia?"):
-                        delete_subject(s_id)
-                        populate_list()
-                        self.load_subjects_into_combobox()
+            self.run_in_background(list_key, get_subjects, self.current_user_id,
+                                   on_success=show_subjects, indicator=loading)
+
+        def delete_action(s_id):
+            if messagebox.askyesno("Confirmar", "¿Seguro que quieres eliminar esta materia?"):
+                self.run_in_background(None, delete_subject, s_id,
+                                       on_success=subjects_changed, indicator=loading,
+                                       error_title="No se pudo eliminar la materia", parent=manager_win)
+
+        def create_subject_row(parent):
+            item_frame = tk.Frame(parent, bg=COLOR_PALETTE["widget_bg"], pady=5)
+            item_frame.color_label = tk.Label(item_frame, text="  ", width=3)
+            item_frame.color_label.pack(side="left", padx=10)
+            item_frame.name_label = tk.Label(item_frame, bg=COLOR_PALETTE["widget_bg"])
+            item_frame.name_label.pack(side="left", expand=True, fill="x", anchor="w")
+            item_frame.del_btn = tk.Button(item_frame, text="Eliminar", 
+                                           bg=COLOR_PALETTE["accent"], fg="white", relief="flat")
+            item_frame.del_btn.pack(side="right", padx=10)
+            return item_frame
+
+        def update_subject_row(item_frame, subject):
+            s_id, name, color = subject
+            item_frame.color_label.config(bg=color)
+            item_frame.name_label.config(text=name)
+            item_frame.del_btn.config(command=lambda: delete_action(s_id))
+
+        subjects_panel = KeyedPanel(list_frame, create_subject_row, update_subject_row,
+                                    key=lambda subject: subject[0], row_pack={"fill": "x", "pady": 2},
+                                    bg=COLOR_PALETTE["bg"])
+        subjects_panel.pack(fill="both", expand=True)
+
+        def show_subjects(subjects):
+            subjects_panel.set_items([
+                (str(subject.get('_id')),
+                 subject.get('name', 'Nombre no encontrado'),
+                 subject.get('color', "#CCCCCC"))  # Color por defecto
+                for subject in subjects
+            ])
+
+        populate_list()
+
+    # Campo de la base de datos por el que ordena cada columna del historial
+    HISTORY_SORT_FIELDS = {
+        "fecha": "fecha_hora",
+        "materia": "materia",
+        "duracion": "duracion_minutos",
+        "notas": "notas",
+    }
+
+    def open_session_history(self):
+        """Abre el historial completo de sesiones, con filtros y ordenación en el servidor."""
+        history_win = tk.Toplevel(self)
+        history_win.title("Historial de Sesiones")
+        history_win.geometry("700x550")
+        history_win.configure(bg=COLOR_PALETTE["bg"])
+        history_win.transient(self)
+
+        # --- Filtros ---
+        filters_frame = tk.Frame(history_win, bg=COLOR_PALETTE["bg"], pady=10)
+        filters_frame.pack(fill="x", padx=10)
+
+        tk.Label(filters_frame, text="Materia:", bg=COLOR_PALETTE["bg"], fg="white").pack(side="left")
+        materia_combobox = ttk.Combobox(filters_frame, state="readonly", width=18,
+                                        values=["Todas"] + list(self.subject_map.keys()))
+        materia_combobox.set("Todas")
+        materia_combobox.pack(side="left", padx=5)
+
+        tk.Label(filters_frame, text="Desde:", bg=COLOR_PALETTE["bg"], fg="white").pack(side="left")
+        desde_entry = tk.Entry(filters_frame, width=11)
+        desde_entry.pack(side="left", padx=5)
+        tk.Label(filters_frame, text="Hasta:", bg=COLOR_PALETTE["bg"], fg="white").pack(side="left")
+        hasta_entry = tk.Entry(filters_frame, width=11)
+        hasta_entry.pack(side="left", padx=5)
+
+        total_label = tk.Label(history_win, text="", bg=COLOR_PALETTE["bg"], fg="white")
+        total_label.pack(anchor="w", padx=10)
+
+        user_id = self.current_user_id
+
+        def load_page(query, skip, limit, sort):
+            column, ascending = sort
+            sesiones = self.estudio_repo.find_page(
+                query, skip=skip, limit=limit,
+                sort=[(self.HISTORY_SORT_FIELDS[column], 1 if ascending else -1)],
+                projection={"materia": 1, "duracion_minutos": 1, "fecha_hora": 1, "notas": 1})
+            return [(s.fecha_hora.strftime("%Y-%m-%d %H:%M"), s.materia, s.duracion_minutos,
+                     (s.notas or "").replace("\n", " ")) for s in sesiones]
+
+        table = VirtualTable(history_win, [("fecha", "Fecha", 130), ("materia", "Materia", 150),
+                                           ("duracion", "Duración (min)", 100), ("notas", "Notas", 250)],
+                             self.estudio_repo.count, load_page, self.tasks, sort=("fecha", False),
+                             on_count=lambda total: total_label.config(text=f"{total} sesiones"),
+                             bg=COLOR_PALETTE["widget_bg"])
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Las sesiones nuevas aparecen en el historial abierto
+        panel = f"session_history{history_win}"
+        self.refresher.register(panel, table.refresh, depends_on=("session",))
+
+        def on_destroy(event):
+            if event.widget is history_win:
+                self.refresher.unregister(panel)
+        history_win.bind("<Destroy>", on_destroy, add="+")
+
+        def apply_filters():
+            query = {"usuario_id": user_id}
+            materia = materia_combobox.get()
+            if materia and materia != "Todas":
+                query["materia"] = materia
+            try:
+                rango = {}
+                if desde_entry.get().strip():
+                    rango["$gte"] = datetime.strptime(desde_entry.get().strip(), "%Y-%m-%d")
+                if hasta_entry.get().strip():
+                    # La fecha final se incluye completa
+                    rango["$lt"] = datetime.strptime(hasta_entry.get().strip(), "%Y-%m-%d") + timedelta(days=1)
+            except ValueError:
+                messagebox.showerror("Error", "Las fechas deben tener el formato AAAA-MM-DD.", parent=history_win)
+                return
+            if rango:
+                query["fecha_hora"] = rango
+            total_label.config(text="Cargando...")
+            table.set_query(query)
+
+        tk.Button(filters_frame, text="Aplicar", bg=COLOR_PALETTE["accent"], fg="white", relief="flat",
+                  command=apply_filters).pack(side="left", padx=5)
+
+        apply_filters()
+
+    def open_resources_window(self):
+        """Abre una ventana para buscar libros relacionados con las materias."""
+        # Importaciones diferidas: solo se necesitan al abrir esta ventana
+        from api.books_api import BooksAPI
+        from ui.cover_images import get_cover_service, THUMBNAIL_SIZE
+
+        if not hasattr(self, "books_api"):
+            self.books_api = BooksAPI()
+        covers = get_cover_service(self)
+
+        resources_win = tk.Toplevel(self)
+        resources_win.title("Buscar Recursos")
+        resources_win.geometry("600x600")
+        resources_win.configure(bg=COLOR_PALETTE["bg"])
+        resources_win.transient(self)
+
+        # Selector de materia
+        search_frame = tk.Frame(resources_win, bg=COLOR_PALETTE["bg"], pady=10)
+        search_frame.pack(fill="x", padx=10)
+
+        materia_combobox = ttk.Combobox(search_frame, state="readonly", values=list(self.subject_map.keys()))
+        materia_combobox.pack(side="left", expand=True, fill="x")
+
+        status_label = tk.Label(resources_win, text="", bg=COLOR_PALETTE["bg"], fg="white")
+        status_label.pack(anchor="w", padx=10)
+
+        # Lista de resultados con desplazamiento
+        results_canvas = tk.Canvas(resources_win, bg=COLOR_PALETTE["widget_bg"], highlightthickness=0)
+        scrollbar = ttk.Scrollbar(resources_win, orient="vertical", command=results_canvas.yview)
+        results_canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        results_canvas.pack(fill="both", expand=True, padx=(10, 0), pady=10)
+
+        results_frame = tk.Frame(results_canvas, bg=COLOR_PALETTE["widget_bg"])
+        results_canvas.create_window((0, 0), window=results_frame, anchor="nw")
+        results_frame.bind("<Configure>", lambda e: results_canvas.configure(scrollregion=results_canvas.bbox("all")))
+
+        search_key = ("resources", str(resources_win))
+        self.cancel_on_close(resources_win, search_key)
+
+        placeholder = tk.PhotoImage(width=THUMBNAIL_SIZE[0], height=THUMBNAIL_SIZE[1])
+        resources_win.placeholder = placeholder  # Mantener la referencia para que Tk no la libere
+
+        def set_cover(label, photo):
+            if label.winfo_exists():
+                label.config(image=photo)
+                label.image = photo
+
+        def add_results(materia, libros):
+            tk.Label(results_frame, text=materia, font=("Helvetica", 12, "bold"),
+                    bg=COLOR_PALETTE["widget_bg"]).pack(anchor="w", pady=(10, 2), padx=5)
+            if not libros:
+                tk.Label(results_frame, text="No se encontraron libros relacionados.",
+                        bg=COLOR_PALETTE["widget_bg"]).pack(anchor="w", padx=5)
+                return
+
+            for libro in libros:
+                item_frame = tk.Frame(results_frame, bg=COLOR_PALETTE["widget_bg"], pady=3)
+                item_frame.pack(fill="x", padx=5)
+
+                # Marcador del tamaño de la miniatura mientras llega la portada
+                cover_label = tk.Label(item_frame, bg=COLOR_PALETTE["bg"], image=placeholder)
+                cover_label.pack(side="left", padx=(0, 10))
+                if libro.get("cover_url"):
+                    covers.load(libro["cover_url"], lambda photo, label=cover_label: set_cover(label, photo))
+
+                autores = ", ".join(libro["authors"])
+                tk.Label(item_frame, text=f"{libro['title']} ({libro['year']})\n{autores}",
+                        justify="left", wraplength=420, bg=COLOR_PALETTE["widget_bg"]).pack(side="left", anchor="w")
 
-                del_btn = tk.Button(item_frame, text="Eliminar", command=delete_action, 
-                                   bg=COLOR_PALETTE["accent"], fg="white", relief="flat")
-                del_btn.pack(side="right", padx=10)
+        def search_failed(error):
+            print(f"Error al buscar recursos: {error}")
+            status_label.config(text="No se pudo completar la búsqueda.")
 
-        populate_list()
\ No newline at end of file
+        def search_done():
+            if status_label.winfo_exists() and status_label.cget("text") == "Buscando...":
+                status_label.config(text="")
+
+        def start_search(materias):
+            if not materias:
+                messagebox.showwarning("Sin materias", "Selecciona una materia.", parent=resources_win)
+                return
+            for widget in results_frame.winfo_children():
+                widget.destroy()
+            status_label.config(text="Buscando...")
+
+            # Los resultados llegan a medida que termina cada materia; una nueva
+            # búsqueda descarta los que queden de la anterior
+            self.tasks.submit_iter(search_key, self.books_api.iter_books_by_subjects, materias,
+                                   on_item=lambda result: add_results(*result),
+                                   on_error=search_failed,
+                                   on_done=search_done)
+
+        tk.Button(search_frame, text="Buscar", bg=COLOR_PALETTE["accent"], fg="white", relief="flat",
+                  command=lambda: start_search([materia_combobox.get()] if materia_combobox.get() else [])
+                  ).pack(side="left", padx=5)
+        tk.Button(search_frame, text="Todas mis materias", bg=COLOR_PALETTE["accent"], fg="white", relief="flat",
+                  command=lambda: start_search(list(self.subject_map.keys()))).pack(side="left")
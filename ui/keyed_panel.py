@@ -0,0 +1,89 @@
+import tkinter as tk
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+
+class KeyedPanel(tk.Frame):
+    """
+    Lista de grupos de widgets identificados por clave (id de meta, de materia...).
+
+    En lugar de destruir y recrear todos los widgets en cada recarga, el panel
+    compara los nuevos elementos con los que ya muestra: crea los grupos de las
+    claves nuevas, destruye los de las claves que desaparecen y actualiza en
+    su sitio solo los que cambiaron. Así se evita crear objetos de Tk en cada
+    refresco y el parpadeo al redibujar.
+    """
+
+    def __init__(self, parent, create_row: Callable[[tk.Widget], tk.Widget],
+                 update_row: Callable[[tk.Widget, Any], None],
+                 key: Callable[[Any], Hashable],
+                 empty_text: Optional[str] = None,
+                 row_pack: Optional[Dict[str, Any]] = None, **frame_options):
+        """
+        Inicializa el panel.
+
+        Args:
+            parent: Widget padre
+            create_row: Recibe el panel y devuelve un widget (normalmente un
+                        Frame) para un elemento, sin colocarlo
+            update_row: Actualiza el widget de una fila con los datos de su elemento
+            key: Devuelve la clave única de un elemento
+            empty_text: Texto que se muestra cuando no hay elementos
+            row_pack: Opciones de pack para cada fila
+        """
+        super().__init__(parent, **frame_options)
+        self.create_row = create_row
+        self.update_row = update_row
+        self.key = key
+        self.row_pack = row_pack or {"fill": "x"}
+
+        self._rows: Dict[Hashable, tk.Widget] = {}
+        self._values: Dict[Hashable, Any] = {}
+        self._order: List[Hashable] = []
+        self._empty_label = None
+        if empty_text:
+            self._empty_label = tk.Label(self, text=empty_text, bg=frame_options.get("bg"))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def set_items(self, items: Iterable[Any]):
+        """
+        Muestra exactamente estos elementos, en este orden.
+
+        Solo se crean, destruyen o actualizan las filas que cambiaron.
+        """
+        items = list(items)
+        order = [self.key(item) for item in items]
+        new_keys = set(order)
+
+        for key in [k for k in self._rows if k not in new_keys]:
+            self._rows.pop(key).destroy()
+            self._values.pop(key, None)
+
+        for key, item in zip(order, items):
+            row = self._rows.get(key)
+            if row is None:
+                row = self.create_row(self)
+                self._rows[key] = row
+            elif self._values.get(key) == item:
+                continue  # Sin cambios: no se toca la fila
+            self.update_row(row, item)
+            self._values[key] = item
+
+        if order != self._order:
+            # Volver a colocar las filas solo si cambiaron las claves o su orden
+            for key in order:
+                self._rows[key].pack_forget()
+            for key in order:
+                self._rows[key].pack(**self.row_pack)
+            self._order = order
+
+        if self._empty_label is not None:
+            if items:
+                self._empty_label.pack_forget()
+            else:
+                self._empty_label.pack()
+
+    def row(self, key: Hashable) -> Optional[tk.Widget]:
+        """Devuelve el widget de la fila con esa clave, si existe."""
+        return self._rows.get(key)
@@ -0,0 +1,88 @@
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+
+class RefreshScheduler:
+    """
+    Planificador de refrescos de los paneles de una vista Tk.
+
+    Cada panel se registra con su función de recarga y con los tipos de cambio
+    de datos de los que depende (p. ej., "session" o "goal"). Notificar un
+    cambio solo marca como sucios los paneles afectados; todas las marcas
+    hechas en la misma vuelta del bucle de eventos se agrupan en un único
+    refresco programado con `after_idle`, que recarga cada panel sucio una vez.
+    """
+
+    def __init__(self, widget):
+        """
+        Inicializa el planificador.
+
+        Args:
+            widget: Widget de Tk usado para programar el refresco
+        """
+        self.widget = widget
+        self._panels: Dict[str, Tuple[Callable[[], None], Set[str]]] = {}
+        self._dirty: Set[str] = set()
+        self._job = None
+
+    def register(self, panel: str, refresh: Callable[[], None], depends_on: Iterable[str] = ()):
+        """
+        Registra un panel. Los paneles se refrescan en orden de registro.
+
+        Args:
+            panel: Nombre del panel
+            refresh: Función que vuelve a consultar y dibujar el panel
+            depends_on: Tipos de cambio de datos que dejan el panel desactualizado
+        """
+        self._panels[panel] = (refresh, set(depends_on))
+
+    def unregister(self, panel: str):
+        """Quita un panel (p. ej., el de una ventana secundaria que se cerró)."""
+        self._panels.pop(panel, None)
+        self._dirty.discard(panel)
+
+    def notify(self, *changes: str):
+        """Indica que cambiaron datos; marca como sucios los paneles que dependen de ellos."""
+        changes = set(changes)
+        self.invalidate(*[name for name, (_, depends_on) in self._panels.items() if depends_on & changes])
+
+    def invalidate(self, *panels: str):
+        """Marca paneles como sucios y programa un único refresco."""
+        unknown = set(panels) - set(self._panels)
+        if unknown:
+            raise KeyError(f"Paneles no registrados: {', '.join(sorted(unknown))}")
+        self._dirty.update(panels)
+        if self._dirty and self._job is None:
+            self._job = self.widget.after_idle(self.flush)
+
+    def invalidate_all(self):
+        """Marca todos los paneles como sucios."""
+        self.invalidate(*self._panels)
+
+    def flush(self) -> List[str]:
+        """
+        Refresca ahora los paneles sucios.
+
+        Returns:
+            Nombres de los paneles refrescados
+        """
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+        dirty, self._dirty = self._dirty, set()
+        refreshed = []
+        for name, (refresh, _) in self._panels.items():
+            if name in dirty:
+                try:
+                    refresh()
+                except Exception as e:
+                    print(f"Error al refrescar el panel '{name}': {e}")
+                refreshed.append(name)
+        return refreshed
+
+    def cancel(self):
+        """Descarta los refrescos pendientes (p. ej., al reconstruir la vista)."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self._dirty.clear()
@@ -0,0 +1,275 @@
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+PAGE_SIZE = 100
+MAX_CACHED_PAGES = 6
+DEFAULT_ROW_HEIGHT = 20
+HEADER_HEIGHT = 24
+WHEEL_ROWS = 3
+LOADING_TEXT = "Cargando..."
+ERROR_TEXT = "Error al cargar (desplácese para reintentar)"
+
+
+class VirtualTable(tk.Frame):
+    """
+    Tabla virtualizada sobre un ttk.Treeview.
+
+    El Treeview solo contiene las filas que caben en pantalla: al desplazarse
+    esas mismas filas se rellenan con los valores de la nueva posición. Los
+    datos se piden por páginas a la fuente en segundo plano y solo se conservan
+    unas pocas páginas en memoria, de modo que la memoria usada no depende del
+    tamaño del historial. La ordenación y el filtrado los hace la fuente (la
+    base de datos), no la tabla.
+    """
+
+    def __init__(self, parent, columns: Sequence[Tuple[str, str, int]],
+                 count_fn: Callable[[Any], int],
+                 page_fn: Callable[[Any, int, int, Tuple[str, bool]], List[Sequence[Any]]],
+                 executor, sort: Tuple[str, bool] = None,
+                 on_count: Optional[Callable[[int], None]] = None,
+                 page_size: int = PAGE_SIZE, max_pages: int = MAX_CACHED_PAGES, **frame_options):
+        """
+        Inicializa la tabla.
+
+        Args:
+            parent: Widget padre
+            columns: Columnas como tuplas (clave, título, ancho)
+            count_fn: Recibe la consulta y devuelve el total de filas (hilo secundario)
+            page_fn: Recibe (consulta, salto, límite, orden) y devuelve los valores
+                     de cada fila en el orden de `columns` (hilo secundario)
+            executor: BackgroundExecutor con el que se ejecutan las consultas
+            sort: Orden inicial (clave de columna, ascendente)
+            on_count: Recibe el total de filas cada vez que se recalcula (hilo de Tk)
+            page_size: Filas por página
+            max_pages: Páginas que se mantienen en memoria (al menos 3)
+        """
+        frame_options.setdefault("height", 400)
+        super().__init__(parent, **frame_options)
+        # El tamaño del frame lo decide quien lo coloca; el número de filas se ajusta a él
+        self.pack_propagate(False)
+
+        self.columns = list(columns)
+        self.count_fn = count_fn
+        self.page_fn = page_fn
+        self.executor = executor
+        self.sort = sort or (self.columns[0][0], True)
+        self.on_count = on_count
+        self.page_size = page_size
+        self.max_pages = max(max_pages, 3)
+
+        self.query = None
+        self.total = 0
+        self.offset = 0
+        self.visible_rows = 1
+        self._pages: "OrderedDict[int, List[Sequence[Any]]]" = OrderedDict()
+        self._requested: Dict[int, bool] = {}
+        self._failed: Set[int] = set()  # Páginas cuya carga falló; se reintentan al desplazarse
+        self._version = 0  # Cambia con el filtro o el orden: invalida las páginas
+        self._count_version = 0  # Cambia con el filtro: invalida el total
+        self._key = ("virtual_table", str(self))
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree = ttk.Treeview(self, columns=[key for key, _, _ in self.columns],
+                                 show="headings", height=1, selectmode="browse")
+        for key, title, width in self.columns:
+            self.tree.heading(key, text=title, command=lambda k=key: self.sort_by(k))
+            self.tree.column(key, width=width)
+        self.tree.pack(side="left", fill="x", anchor="n", expand=True)
+        self._update_headings()
+
+        self.bind("<Configure>", self._on_resize)
+        for widget in (self.tree, self.scrollbar):
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", lambda e: self.scroll_rows(-WHEEL_ROWS))
+            widget.bind("<Button-5>", lambda e: self.scroll_rows(WHEEL_ROWS))
+        self.tree.bind("<Prior>", lambda e: self.scroll_rows(-self.visible_rows))
+        self.tree.bind("<Next>", lambda e: self.scroll_rows(self.visible_rows))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(self.total))
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
+    # --- API pública ---
+
+    def set_query(self, query):
+        """Cambia el filtro, vuelve al principio y recarga el total y las páginas."""
+        self.query = query
+        self.offset = 0
+        self.refresh()
+
+    def refresh(self):
+        """Vuelve a pedir el total y las páginas visibles (p. ej., tras añadir una sesión)."""
+        self._invalidate()
+        self._count_version += 1
+        version = self._count_version
+        self.executor.submit(self._key + ("count",), self.count_fn, self.query,
+                             on_success=lambda total: self._count_loaded(version, total))
+
+    def sort_by(self, column: str):
+        """Ordena por una columna; si ya era la columna de orden, invierte la dirección."""
+        key, ascending = self.sort
+        self.sort = (column, not ascending if key == column else True)
+        self._update_headings()
+        self._invalidate()
+        self._render()
+
+    def scroll_rows(self, rows: int):
+        self.scroll_to(self.offset + rows)
+
+    def scroll_to(self, offset: int):
+        offset = max(0, min(int(offset), max(self.total - self.visible_rows, 0)))
+        if offset != self.offset:
+            self.offset = offset
+            self._failed.clear()
+            self.tree.selection_set(())
+            self._render()
+
+    def yview(self, *args):
+        """Comando de la barra de desplazamiento."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.scroll_rows(amount * self.visible_rows if args[2] == "pages" else amount)
+
+    def selected_row(self) -> Optional[Sequence[Any]]:
+        """Valores de la fila seleccionada, o None si no hay selección o aún no ha cargado."""
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        return self._row(self.offset + self.tree.index(selection[0]))
+
+    # --- Datos ---
+
+    def _invalidate(self):
+        """Descarta las páginas en memoria y las peticiones en curso."""
+        self._version += 1
+        for page in self._requested:
+            self.executor.cancel(self._key + ("page", page))
+        self._requested.clear()
+        self._failed.clear()
+        self._pages.clear()
+
+    def _count_loaded(self, version, total):
+        if version != self._count_version:
+            return
+        self.total = total
+        self.offset = max(0, min(self.offset, max(total - self.visible_rows, 0)))
+        if self.on_count is not None:
+            self.on_count(total)
+        self._render()
+
+    def _row(self, index: int):
+        page = self._pages.get(index // self.page_size)
+        if page is None:
+            return None
+        position = index % self.page_size
+        return page[position] if position < len(page) else None
+
+    def _ensure_pages(self):
+        """Pide las páginas visibles y la siguiente; libera las más antiguas."""
+        if self.total == 0:
+            return
+        first = self.offset // self.page_size
+        last = min(self.offset + self.visible_rows, self.total - 1) // self.page_size
+        wanted = list(range(first, last + 1))
+        # Precargar la página siguiente cuando la vista se acerca a su final
+        if (self.offset + self.visible_rows) % self.page_size > self.page_size // 2:
+            wanted.append(last + 1)
+
+        for page in wanted:
+            if page * self.page_size >= self.total:
+                continue
+            if page in self._pages:
+                self._pages.move_to_end(page)
+            elif page not in self._requested and page not in self._failed:
+                self._request_page(page)
+
+        while len(self._pages) > self.max_pages:
+            oldest = next(iter(self._pages))
+            if oldest in wanted:
+                break
+            del self._pages[oldest]
+
+    def _request_page(self, page: int):
+        version = self._version
+        self._requested[page] = True
+        column, ascending = self.sort
+        self.executor.submit(self._key + ("page", page), self.page_fn, self.query,
+                             page * self.page_size, self.page_size, (column, ascending),
+                             on_success=lambda rows: self._page_loaded(version, page, rows),
+                             on_error=lambda e: self._page_failed(version, page, e))
+
+    def _page_loaded(self, version, page, rows):
+        if version != self._version:
+            return
+        self._requested.pop(page, None)
+        self._pages[page] = list(rows)
+        self._render()
+
+    def _page_failed(self, version, page, error):
+        if version != self._version:
+            return
+        print(f"Error al cargar la página {page} de la tabla: {error}")
+        # Sin la petición pendiente, la página se vuelve a pedir al desplazarse
+        self._requested.pop(page, None)
+        self._failed.add(page)
+        self._render()
+
+    # --- Dibujo ---
+
+    def _render(self):
+        """Rellena las filas visibles con los datos de la posición actual."""
+        if not self.winfo_exists():
+            return
+        self._ensure_pages()
+
+        count = max(0, min(self.visible_rows, self.total - self.offset))
+        items = self.tree.get_children()
+        for iid in items[count:]:
+            self.tree.delete(iid)
+        for i in range(len(items), count):
+            self.tree.insert("", "end", iid=f"row{i}")
+
+        padding = ("",) * (len(self.columns) - 1)
+        for i in range(count):
+            values = self._row(self.offset + i)
+            if values is None:
+                failed = (self.offset + i) // self.page_size in self._failed
+                values = ((ERROR_TEXT if failed else LOADING_TEXT),) + padding
+            self.tree.item(f"row{i}", values=tuple(values))
+
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, (self.offset + count) / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _update_headings(self):
+        sort_key, ascending = self.sort
+        for key, title, _ in self.columns:
+            arrow = (" ▲" if ascending else " ▼") if key == sort_key else ""
+            self.tree.heading(key, text=title + arrow)
+
+    def _on_resize(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT)
+        rows = max(1, (event.height - HEADER_HEIGHT) // row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.tree.configure(height=rows)
+            self.offset = max(0, min(self.offset, max(self.total - rows, 0)))
+            self._render()
+
+    def _on_mousewheel(self, event):
+        # En Windows delta es múltiplo de 120; en macOS son pasos pequeños
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_rows(-steps * WHEEL_ROWS)
+        return "break"
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.executor.cancel(self._key + ("count",))
+            self._invalidate()
@@ -1,9 +1,12 @@
 # utils/chart.py
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import tkinter as tk
 from datetime import datetime, timedelta
 from database import get_subjects
+from utils.downsample import lttb
 
 class ProgressChart:
     def __init__(self, parent, user_id):
@@ -14,9 +17,16 @@ class ProgressChart:
         
     def create_chart(self, estudio_repo):
         """Crea la gráfica de progreso semanal."""
-        # Limpiar gráfica anterior
-        self.ax.clear()
-        
+        self.render(self.load_data(estudio_repo))
+
+    def load_data(self, estudio_repo):
+        """
+        Consulta y agrupa los datos de la semana. No toca la interfaz, por lo
+        que puede ejecutarse en un hilo secundario.
+
+        Returns:
+            Tupla (materias, minutos, colores)
+        """
         # Calcular fecha de inicio (lunes de esta semana)
         today = datetime.now()
         start_date = today - timedelta(days=today.weekday())
@@ -42,6 +52,14 @@ class ProgressChart:
         materias = list(minutos_por_materia.keys())
         minutos = [minutos_por_materia[m] for m in materias]
         colores = [subject_colors.get(m, '#888888') for m in materias]
+        return materias, minutos, colores
+
+    def render(self, data):
+        """Dibuja la gráfica con los datos de `load_data`. Debe llamarse desde el hilo de Tk."""
+        materias, minutos, colores = data
+
+        # Limpiar gráfica anterior
+        self.ax.clear()
         
         # Crear gráfica de barras
         bars = self.ax.bar(materias, minutos, color=colores)
@@ -64,4 +82,130 @@ class ProgressChart:
             
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.parent)
         self.canvas.draw()
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
\ No newline at end of file
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+class TimelineChart:
+    """Gráfica de línea de tiempo con los minutos diarios por materia.
+
+    Las series completas se guardan en memoria y solo se dibuja una versión
+    reducida con LTTB al ancho visible en píxeles. Al hacer zoom o desplazar la
+    vista se vuelve a muestrear únicamente el rango visible.
+    """
+
+    # Milisegundos de espera para agrupar los eventos de pan/zoom en un solo redibujado
+    RESAMPLE_DELAY_MS = 30
+
+    def __init__(self, parent, user_id):
+        self.parent = parent
+        self.user_id = user_id
+        self.fig, self.ax = plt.subplots(figsize=(8, 4))
+        self.canvas = None
+        self.toolbar = None
+        self.series = {}  # materia -> (fechas como números de matplotlib, minutos)
+        self.lines = {}
+        self._resample_job = None
+        self._resampling = False
+
+    def create_chart(self, estudio_repo):
+        """Crea la gráfica de línea de tiempo con todo el historial del usuario."""
+        self.render(self.load_data(estudio_repo))
+
+    def load_data(self, estudio_repo):
+        """
+        Consulta el historial y construye las series diarias. No toca la
+        interfaz, por lo que puede ejecutarse en un hilo secundario.
+
+        Returns:
+            Tupla (series, colores por materia)
+        """
+        subjects = get_subjects(self.user_id)
+        subject_colors = {s['name']: s.get('color', '#888888') for s in subjects}
+
+        sesiones = estudio_repo.find({"usuario_id": self.user_id})
+
+        # Agrupar minutos por materia y día
+        minutos_por_dia = {}
+        for sesion in sesiones:
+            dias = minutos_por_dia.setdefault(sesion.materia, {})
+            dia = sesion.fecha_hora.date()
+            dias[dia] = dias.get(dia, 0) + sesion.duracion_minutos
+
+        # Series diarias continuas (los días sin estudio valen 0)
+        series = {}
+        for materia, dias in minutos_por_dia.items():
+            primer_dia = min(dias)
+            total_dias = (max(dias) - primer_dia).days + 1
+            fechas = mdates.date2num(primer_dia) + np.arange(total_dias, dtype=float)
+            minutos = np.zeros(total_dias)
+            for dia, valor in dias.items():
+                minutos[(dia - primer_dia).days] = valor
+            series[materia] = (fechas, minutos)
+        return series, subject_colors
+
+    def render(self, data):
+        """Dibuja las series de `load_data`. Debe llamarse desde el hilo de Tk."""
+        self.series, subject_colors = data
+        self.ax.clear()
+        self.lines = {}
+
+        for materia in self.series:
+            (line,) = self.ax.plot([], [], color=subject_colors.get(materia, '#888888'),
+                                   linewidth=1, label=materia)
+            self.lines[materia] = line
+
+        self.ax.set_title('Minutos Diarios por Materia')
+        self.ax.set_ylabel('Minutos')
+        self.ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(self.ax.xaxis.get_major_locator()))
+        if self.lines:
+            self.ax.legend(loc='upper left', fontsize=8)
+            inicio = min(fechas[0] for fechas, _ in self.series.values())
+            fin = max(fechas[-1] for fechas, _ in self.series.values())
+            maximo = max(minutos.max() for _, minutos in self.series.values())
+            self.ax.set_xlim(inicio, max(fin, inicio + 1))
+            self.ax.set_ylim(0, maximo * 1.1 or 1)
+
+        if self.canvas is None:
+            self.canvas = FigureCanvasTkAgg(self.fig, master=self.parent)
+            self.toolbar = NavigationToolbar2Tk(self.canvas, self.parent, pack_toolbar=False)
+            self.toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+            self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self.canvas.mpl_connect('resize_event', lambda event: self._schedule_resample())
+        else:
+            # Reiniciar el historial de navegación (botón "Inicio") con los nuevos límites
+            self.toolbar.update()
+
+        # ax.clear() elimina los callbacks del eje, por eso se conectan en cada carga
+        self.ax.callbacks.connect('xlim_changed', lambda ax: self._schedule_resample())
+        self._resample()
+
+    def _schedule_resample(self):
+        """Agrupa varios cambios de vista seguidos en un único remuestreo."""
+        if self._resampling or self.canvas is None:
+            return
+        widget = self.canvas.get_tk_widget()
+        if self._resample_job is not None:
+            widget.after_cancel(self._resample_job)
+        self._resample_job = widget.after(self.RESAMPLE_DELAY_MS, self._resample)
+
+    def _resample(self):
+        """Reduce cada serie al rango visible y al ancho en píxeles del eje."""
+        self._resample_job = None
+        if self.canvas is None:
+            return
+
+        xmin, xmax = self.ax.get_xlim()
+        ancho = max(int(self.ax.bbox.width), 3)
+
+        self._resampling = True
+        try:
+            for materia, (fechas, minutos) in self.series.items():
+                # Incluir un punto a cada lado para que la línea llegue a los bordes
+                inicio = max(int(np.searchsorted(fechas, xmin)) - 1, 0)
+                fin = min(int(np.searchsorted(fechas, xmax, side='right')) + 1, len(fechas))
+                x, y = lttb(fechas[inicio:fin], minutos[inicio:fin], ancho)
+                self.lines[materia].set_data(x, y)
+        finally:
+            self._resampling = False
+
+        self.canvas.draw_idle()
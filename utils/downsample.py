@@ -0,0 +1,53 @@
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """
+    Reduce una serie con el algoritmo Largest-Triangle-Three-Buckets.
+
+    Conserva el primer y el último punto y, en cada cubeta intermedia, el punto
+    que forma el triángulo de mayor área con el punto elegido en la cubeta
+    anterior y el promedio de la siguiente. Así se mantiene la forma visual de
+    la serie (picos y valles) con muchos menos puntos.
+
+    Args:
+        x: Valores del eje X ordenados de forma ascendente
+        y: Valores del eje Y
+        threshold: Número de puntos deseado
+
+    Returns:
+        Tupla (x, y) con los puntos seleccionados como arreglos de numpy
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    indices = np.empty(threshold, dtype=np.intp)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # Los puntos interiores se reparten en threshold - 2 cubetas
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        # Promedio de la cubeta siguiente (o el último punto)
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        if next_start >= n - 1 or i == threshold - 3:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+
+        ax, ay = x[a], y[a]
+        areas = np.abs((ax - avg_x) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y - ay))
+        a = start + int(areas.argmax())
+        indices[i + 1] = a
+
+    return x[indices], y[indices]
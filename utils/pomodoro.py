@@ -0,0 +1,230 @@
+import json
+import math
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from utils.storage import data_dir
+
+WORK = "work"
+BREAK = "break"
+
+DEFAULT_WORK_SECONDS = 25 * 60
+DEFAULT_BREAK_SECONDS = 5 * 60
+
+
+class PomodoroTimer:
+    """
+    Temporizador Pomodoro independiente de la interfaz.
+
+    En lugar de restar un segundo en cada tick, el temporizador guarda el
+    instante de fin de la fase según `time.monotonic()` y calcula el tiempo
+    restante a partir de él. Un callback lento o una ventana modal pueden
+    retrasar el repintado, pero nunca adelantan ni atrasan el final de la fase.
+
+    El estado se guarda en un archivo JSON con la hora de fin en tiempo real
+    (`time.time()`), de modo que al reiniciar la aplicación el temporizador
+    continúa donde iba, incluidas las fases que terminaron mientras estaba
+    cerrada.
+
+    Los relojes se pueden inyectar para probarlo sin interfaz.
+    """
+
+    def __init__(self, path=None,
+                 work_seconds: int = DEFAULT_WORK_SECONDS,
+                 break_seconds: int = DEFAULT_BREAK_SECONDS,
+                 clock: Callable[[], float] = time.monotonic,
+                 wall_clock: Callable[[], float] = time.time):
+        """
+        Inicializa el temporizador y restaura el estado guardado si existe.
+
+        Args:
+            path: Archivo donde se guarda el estado (None para no guardarlo)
+            work_seconds: Duración de la fase de trabajo
+            break_seconds: Duración de la fase de descanso
+            clock: Reloj monótono para medir la fase en curso
+            wall_clock: Reloj de pared, usado solo para guardar y restaurar
+        """
+        self.path = str(path) if path is not None else None
+        self.work_seconds = work_seconds
+        self.break_seconds = break_seconds
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.RLock()
+
+        self.phase = WORK
+        self.running = False
+        self._remaining = float(work_seconds)  # Tiempo restante mientras está en pausa
+        self._deadline = 0.0  # Fin de la fase según el reloj monótono, mientras corre
+        self._pending: List[Tuple[str, str]] = []  # Cambios de fase ocurridos al restaurar
+
+        self._load()
+
+    # --- Consultas ---
+
+    def remaining(self) -> float:
+        """Segundos que faltan para el final de la fase actual."""
+        with self._lock:
+            if self.running:
+                return max(self._deadline - self._clock(), 0.0)
+            return self._remaining
+
+    def display_seconds(self) -> int:
+        """Segundos que se muestran: 25:00 al empezar y 00:00 solo al terminar."""
+        return math.ceil(self.remaining())
+
+    def seconds_until_change(self) -> Optional[float]:
+        """
+        Segundos hasta el próximo cambio visible (el siguiente segundo en
+        pantalla o el final de la fase). None si el temporizador está parado.
+        """
+        with self._lock:
+            if not self.running:
+                return None
+            remaining = self.remaining()
+            return remaining - (math.ceil(remaining) - 1) if remaining > 0 else 0.0
+
+    # --- Acciones ---
+
+    def start(self):
+        """Inicia o reanuda la fase actual."""
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self._deadline = self._clock() + self._remaining
+            self._save()
+
+    def pause(self):
+        """Pausa la fase actual conservando el tiempo restante."""
+        with self._lock:
+            if not self.running:
+                return
+            self._remaining = self.remaining()
+            self.running = False
+            self._save()
+
+    def reset(self):
+        """Detiene el temporizador y vuelve al inicio de la fase de trabajo."""
+        with self._lock:
+            self.running = False
+            self.phase = WORK
+            self._remaining = float(self.work_seconds)
+            self._save()
+
+    def set_duration(self, seconds: int) -> bool:
+        """
+        Cambia el tiempo de la fase actual. Solo se permite con el temporizador parado.
+
+        Returns:
+            True si se aplicó el cambio
+        """
+        with self._lock:
+            if self.running:
+                return False
+            self._remaining = float(seconds)
+            self._save()
+            return True
+
+    def tick(self) -> List[Tuple[str, str]]:
+        """
+        Avanza las fases cuyo final ya pasó.
+
+        Returns:
+            Lista de cambios de fase (fase terminada, fase nueva), en orden. Incluye
+            los que ocurrieron mientras la aplicación estaba cerrada.
+        """
+        with self._lock:
+            transitions, self._pending = self._pending, []
+            if self.running:
+                now = self._clock()
+                while self._deadline <= now:
+                    transitions.append(self._next_phase())
+                if transitions:
+                    self._save()
+            return transitions
+
+    def _next_phase(self) -> Tuple[str, str]:
+        """Pasa a la fase siguiente encadenándola con el final de la anterior."""
+        finished = self.phase
+        self.phase = BREAK if finished == WORK else WORK
+        duration = self.break_seconds if self.phase == BREAK else self.work_seconds
+        self._deadline += duration
+        self._remaining = float(duration)
+        return finished, self.phase
+
+    # --- Persistencia ---
+
+    def _save(self):
+        if self.path is None:
+            return
+        state = {
+            "phase": self.phase,
+            "running": self.running,
+            "remaining": self.remaining(),
+            "work_seconds": self.work_seconds,
+            "break_seconds": self.break_seconds,
+        }
+        if self.running:
+            state["deadline_wall"] = self._wall_clock() + self.remaining()
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"No se pudo guardar el estado del Pomodoro: {e}")
+
+    def _load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+            phase = state["phase"] if state["phase"] in (WORK, BREAK) else WORK
+            work_seconds = int(state.get("work_seconds", self.work_seconds))
+            break_seconds = int(state.get("break_seconds", self.break_seconds))
+            running = bool(state.get("running"))
+            remaining = float(state["remaining"])
+            if running:
+                remaining = float(state["deadline_wall"]) - self._wall_clock()
+            # Con una duración de 0 (o un plazo infinito) encadenar las fases vencidas no terminaría nunca
+            if work_seconds <= 0 or break_seconds <= 0:
+                raise ValueError("la duración de las fases debe ser positiva")
+            if not math.isfinite(remaining):
+                raise ValueError("tiempo restante no válido")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Estado del Pomodoro no válido; se empezará de cero: {e}")
+            return
+
+        self.phase = phase
+        self.work_seconds = work_seconds
+        self.break_seconds = break_seconds
+        self.running = running
+        self._remaining = max(remaining, 0.0)
+        if running:
+            # Las fases que terminaron con la aplicación cerrada se encadenan igual
+            self._deadline = self._clock() + remaining
+            now = self._clock()
+            while self._deadline <= now:
+                self._pending.append(self._next_phase())
+
+
+def format_time(seconds: int) -> str:
+    """Formatea segundos a MM:SS."""
+    mins, secs = divmod(int(seconds), 60)
+    return f"{mins:02d}:{secs:02d}"
+
+
+_timer: Optional[PomodoroTimer] = None
+_timer_lock = threading.Lock()
+
+
+def get_pomodoro_timer() -> PomodoroTimer:
+    """Devuelve el temporizador compartido, con el estado guardado en el directorio de datos."""
+    global _timer
+    with _timer_lock:
+        if _timer is None:
+            _timer = PomodoroTimer(data_dir() / "pomodoro.json")
+        return _timer
@@ -0,0 +1,171 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from utils.storage import data_dir
+
+load_dotenv("configuracion.env")
+
+DEFAULT_TTL_SECONDS = int(os.getenv("SESSION_TOKEN_TTL_HOURS", "168")) * 3600
+ISSUER = "edutracker"
+
+# Cabecera fija: los tokens son JWT firmados con HMAC-SHA256 (HS256)
+_HEADER = {"alg": "HS256", "typ": "JWT"}
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class SessionTokens:
+    """
+    Emite y valida tokens de sesión firmados (JWT HS256).
+
+    Tras un login correcto se emite un token con el usuario y una caducidad, y
+    se guarda en el directorio de datos. En el siguiente arranque basta con
+    comprobar su firma HMAC (microsegundos) para restaurar la sesión, sin
+    volver a ejecutar bcrypt ni buscar el usuario en la base de datos. Al ser
+    JWT estándar, una API HTTP puede aceptar los mismos tokens en la cabecera
+    `Authorization: Bearer`.
+    """
+
+    def __init__(self, secret: Optional[str], path=None,
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        """
+        Inicializa el emisor.
+
+        Args:
+            secret: Clave HMAC (JWT_SECRET). Sin clave no se emite ni acepta ningún token
+            path: Archivo donde se guarda el token local (None para no guardarlo)
+            ttl_seconds: Validez de los tokens emitidos
+            clock: Reloj en segundos desde la época (inyectable para pruebas)
+        """
+        self.secret = secret.encode("utf-8") if secret else None
+        self.path = str(path) if path else None
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+
+    @property
+    def enabled(self) -> bool:
+        return self.secret is not None
+
+    def _sign(self, signing_input: str) -> str:
+        return _b64encode(hmac.new(self.secret, signing_input.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, user: Dict[str, Any]) -> Optional[str]:
+        """
+        Emite un token para un documento de usuario de la colección `users`.
+
+        Returns:
+            El token, o None si no hay JWT_SECRET configurado
+        """
+        if not self.enabled:
+            return None
+        now = int(self.clock())
+        claims = {
+            "iss": ISSUER,
+            "sub": user["username"],
+            "uid": str(user.get("_id", "")),
+            "email": user.get("email", ""),
+            "iat": now,
+            "exp": now + self.ttl_seconds,
+        }
+        signing_input = ".".join(_b64encode(json.dumps(part, separators=(",", ":")).encode("utf-8"))
+                                 for part in (_HEADER, claims))
+        return f"{signing_input}.{self._sign(signing_input)}"
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Comprueba firma, algoritmo, emisor y caducidad de un token.
+
+        Returns:
+            Los claims del token, o None si no es válido
+        """
+        if not self.enabled or not token:
+            return None
+        try:
+            header_b64, claims_b64, signature = token.split(".")
+            if not hmac.compare_digest(self._sign(f"{header_b64}.{claims_b64}"), signature):
+                return None
+            header = json.loads(_b64decode(header_b64))
+            claims = json.loads(_b64decode(claims_b64))
+        except (ValueError, TypeError):
+            return None
+        if header.get("alg") != "HS256" or claims.get("iss") != ISSUER or "sub" not in claims:
+            return None
+        if not isinstance(claims.get("exp"), (int, float)) or claims["exp"] <= self.clock():
+            return None
+        return claims
+
+    # --- Token local de la aplicación de escritorio ---
+
+    def save(self, token: Optional[str]):
+        """Guarda el token local (solo legible por el usuario del sistema)."""
+        if not self.path or not token:
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(token)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"No se pudo guardar el token de sesión: {e}")
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Lee y valida el token local.
+
+        Returns:
+            Los claims si el token es válido; si no, lo borra y devuelve None
+        """
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                token = f.read().strip()
+        except OSError as e:
+            print(f"No se pudo leer el token de sesión: {e}")
+            return None
+        claims = self.verify(token)
+        if claims is None:
+            self.clear()
+        return claims
+
+    def clear(self):
+        """Borra el token local (al cerrar sesión)."""
+        if self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                print(f"No se pudo borrar el token de sesión: {e}")
+
+
+def user_from_claims(claims: Dict[str, Any]) -> Dict[str, Any]:
+    """Reconstruye los campos de usuario que usa la aplicación a partir de los claims."""
+    return {"_id": claims.get("uid"), "username": claims["sub"], "email": claims.get("email", "")}
+
+
+_tokens = None
+_tokens_lock = threading.Lock()
+
+
+def get_session_tokens() -> SessionTokens:
+    """Devuelve el emisor compartido, con JWT_SECRET y el token en el directorio de datos."""
+    global _tokens
+    with _tokens_lock:
+        if _tokens is None:
+            _tokens = SessionTokens(os.getenv("JWT_SECRET"), data_dir() / "session.token")
+        return _tokens
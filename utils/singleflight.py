@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas idénticas que se hacen al mismo tiempo.
+
+    Mientras una llamada con una clave está en curso, las demás llamadas con la
+    misma clave esperan a que termine y reciben su mismo resultado (o su misma
+    excepción) en lugar de repetir el trabajo. Al terminar, la clave se libera:
+    no es una caché.
+
+    - `do` sirve para hilos (por ejemplo, un ThreadPoolExecutor).
+    - `do_async` sirve para corrutinas de asyncio dentro del mismo event loop.
+    - Un llamador asyncio que quiera compartir una función bloqueante con los
+      hilos puede usar `await loop.run_in_executor(None, flight.do, key, fn)`.
+
+    El resultado es el mismo objeto para todos los llamadores, así que no debe
+    modificarse.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Ejecuta `fn` o espera a la ejecución en curso con la misma clave.
+
+        Args:
+            key: Identificador de la llamada
+            fn: Función a ejecutar
+
+        Returns:
+            El resultado de `fn`
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Ejecuta la corrutina `fn` o espera a la que ya está en curso con la misma clave.
+
+        Cancelar a uno de los que esperan no cancela la llamada compartida.
+
+        Args:
+            key: Identificador de la llamada
+            fn: Función que devuelve una corrutina
+
+        Returns:
+            El resultado de la corrutina
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = loop.create_task(fn(*args, **kwargs))
+                self._tasks[task_key] = task
+                task.add_done_callback(lambda t: self._forget_task(task_key, t))
+
+        return await asyncio.shield(task)
+
+    def _forget_task(self, task_key, task):
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+        if not task.cancelled():
+            task.exception()  # Evita el aviso de "excepción nunca recuperada"
@@ -52,4 +52,68 @@ def calcular_estadisticas(sesiones: List[Any]) -> Dict[str, Any]:
         "minutos_por_materia": dict(minutos_por_materia),
         "minutos_por_dia_semana": minutos_por_dia_semana,
         "promedio_diario_ultima_semana": promedio_diario_ultima_semana
-    }
\ No newline at end of file
+    }
+
+
+def consulta_sesiones_metas(usuario: str, metas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Consulta de las sesiones que cuentan para un grupo de metas de un usuario.
+
+    Con ella basta una consulta por usuario para todas sus metas, en lugar de
+    una por meta. Las metas sin periodo (sin fecha de inicio o de fin) no
+    cuentan sesiones; si ninguna lo tiene, la consulta no devuelve nada.
+    """
+    metas = [m for m in metas if _tiene_periodo(m)]
+    if not metas:
+        return {"usuario_id": usuario, "materia": {"$in": []}}
+    return {
+        "usuario_id": usuario,
+        "materia": {"$in": sorted({m.get("materia") for m in metas})},
+        "fecha_hora": {"$gte": min(m["fecha_inicio"] for m in metas),
+                       "$lt": max(m["fecha_fin"] for m in metas)},
+    }
+
+
+def _tiene_periodo(meta: Dict[str, Any]) -> bool:
+    return bool(meta.get("fecha_inicio") and meta.get("fecha_fin"))
+
+
+def calcular_progreso_metas(metas: List[Dict[str, Any]], sesiones: List[Dict[str, Any]],
+                            ahora: datetime = None) -> List[Dict[str, Any]]:
+    """
+    Calcula el progreso de cada meta con las sesiones de su materia y su periodo.
+
+    Args:
+        metas: Documentos de la colección `metas`
+        sesiones: Documentos de `sesiones_estudio` (basta con materia, duración y fecha)
+        ahora: Fecha actual para decidir si una meta está vencida
+
+    Returns:
+        Un diccionario por meta, en el mismo orden
+    """
+    ahora = ahora or datetime.now()
+    resultado = []
+    for meta in metas:
+        # Una meta sin periodo (datos antiguos o importados) no acumula sesiones ni vence
+        logrados = 0
+        if _tiene_periodo(meta):
+            logrados = sum(s.get("duracion_minutos", 0) for s in sesiones
+                           if s.get("materia") == meta.get("materia")
+                           and meta["fecha_inicio"] <= s["fecha_hora"] < meta["fecha_fin"])
+        objetivo = meta.get("minutos_objetivo", 0)
+        estado = "Completada" if meta.get("completada") else "Activa"
+        if not meta.get("completada") and meta.get("fecha_fin") and ahora > meta["fecha_fin"]:
+            estado = "Vencida"
+        resultado.append({
+            "id": str(meta["_id"]),
+            "usuario": meta.get("usuario_id"),
+            "materia": meta.get("materia"),
+            "periodo": meta.get("periodo"),
+            "minutos_objetivo": objetivo,
+            "minutos_logrados": logrados,
+            "progreso": round(logrados / objetivo * 100, 1) if objetivo > 0 else 0,
+            "estado": estado,
+            "fecha_inicio": meta.get("fecha_inicio"),
+            "fecha_fin": meta.get("fecha_fin"),
+        })
+    return resultado
@@ -0,0 +1,14 @@
+import os
+from pathlib import Path
+
+
+def data_dir() -> Path:
+    """
+    Devuelve el directorio local donde EduTracker guarda cachés y estado.
+
+    Se puede cambiar con la variable de entorno EDUTRACKER_DATA_DIR; por
+    defecto es ~/.edutracker. El directorio se crea si no existe.
+    """
+    path = Path(os.getenv("EDUTRACKER_DATA_DIR") or Path.home() / ".edutracker")
+    path.mkdir(parents=True, exist_ok=True)
+    return path